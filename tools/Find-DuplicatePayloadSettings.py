@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Find-DuplicatePayloadSettings.py
+
+Python counterpart of Find-DuplicatePayloadSettings.ps1: finds settings configured by
+more than one Settings Catalog / compliance JSON or mobileconfig file, and flags the
+ones whose values differ (conflicts).
+
+Parsing is shared with Generate-ConfigurationDocumentation.py (extract_settings_catalog(),
+extract_compliance_policy(), extract_mobileconfig(), the manifest registry and the
+parse cache), so both tools see the same settings and values. Every occurrence goes
+into one inverted index (setting id -> file -> first value) in a single pass; there
+is no per-setting regrouping afterwards.
+
+Report columns match the PowerShell script: SettingId, OccurrenceCount, HasConflict,
+Configurations, ReferenceIds, Values, SourceFiles. Values are the generator's
+normalized display values (e.g. "True" rather than "..._true"). With --cross-format,
+settings are grouped by the generator's canonical (domain, key) identity instead of
+the raw id, so a mobileconfig key and the Settings Catalog setting for the same
+preference (com.apple.screensaver.idleTime / com.apple.screensaver_idletime) are
+reported together; SettingId is then "<domain>.<key>" in lower case.
+
+Usage:
+  python3 tools/Find-DuplicatePayloadSettings.py
+  python3 tools/Find-DuplicatePayloadSettings.py --output-format CSV --output-file duplicate-settings.csv
+  python3 tools/Find-DuplicatePayloadSettings.py --output-format JSON -j 0
+  python3 tools/Find-DuplicatePayloadSettings.py --cross-format
+"""
+
+from __future__ import annotations
+import argparse
+import csv
+import json
+import os
+import pathlib
+from typing import Any, Dict, List, Tuple
+
+import docgen_core as core
+
+REPORT_FIELDS = ("SettingId", "OccurrenceCount", "HasConflict", "Configurations", "ReferenceIds", "Values", "SourceFiles")
+# Artifacts parsed per fetch; bounds how many parsed settings lists are held at once
+FETCH_CHUNK = 1024
+
+class DuplicateIndex:
+    """Inverted index of setting occurrences across configuration files.
+
+    ``files`` holds one (ReferenceId, Name, SourceFile) row per artifact and
+    ``settings`` maps a setting id to {file number: value}. Like the PowerShell
+    script, only the first value a file gives a setting is kept.
+    """
+
+    def __init__(self) -> None:
+        self.files: List[Tuple[str, str, str]] = []
+        self.settings: Dict[str, Dict[int, str]] = {}
+        self.occurrences = 0
+
+    def add(self, reference_id: str, name: str, relpath: str, settings: List[Tuple[str, str]]) -> None:
+        number = len(self.files)
+        self.files.append((reference_id, name, relpath))
+        index = self.settings
+        for setting_id, value in settings:
+            by_file = index.get(setting_id)
+            if by_file is None:
+                index[setting_id] = {number: value}
+            elif number not in by_file:
+                by_file[number] = value
+        self.occurrences += len(settings)
+
+    def duplicates(self) -> List[Dict[str, Any]]:
+        """Settings found in more than one file, most widespread first."""
+        files = self.files
+        report = []
+        for setting_id, by_file in self.settings.items():
+            if len(by_file) < 2:
+                continue
+            rows = [files[n] for n in by_file]
+            values = list(by_file.values())
+            report.append({
+                "SettingId": setting_id,
+                "OccurrenceCount": len(by_file),
+                "HasConflict": len(set(values)) > 1,
+                "Configurations": " | ".join(row[1] for row in rows),
+                "ReferenceIds": ", ".join(row[0] for row in rows),
+                "Values": " | ".join(values),
+                "SourceFiles": " | ".join(row[2] for row in rows),
+            })
+        report.sort(key=lambda d: (-d["OccurrenceCount"], d["SettingId"]))
+        return report
+
+def canonical_settings(settings: List[Tuple[str, str]], payload_types: Tuple[str, ...]) -> List[Tuple[str, str]]:
+    out = []
+    for setting_id, value in settings:
+        domain, key = core.canonical_setting_key(setting_id, payload_types)
+        out.append((f"{domain}.{key}" if domain else key, value))
+    return out
+
+def build_index(cache, jobs: int = 1, cross_format: bool = False, root: pathlib.Path | None = None) -> DuplicateIndex:
+    """Parse every JSON and mobileconfig artifact under ``root`` (default: this repository) once and index its settings."""
+    index = DuplicateIndex()
+    paths = core.gather_files(include_mde=True, root=root or core.REPO_ROOT)
+    with core.WorkerPool(jobs) as pool:
+        registry = core.ManifestRegistry.load(paths, cache, pool)
+        for suffix, parse in ((".json", core.parse_json_artifact), (".mobileconfig", core.parse_mobileconfig_artifact)):
+            files = paths.files(suffix, under=core.ARTIFACT_DIRS)
+            for start in range(0, len(files), FETCH_CHUNK):
+                chunk = files[start:start + FETCH_CHUNK]
+                for path, (value, _) in zip(chunk, cache.fetch_many(chunk, parse, pool)):
+                    if value is None:
+                        continue
+                    settings = value["settings"]
+                    if cross_format:
+                        payload_types = () if suffix == ".json" else value["payload_types"]
+                        settings = canonical_settings(settings, payload_types)
+                    manifest, _ = registry.get(path.with_suffix(".xml"))
+                    fields = manifest["fields"] if manifest and manifest["root"] == "MacIntuneManifest" else {}
+                    reference_id = (fields.get("ReferenceId") or "").strip() or path.stem
+                    name = (fields.get("Name") or "").strip() or path.stem
+                    index.add(reference_id, name, path.relative_to(paths.root).as_posix(), settings)
+    return index
+
+def write_csv(report: List[Dict[str, Any]], path: pathlib.Path) -> None:
+    # Same shape as Export-Csv -NoTypeInformation: every field quoted, booleans as True/False
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS, quoting=csv.QUOTE_ALL)
+        writer.writeheader()
+        writer.writerows(report)
+
+def write_json(report: List[Dict[str, Any]], path: pathlib.Path) -> None:
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+def print_report(report: List[Dict[str, Any]]) -> None:
+    for title, conflict in (("CONFLICTS - Same setting with different values:", True),
+                            ("DUPLICATES - Same setting with same value (redundant):", False)):
+        group = [d for d in report if d["HasConflict"] == conflict]
+        if not group:
+            continue
+        print(title)
+        print()
+        for dup in group:
+            print(f"Setting: {dup['SettingId']}")
+            if conflict:
+                print("  CONFLICT DETECTED - Different values in different policies!")
+            print(f"  Occurrences: {dup['OccurrenceCount']}")
+            print("  Found in these policies:")
+            for ref, config, source, value in zip(dup["ReferenceIds"].split(", "), dup["Configurations"].split(" | "),
+                                                  dup["SourceFiles"].split(" | "), dup["Values"].split(" | ")):
+                print(f"    - {ref} - {config}")
+                print(f"      File: {source}")
+                if value:
+                    print(f"      Value: {value}")
+            print()
+        print("=" * 100)
+        print()
+
+def print_summary(index: DuplicateIndex, report: List[Dict[str, Any]]) -> None:
+    conflicts = [d for d in report if d["HasConflict"]]
+    print("Summary:")
+    print(f"  Total configurations analyzed: {len(index.files)}")
+    print(f"  Total settings found: {index.occurrences}")
+    print(f"  Total unique settings: {len(index.settings)}")
+    print(f"  Duplicate settings: {len(report)}")
+    if conflicts:
+        print(f"    - Conflicts (different values): {len(conflicts)}")
+    if len(report) > len(conflicts):
+        print(f"    - Redundant (same values): {len(report) - len(conflicts)}")
+    print()
+    if conflicts:
+        print("Settings with Conflicting Values:")
+        for dup in conflicts:
+            print(f"  - {dup['SettingId']} ({dup['OccurrenceCount']} configurations with different values)")
+        print()
+    if report:
+        print("Top 5 Most Duplicated Settings:")
+        for dup in report[:5]:
+            marker = " [CONFLICT]" if dup["HasConflict"] else ""
+            print(f"  - {dup['SettingId']} ({dup['OccurrenceCount']} configurations){marker}")
+        print()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Find duplicate and conflicting settings across configuration files")
+    parser.add_argument("--output-format", choices=("Console", "CSV", "JSON"), default="Console", help="Report format (default: Console)")
+    parser.add_argument("--output-file", type=pathlib.Path, help="Report path for CSV/JSON (default: duplicate-settings.csv/.json at the repo root)")
+    parser.add_argument("--cross-format", action="store_true", help="Match settings across mobileconfig and Settings Catalog by (domain, key)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse every artifact and skip the parse cache")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N", help="Parse artifacts on N worker processes (default: 1, 0 = one per CPU)")
+    args = parser.parse_args()
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    cache = core.ParseCache(None if args.no_cache else core.CACHE_FILE)
+    index = build_index(cache, jobs, cross_format=args.cross_format)
+    cache.save()
+    report = index.duplicates()
+
+    if not report:
+        print("[INFO] No duplicate settings found")
+        print_summary(index, report)
+        return
+    print(f"[INFO] Found {len(report)} duplicate settings across configurations")
+    print()
+    if args.output_format == "Console":
+        print_report(report)
+    else:
+        suffix = args.output_format.lower()
+        output = args.output_file or core.REPO_ROOT / f"duplicate-settings.{suffix}"
+        (write_csv if suffix == "csv" else write_json)(report, output)
+        print(f"[INFO] Results saved to {output}")
+    print_summary(index, report)
+
+if __name__ == "__main__":
+    main()
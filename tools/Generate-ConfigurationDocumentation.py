@@ -18,204 +18,358 @@ Heuristics:
 """
 
 from __future__ import annotations
+# Modules only some runs need (DOCX/XLSX packaging, pandoc and git, render threads,
+# --jobs, --watch, --serve, --profile) are imported where they are used, so loading
+# this script stays cheap. Walking, parsing and the parse cache live in docgen_core.
 import json
-import plistlib
+import abc
+import contextlib
+import datetime
+import functools
+import hashlib
+import io
+import os
 import pathlib
 import re
-import argparse
-import xml.etree.ElementTree as ET
-from typing import Any, Dict, List, Tuple
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple
+
+from docgen_core import (
+    CACHE_DIR, CACHE_FILE, CATALOG_NAME, CATALOG_VERSION, MDE_DIR, REPO_ROOT, Artifact, DocumentModel, ParseCache,
+    PathIndex, canonical_setting_key, entry_digest, gather_files, iter_entries, relative_path,
+    validate_model,
+)
 
-REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
 OUTPUT_FILE = REPO_ROOT / "INTUNE-MY-MACS-DOCUMENTATION.md"
 DOCX_OUTPUT_FILE = REPO_ROOT / "INTUNE-MY-MACS-DOCUMENTATION.docx"
+HTML_OUTPUT_FILE = REPO_ROOT / "INTUNE-MY-MACS-DOCUMENTATION.html"
+CSV_OUTPUT_FILE = REPO_ROOT / "INTUNE-MY-MACS-SETTINGS.csv"
+XLSX_OUTPUT_FILE = REPO_ROOT / "INTUNE-MY-MACS-SETTINGS.xlsx"
+SHARD_DIR = REPO_ROOT / "INTUNE-MY-MACS-DOCUMENTATION"
+# Outputs --formats can add to the markdown, in the order their renderers are created
+OUTPUT_FORMATS = ("docx", "html", "csv", "json", "xlsx")
 
-JSON_GLOB = [
-    "configurations/intune/*.json",
-    "configurations/entra/*.json",
-    "configurations/**/*.json",
-    "mde/*.json",
-]
-MOBILECONFIG_GLOB = [
-    "configurations/intune/*.mobileconfig",
-    "configurations/entra/*.mobileconfig",
-    "mde/*.mobileconfig",
-]
-
-METADATA_KEYS = {"PayloadDisplayName", "PayloadIdentifier", "PayloadType", "PayloadUUID", "PayloadVersion"}
-
-def gather_files(patterns: List[str], suffix: str = "") -> List[pathlib.Path]:
-    files: List[pathlib.Path] = []
-    for pattern in patterns:
-        for p in REPO_ROOT.glob(pattern):
-            if p.is_file():
-                if suffix and not p.name.endswith(suffix):
-                    continue
-                files.append(p)
-    return sorted(files)
-
-def safe_read_json(path: pathlib.Path) -> Dict[str, Any] | None:
-    """Read JSON tolerating UTF-8 BOM."""
-    try:
-        # Read raw then decode handling BOM if present
-        raw = path.read_bytes()
-        text = raw.decode("utf-8-sig")  # utf-8-sig strips BOM if present
-        return json.loads(text)
-    except Exception as e:
-        print(f"[WARN] Failed to parse JSON {path}: {e}")
-        return None
+# Report stage -> (suffix, per-file timing) summed from RunMetrics.record_file()
+METRICS_FILE_STAGES = {
+    "manifest_parse": (".xml", "decode_s"),
+    "json_parse": (".json", "decode_s"),
+    "plist_parse": (".mobileconfig", "decode_s"),
+    "extraction": (None, "extract_s"),
+}
+METRICS_KINDS = {".xml": "manifest", ".json": "json", ".mobileconfig": "mobileconfig"}
+METRICS_PREFIX = "intune_docgen"
 
-def safe_read_plist(path: pathlib.Path) -> Dict[str, Any] | None:
-    try:
-        with path.open("rb") as f:
-            return plistlib.load(f)
-    except Exception as e:
-        print(f"[WARN] Failed to parse mobileconfig plist {path}: {e}")
-        return None
+class RunMetrics:
+    """Timings and counters behind --metrics.
 
-def extract_settings_catalog(json_doc: Dict[str, Any]) -> List[Tuple[str, str]]:
-    """Return list of (settingDefinitionId, value) pairs by deep traversal.
-    Handles nested settingInstance and groupSettingCollectionValue/children structures.
+    Stage wall times are recorded with ``stage()``; per-file read/parse figures come
+    back from load_artifact() (so they are gathered in --jobs workers too) through
+    ``record_file()``. ``RunMetrics(False)`` is a pass-through: ``stage()`` returns a
+    shared null context and ``timed_iter()`` hands back its argument untouched.
     """
-    out: List[Tuple[str, str]] = []
-    settings = json_doc.get("settings", [])
-
-    def walk(node: Any):
-        if isinstance(node, dict):
-            sdid = node.get("settingDefinitionId")
-            if sdid:
-                # Extract choice value
-                choice_block = node.get("choiceSettingValue")
-                if isinstance(choice_block, dict):
-                    choice_val = choice_block.get("value")
-                    if choice_val is not None:
-                        out.append((sdid, simplify_display_value(sdid, choice_val)))
-                # Extract simple value
-                simple_val_block = node.get("simpleSettingValue")
-                if isinstance(simple_val_block, dict):
-                    val = simple_val_block.get("value")
-                    if val is not None:
-                        out.append((sdid, simplify_display_value(sdid, val)))
-                # Extract collection values (arrays)
-                collection_block = node.get("simpleSettingCollectionValue")
-                if isinstance(collection_block, list):
-                    for idx, item in enumerate(collection_block):
-                        if isinstance(item, dict):
-                            val = item.get("value")
-                            if val is not None:
-                                # Use index suffix for multiple values
-                                out.append((f"{sdid}[{idx}]", simplify_display_value(sdid, val)))
-            # Recurse into all values to ensure we visit settingInstance etc.
-            for v in node.values():
-                walk(v)
-        elif isinstance(node, list):
-            for item in node:
-                walk(item)
-
-    walk(settings)
-    return out
-
-def simplify_value(val: Any) -> str:
-    """Basic normalization converting numbers and truncating long strings."""
-    if val is None:
-        return ""
-    if isinstance(val, (int, float)):
-        return str(val)
-    if isinstance(val, str):
-        if len(val) > 120:
-            return val[:117] + "..."
-        return val
-    return json.dumps(val)
-
-BOOLEAN_SUFFIXES = {"_true": "True", "_false": "False"}
-
-def simplify_display_value(key: str, raw_val: Any) -> str:
-    """Remove duplicated key prefix embedded in Settings Catalog choice/simple values.
-    Examples:
-      key='com.apple.mcx.filevault2_enable', value='com.apple.mcx.filevault2_enable_0' -> '0'
-      key='com.apple.systempolicy.control_EnableAssessment', value='com.apple.systempolicy.control_EnableAssessment_true' -> 'True'
-      key='com.apple.managedclient.preferences_channelname', value='com.apple.managedclient.preferences_channelname_0' -> '0'
-    Also converts *_true/*_false suffixes to True/False.
-    Leaves placeholder tokens like {{mail}} intact.
+
+    _NULL_STAGE = contextlib.nullcontext()
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.files: List[Dict[str, Any]] = []
+        self.counters: Dict[str, int] = {}
+
+    def stage(self, name: str) -> contextlib.AbstractContextManager:
+        """Context manager adding the enclosed wall time to stage ``name``."""
+        if not self.enabled:
+            return self._NULL_STAGE
+        return self._timed(name)
+
+    @contextlib.contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def timed_iter(self, items: Iterable[Any], name: str) -> Iterable[Any]:
+        """Wrap a lazy iterable so time spent producing items is charged to stage ``name``."""
+        if not self.enabled:
+            return items
+        return self._timed_iter(iter(items), name)
+
+    def _timed_iter(self, items: Iterator[Any], name: str) -> Iterator[Any]:
+        clock = time.perf_counter
+        while True:
+            start = clock()
+            try:
+                item = next(items)
+            except StopIteration:
+                self.stages[name] = self.stages.get(name, 0.0) + clock() - start
+                return
+            self.stages[name] = self.stages.get(name, 0.0) + clock() - start
+            yield item
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """Charge time measured elsewhere (e.g. on a renderer thread) to stage ``name``."""
+        if self.enabled:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count(self, name: str, value: int) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_file(self, relpath: str, suffix: str, stats: Dict[str, Any]) -> None:
+        """Keep one parsed file's bytes, timings and walk/normalization counters."""
+        record = {"path": relpath, "kind": METRICS_KINDS.get(suffix, suffix.lstrip(".")), "suffix": suffix}
+        record.update(stats)
+        self.files.append(record)
+        for counter in ("settings_nodes", "normalization_hits", "normalization_misses"):
+            if counter in stats:
+                self.count(counter, stats[counter])
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        """Assemble the JSON report; derived stages are computed here, not while running."""
+        stages = dict(self.stages)
+        for stage, (suffix, field) in METRICS_FILE_STAGES.items():
+            stages[stage] = sum(f.get(field, 0.0) for f in self.files if suffix is None or f["suffix"] == suffix)
+        if "write_outputs" in stages:
+            # render_entries() drives the entry iterator; what remains is rendering
+            stages["render"] = max(0.0, stages.pop("write_outputs") - stages.get("entries", 0.0))
+        stages["total"] = time.perf_counter() - self.started
+
+        kinds: Dict[str, Dict[str, Any]] = {}
+        for f in self.files:
+            kind = kinds.setdefault(f["kind"], {"files": 0, "bytes": 0, "read_s": 0.0, "parse_s": 0.0})
+            kind["files"] += 1
+            kind["bytes"] += f["bytes"]
+            kind["read_s"] += f["read_s"]
+            kind["parse_s"] += f.get("parse_s", 0.0)
+
+        hits = self.counters.get("normalization_hits", 0)
+        misses = self.counters.get("normalization_misses", 0)
+        per_file = [
+            {"path": f["path"], "kind": f["kind"], "bytes": f["bytes"],
+             "read_s": round(f["read_s"], 6), "parse_s": round(f.get("parse_s", 0.0), 6)}
+            for f in self.files
+        ]
+        return {
+            "generated": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "stages": {name: round(seconds, 6) for name, seconds in stages.items()},
+            "counters": dict(sorted(self.counters.items())),
+            "normalization_cache": {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            },
+            "files_by_kind": {kind: {k: round(v, 6) if isinstance(v, float) else v for k, v in totals.items()}
+                              for kind, totals in kinds.items()},
+            "slowest": sorted(per_file, key=lambda f: f["read_s"] + f["parse_s"], reverse=True)[:top],
+            "largest": sorted(per_file, key=lambda f: f["bytes"], reverse=True)[:top],
+            "files": per_file,
+        }
+
+    @staticmethod
+    def prometheus(report: Dict[str, Any]) -> str:
+        """Render a report in the Prometheus text exposition format (node_exporter textfile collector)."""
+        lines: List[str] = []
+
+        def metric(name: str, help_: str, samples: List[Tuple[str, Any]]) -> None:
+            lines.append(f"# HELP {METRICS_PREFIX}_{name} {help_}")
+            lines.append(f"# TYPE {METRICS_PREFIX}_{name} gauge")
+            for labels, value in samples:
+                lines.append(f"{METRICS_PREFIX}_{name}{labels} {value}")
+
+        metric("stage_seconds", "Wall time per generator stage.",
+               [(f'{{stage="{stage}"}}', seconds) for stage, seconds in report["stages"].items()])
+        kinds = report["files_by_kind"]
+        metric("files_parsed", "Artifacts read and parsed (cache misses) by kind.",
+               [(f'{{kind="{kind}"}}', k["files"]) for kind, k in kinds.items()])
+        metric("bytes_read", "Bytes read from parsed artifacts by kind.",
+               [(f'{{kind="{kind}"}}', k["bytes"]) for kind, k in kinds.items()])
+        for counter, value in report["counters"].items():
+            metric(counter, f"Run counter {counter}.", [("", value)])
+        rate = report["normalization_cache"]["hit_rate"]
+        if rate is not None:
+            metric("normalization_cache_hit_ratio", "Share of value normalizations served by the memo.", [("", rate)])
+        metric("last_run_timestamp_seconds", "Unix time the report was written.", [("", int(time.time()))])
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: pathlib.Path, top: int = 10) -> None:
+        """Write metrics.json and metrics.prom into ``directory``, each replaced atomically."""
+        report = self.report(top)
+        directory.mkdir(parents=True, exist_ok=True)
+        outputs = {
+            "metrics.json": json.dumps(report, indent=2) + "\n",
+            "metrics.prom": self.prometheus(report),
+        }
+        for name, text in outputs.items():
+            tmp = directory / f".{name}.tmp"
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, directory / name)
+        print(f"[INFO] Wrote metrics to {directory}")
+
+# Allocation sites listed per stage in allocations.txt
+PROFILE_TOP_ALLOCATIONS = 15
+# Collapsed-stack frames deeper than this are folded into their parent
+PROFILE_MAX_DEPTH = 64
+
+@functools.lru_cache(maxsize=None)
+def profile_ignored_frames() -> Tuple[tracemalloc.Filter, ...]:
+    """Frames of the profiling machinery itself, left out of the allocation diffs."""
+    import cProfile
+    import pstats
+    import tracemalloc
+    return tuple(tracemalloc.Filter(False, name) for name in (
+        tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>",
+        cProfile.__file__, pstats.__file__))
+
+def _profile_label(func: Tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":  # built-ins
+        return name.replace(";", ",")
+    return f"{name} ({pathlib.Path(filename).name}:{line})".replace(";", ",")
+
+def collapsed_stacks(stats: pstats.Stats, root: str = "") -> List[str]:
+    """Turn cProfile results into collapsed-stack lines (``a;b;c <microseconds>``).
+
+    cProfile only keeps caller -> callee edges, so stacks are rebuilt top-down from
+    the functions nobody called, splitting each function's time across its callers
+    in proportion to the time each caller accounted for (as flameprof does).
+    Recursion is cut at the first repeated frame.
     """
-    # First apply base simplification
-    val = simplify_value(raw_val)
-    if not isinstance(val, str):
-        return val
-    # Preserve Jinja/placeholder tokens
-    if re.search(r"{{.*?}}", val):
-        return val
-    lower_val = val.lower()
-    # Map boolean suffix if present
-    for suf, mapped in BOOLEAN_SUFFIXES.items():
-        if lower_val.endswith(suf):
-            # Only if preceding part matches key prefix to avoid accidental mapping
-            prefix_part = val[: -len(suf)]
-            if key.startswith(prefix_part.split('.')[-1]) or prefix_part.endswith(key.split('.')[-1]):
-                return mapped
-            # Common case: exact duplication of key then suffix
-            if prefix_part == key:
-                return mapped
-    # If value starts with the key, strip that prefix plus underscore
-    if val.startswith(key + "_"):
-        trimmed = val[len(key) + 1:]
-        return trimmed
-    # Some values fully repeat path segments with underscores; attempt to drop matching leading portion
-    if val.startswith(key):
-        remainder = val[len(key):]
-        remainder = remainder.lstrip('_')
-        if remainder:
-            return remainder
-    return val
-
-def extract_mobileconfig(plist_doc: Dict[str, Any]) -> List[Tuple[str, str]]:
-    out: List[Tuple[str, str]] = []
-    payloads = plist_doc.get("PayloadContent", [])
-    for payload in payloads:
-        if not isinstance(payload, dict):
+    callees: Dict[Any, Dict[Any, float]] = {}
+    roots = []
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        if not callers:
+            roots.append(func)
+        for caller, (_, _, _, cumulative) in callers.items():
+            callees.setdefault(caller, {})[func] = cumulative
+    totals: Dict[str, float] = {}
+    # (function, time share, parent frames, functions already on the stack)
+    pending: List[Tuple[Any, float, Tuple[str, ...], frozenset]] = [
+        (func, stats.stats[func][3], (root,) if root else (), frozenset({func})) for func in sorted(roots, reverse=True)
+    ]
+    while pending:
+        func, share, stack, seen = pending.pop()
+        _, _, own, cumulative, _ = stats.stats[func]
+        if cumulative <= 0 or share <= 0:
             continue
-        # Use PayloadType as prefix (more meaningful than DisplayName)
-        prefix = payload.get("PayloadType", "payload")
-        for k, v in payload.items():
-            if k in METADATA_KEYS:
-                continue
-            if isinstance(v, (str, int, float)):
-                out.append((f"{prefix}.{k}", simplify_value(v)))
-            elif isinstance(v, (list, dict)):
-                # Summarize complex structure size
-                out.append((f"{prefix}.{k}", f"complex:{type(v).__name__}"))
-    return out
-
-def extract_compliance_policy(json_doc: Dict[str, Any]) -> List[Tuple[str, str]]:
-    """Extract settings from compliance policy JSON (flat structure).
-    Ignores metadata fields and extracts policy configuration.
+        fraction = min(1.0, share / cumulative)
+        path = stack + (_profile_label(func),)
+        folded = 0.0
+        for child, child_time in callees.get(func, {}).items():
+            if child in seen or len(path) >= PROFILE_MAX_DEPTH:
+                folded += child_time * fraction
+            else:
+                pending.append((child, child_time * fraction, path, seen | {child}))
+        key = ";".join(path)
+        totals[key] = totals.get(key, 0.0) + own * fraction + folded
+    return [f"{stack} {round(seconds * 1e6)}" for stack, seconds in totals.items() if seconds >= 1e-6]
+
+class StageProfiler:
+    """cProfile + tracemalloc around each pipeline stage, behind --profile.
+
+    For every stage ``directory`` receives ``<stage>.pstats`` (for pstats/snakeviz)
+    and ``<stage>.collapsed`` (for flamegraph.pl/speedscope); ``close()`` adds
+    ``profile.collapsed`` with every stage under its own root frame and
+    ``allocations.txt`` with each stage's net allocation, peak and top allocation
+    sites. ``StageProfiler(None)`` is a pass-through.
     """
-    out: List[Tuple[str, str]] = []
-    IGNORE_KEYS = {
-        "@odata.type", "displayName", "description", "id", "createdDateTime", 
-        "lastModifiedDateTime", "version", "roleScopeTagIds"
-    }
-    
-    for key, value in json_doc.items():
-        if key in IGNORE_KEYS:
-            continue
-        # Handle scheduledActionsForRule separately
-        if key == "scheduledActionsForRule" and isinstance(value, list):
-            for idx, rule in enumerate(value):
-                if isinstance(rule, dict):
-                    rule_name = rule.get("ruleName", f"rule_{idx}")
-                    configs = rule.get("scheduledActionConfigurations", [])
-                    if configs:
-                        out.append((f"{key}.{rule_name}.actionCount", str(len(configs))))
-                        for cidx, config in enumerate(configs):
-                            if isinstance(config, dict):
-                                action_type = config.get("actionType", "unknown")
-                                grace = config.get("gracePeriodHours", 0)
-                                out.append((f"{key}.{rule_name}.action_{cidx}", f"{action_type} (grace: {grace}h)"))
-        else:
-            out.append((key, simplify_value(value)))
-    
-    return out
+
+    _NULL_STAGE = contextlib.nullcontext()
+
+    def __init__(self, directory: pathlib.Path | None):
+        self.directory = directory
+        self.enabled = directory is not None
+        self.stacks: List[str] = []
+        self.allocations: List[str] = []
+        if self.enabled:
+            import tracemalloc
+            directory.mkdir(parents=True, exist_ok=True)
+            tracemalloc.start()
+
+    def stage(self, name: str) -> contextlib.AbstractContextManager:
+        if not self.enabled:
+            return self._NULL_STAGE
+        return self._profiled(name)
+
+    @contextlib.contextmanager
+    def _profiled(self, name: str) -> Iterator[None]:
+        import cProfile
+        import tracemalloc
+        reset_peak = getattr(tracemalloc, "reset_peak", None)
+        if reset_peak is None:
+            # Python 3.8 has no reset_peak(): restart tracing so the peak covers this
+            # stage only (the diff then only sees blocks allocated during the stage)
+            tracemalloc.stop()
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot().filter_traces(profile_ignored_frames())
+        if reset_peak is not None:
+            reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot().filter_traces(profile_ignored_frames())
+            self._record(name, profile, after.compare_to(before, "lineno"), current - baseline, peak - baseline)
+
+    def _record(self, name: str, profile: cProfile.Profile, diff: List[tracemalloc.StatisticDiff],
+                net: int, peak: int) -> None:
+        import pstats
+        profile.dump_stats(str(self.directory / f"{name}.pstats"))
+        stacks = collapsed_stacks(pstats.Stats(profile))
+        (self.directory / f"{name}.collapsed").write_text("\n".join(stacks) + "\n", encoding="utf-8")
+        self.stacks.extend(f"{name};{line}" for line in stacks)
+        self.allocations.append(f"== {name}: net {net / 1024:+,.1f} KiB, peak {peak / 1024:,.1f} KiB above stage start")
+        for stat in diff[:PROFILE_TOP_ALLOCATIONS]:
+            if stat.size_diff:
+                frame = stat.traceback[0]
+                self.allocations.append(
+                    f"  {stat.size_diff / 1024:+12,.1f} KiB {stat.count_diff:+9,d} blocks  {frame.filename}:{frame.lineno}"
+                )
+        self.allocations.append("")
+
+    def close(self) -> None:
+        """Write the combined outputs and stop tracing."""
+        if not self.enabled:
+            return
+        import tracemalloc
+        tracemalloc.stop()
+        (self.directory / "profile.collapsed").write_text("\n".join(self.stacks) + "\n", encoding="utf-8")
+        (self.directory / "allocations.txt").write_text("\n".join(self.allocations), encoding="utf-8")
+        print(f"[INFO] Wrote profile to {self.directory}")
+
+class SettingEquivalenceIndex:
+    """Setting occurrences keyed by canonical_setting_key(), across artifact formats.
+
+    ``add()`` records which artifacts (by caller-chosen number) configure each
+    (domain, key) and in which format ("json" or "mobileconfig"); ``lookup()`` is a
+    single dict probe. Only artifact numbers are stored, so the index stays small
+    next to the settings themselves.
+    """
+
+    def __init__(self) -> None:
+        self.keys: Dict[Tuple[str, str], Dict[str, List[int]]] = {}
+
+    def add(self, number: int, kind: str, settings: List[Tuple[str, str]], payload_types: Tuple[str, ...] = ()) -> None:
+        keys = self.keys
+        for setting_id, _ in settings:
+            by_kind = keys.setdefault(canonical_setting_key(setting_id, payload_types), {})
+            numbers = by_kind.setdefault(kind, [])
+            if not numbers or numbers[-1] != number:
+                numbers.append(number)
+
+    def lookup(self, setting_id: str, payload_types: Tuple[str, ...] = ()) -> Dict[str, List[int]]:
+        return self.keys.get(canonical_setting_key(setting_id, payload_types), {})
+
+    def cross_format(self) -> List[Tuple[Tuple[str, str], Dict[str, List[int]]]]:
+        """(domain, key) identities configured in more than one format, sorted."""
+        return sorted((key, by_kind) for key, by_kind in self.keys.items() if len(by_kind) > 1)
 
 def format_table(rows: List[Tuple[str, str]]) -> str:
     """Return a markdown table with all rows (no truncation)."""
@@ -225,36 +379,41 @@ def format_table(rows: List[Tuple[str, str]]) -> str:
     body = "".join(f"| `{k}` | `{v}` |\n" for k, v in rows)
     return header + body
 
-def classify_type(path: pathlib.Path) -> str:
-    name = path.name
-    # Derive from filename prefix (ref ID)
-    m = re.match(r"([a-z]{3})-([a-z]{3})-(\d{3})", name)
-    if m:
-        prefix = m.group(1)
-        mapping = {
-            "pol": "Policy",
-            "cfg": "CustomConfig",
-            "cmp": "Compliance",
-            "scr": "Script",
-            "cat": "CustomAttribute",
-            "app": "Package",
-        }
-        return mapping.get(prefix, "Unknown")
-    # fallback
-    if name.endswith(".mobileconfig"):
-        return "CustomConfig"
-    return "Policy"
+def render_section(e: Artifact) -> str:
+    """Render the detailed markdown section for one entry."""
+    return f"### {e.ref} ({e.type})\n\n" + render_section_body(e)
 
-def generate_markdown(entries: List[Dict[str, Any]]) -> str:
+def render_section_body(e: Artifact) -> str:
+    """Everything in an entry's section below its heading."""
     md: List[str] = []
-    import datetime
-    today = datetime.date.today().strftime("%B %d, %Y")
+    if e.description:
+        md.append(f"{e.description}\n\n")
+    md.append(f"**Source:** `{e.relpath}`  \n")
+    md.append(f"**Settings:** {e.count}\n\n")
+    md.append(format_table(list(e.pairs())))
+    md.append("\n\n")
+    return "".join(md)
+
+def render_cached_section(e: Artifact, cache: ParseCache | None) -> str:
+    if cache is None:
+        return render_section(e)
+    return cache.fragment(e.digest, lambda: render_section(e))
+
+def render_preamble(total: int, generated: str | None = None) -> str:
+    """Render the cover, description and index heading that precede the index rows.
+
+    ``generated`` is the cover date text: None uses today's date, "" leaves the line out.
+    """
+    md: List[str] = []
+    if generated is None:
+        generated = format_document_date(datetime.date.today())
     
     # Page 1: Cover Page (Large, Bold)
     md.append("# Intune My Macs\n\n")
     md.append("## Configuration Documentation\n\n")
-    md.append(f"**Generated:** {today}\n\n")
-    md.append(f"**Total Artifacts:** {len(entries)}\n\n")
+    if generated:
+        md.append(f"**Generated:** {generated}\n\n")
+    md.append(f"**Total Artifacts:** {total}\n\n")
     
     # Page 2: Project Description (Standard font)
     md.append("# About Intune My Macs\n\n")
@@ -277,26 +436,419 @@ def generate_markdown(entries: List[Dict[str, Any]]) -> str:
     md.append("# Index\n\n")
     md.append("Click any reference ID to jump to detailed configuration.\n\n")
     md.append("| Ref | Type | Settings Count |\n|-----|------|----------------|\n")
-    def anchor_for(ref: str, type_: str) -> str:
-        # Mirror the heading line: ### ref (Type) -> pandoc/github anchor generation heuristic
-        anchor_base = f"{ref}-{type_.lower()}"
-        return anchor_base.replace(' ', '-').lower()
-    for e in entries:
-        anchor = anchor_for(e['ref'], e['type'])
-        md.append(f"| [{e['ref']}](#{anchor}) | {e['type']} | {e['count']} |\n")
+    return "".join(md)
+
+def format_document_date(date: datetime.date) -> str:
+    return date.strftime("%B %d, %Y")
+
+def source_date(index: PathIndex) -> datetime.date | None:
+    """Date of the newest input file, for a cover date that only changes with the sources.
+
+    That is the last commit touching the indexed files, or the mtime of any of them
+    with uncommitted changes when that is newer. Outside a git checkout (or without
+    git) the newest mtime of all indexed files is used. Dates are taken in UTC so
+    every machine renders the same one; None when nothing was indexed.
+    """
+    import subprocess
+    files = dict(item for group in index.by_suffix.values() for item in group)
+    if not files:
+        return None
+    pathspecs = sorted({rel.split("/", 1)[0] for rel in files})
+    git = ["git", "-C", str(REPO_ROOT)]
+    try:
+        log = subprocess.run(git + ["log", "-1", "--format=%ct", "--", *pathspecs],
+                             capture_output=True, text=True, check=True)
+        status = subprocess.run(git + ["status", "--porcelain", "-z", "--untracked-files=all", "--", *pathspecs],
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        log = status = None
+    newest = 0.0
+    if log is not None and log.stdout.strip():
+        newest = float(log.stdout.strip())
+        # -z records are "XY path"; a rename's original path follows as a bare record
+        changed = [files[r[3:]] for r in status.stdout.split("\0") if r[3:] in files]
+    else:
+        changed = list(files.values())
+    for path in changed:
+        with contextlib.suppress(OSError):
+            newest = max(newest, path.stat().st_mtime)
+    return datetime.datetime.fromtimestamp(newest, datetime.timezone.utc).date()
+
+def anchor_for(ref: str, type_: str) -> str:
+    # Mirror the heading line: ### ref (Type) -> pandoc/github anchor generation heuristic
+    anchor_base = f"{ref}-{type_.lower()}"
+    return anchor_base.replace(' ', '-').lower()
+
+def render_index_row(ref: str, type_: str, count: int) -> str:
+    return f"| [{ref}](#{anchor_for(ref, type_)}) | {type_} | {count} |\n"
+
+DETAILS_HEADING = "\n# Detailed Configuration\n\n"
+
+# Entry kinds compared by the cross-format overlap section, with their column titles
+OVERLAP_KINDS = (("mobileconfig", "Configuration Profiles"), ("json", "Policies"))
+
+def index_entry(equivalence: SettingEquivalenceIndex, number: int, e: Artifact) -> None:
+    if e.kind in ("json", "mobileconfig"):
+        equivalence.add(number, e.kind, e.pairs(), e.payload_types)
+
+def render_overlaps(equivalence: SettingEquivalenceIndex, rows: List[Tuple[str, str, int]],
+                    target: Callable[[int], str] | None = None) -> str:
+    """Render the section listing settings configured both by profiles and by policies ("" if none).
+
+    ``target`` maps an entry number to its link target; by default the entry's anchor
+    in the same document.
+    """
+    overlaps = equivalence.cross_format()
+    if not overlaps:
+        return ""
+    if target is None:
+        target = lambda n: f"#{anchor_for(*rows[n][:2])}"
+    md: List[str] = ["# Cross-Format Overlaps\n\n"]
+    md.append("These settings are configured both by a custom configuration profile and by a policy. ")
+    md.append("Keys are matched case-insensitively by preference domain, ignoring user-scope domains.\n\n")
+    md.append("| Domain | Key | " + " | ".join(title for _, title in OVERLAP_KINDS) + " |\n")
+    md.append("|--------|-----|" + "|".join("-" * (len(title) + 2) for _, title in OVERLAP_KINDS) + "|\n")
+    for (domain, key), by_kind in overlaps:
+        cells = []
+        for kind, _ in OVERLAP_KINDS:
+            cells.append(", ".join(f"[{rows[n][0]}]({target(n)})" for n in by_kind.get(kind, [])))
+        md.append(f"| `{domain}` | `{key}` | " + " | ".join(cells) + " |\n")
     md.append("\n")
-    
-    md.append("# Detailed Configuration\n\n")
+    return "".join(md)
+
+def generate_markdown(entries: List[Artifact], cache: ParseCache | None = None) -> str:
+    md: List[str] = [render_preamble(len(entries))]
+    rows = [(e.ref, e.type, e.count) for e in entries]
+    equivalence = SettingEquivalenceIndex()
+    for number, e in enumerate(entries):
+        md.append(render_index_row(*rows[number]))
+        index_entry(equivalence, number, e)
+    md.append(DETAILS_HEADING)
     for e in entries:
-        md.append(f"### {e['ref']} ({e['type']})\n\n")
-        if e.get("description"):
-            md.append(f"{e['description']}\n\n")
-        md.append(f"**Source:** `{e['relpath']}`  \n")
-        md.append(f"**Settings:** {e['count']}\n\n")
-        md.append(format_table(e['settings']))
-        md.append("\n\n")
+        md.append(render_cached_section(e, cache))
+    md.append(render_overlaps(equivalence, rows))
     return "".join(md)
 
+class Renderer(abc.ABC):
+    """One output format, fed entries one at a time by render_entries().
+
+    ``add()`` is called once per entry in document order, then ``close()`` to finish
+    the output, or ``abort()`` if the run failed. A renderer only ever runs on one
+    thread, so implementations need no locking of their own.
+    """
+
+    name = ""
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+
+    @abc.abstractmethod
+    def add(self, e: Artifact) -> None:
+        """Render one entry."""
+
+    @abc.abstractmethod
+    def close(self) -> None:
+        """Finish the output and move it into place."""
+
+    def abort(self) -> None:
+        pass
+
+class MarkdownRenderer(Renderer):
+    """The markdown document.
+
+    Each section is rendered and spooled to a temporary file as soon as its entry
+    arrives, so only the small (ref, type, count) index rows and the setting
+    equivalence index (entry numbers per setting) stay in memory. The preamble and
+    index, which need the final count, come first in ``document()``, then the
+    spooled sections and the cross-format overlaps. Subclasses turn that same text
+    into other formats by overriding ``write_document()``.
+    """
+
+    name = "markdown"
+
+    def __init__(self, path: pathlib.Path, cache: ParseCache | None = None, generated: str | None = None):
+        import tempfile
+        super().__init__(path)
+        self.cache = cache
+        self.generated = generated  # cover date text, see render_preamble()
+        self.changed = False  # whether close() replaced the output file
+        self.rows: List[Tuple[str, str, int]] = []
+        self.equivalence = SettingEquivalenceIndex()
+        self.spool = tempfile.TemporaryFile("w+", encoding="utf-8", newline="")
+
+    def add(self, e: Artifact) -> None:
+        index_entry(self.equivalence, len(self.rows), e)
+        self.rows.append((e.ref, e.type, e.count))
+        self.spool.write(render_cached_section(e, self.cache))
+
+    def document(self) -> Iterator[str]:
+        """The finished markdown as a sequence of newline-terminated chunks."""
+        yield render_preamble(len(self.rows), self.generated)
+        yield from (render_index_row(*row) for row in self.rows)
+        yield DETAILS_HEADING
+        self.spool.seek(0)
+        yield from self.spool
+        yield render_overlaps(self.equivalence, self.rows)
+
+    def document_lines(self) -> Iterator[str]:
+        """``document()`` split into lines, as reading the written markdown file back would give them."""
+        for chunk in self.document():
+            yield from io.StringIO(chunk, newline="")
+
+    def write_text(self, write: Callable[[Any], None]) -> None:
+        """Have ``write`` fill a temporary file, then move it into place unless ``path`` already matches."""
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        try:
+            with tmp.open("w", encoding="utf-8") as out:
+                write(out)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        self.changed = replace_if_changed(tmp, self.path)
+
+    def write_document(self) -> None:
+        self.write_text(lambda out: out.writelines(self.document()))
+
+    def close(self) -> None:
+        try:
+            self.write_document()
+        finally:
+            self.spool.close()
+
+    def abort(self) -> None:
+        self.spool.close()
+
+def replace_if_changed(tmp: pathlib.Path, path: pathlib.Path) -> bool:
+    """Rename a finished temporary file over ``path``, or drop it when ``path`` has the same bytes.
+
+    Returns whether ``path`` was replaced. An unchanged output keeps its mtime, and
+    readers never see a half-written file.
+    """
+    import filecmp
+    if path.is_file() and filecmp.cmp(tmp, path, shallow=False):
+        tmp.unlink()
+        return False
+    os.replace(tmp, path)
+    return True
+
+def write_markdown(entries: Iterable[Artifact], path: pathlib.Path, cache: ParseCache | None = None) -> int:
+    """Stream entries into the markdown document at ``path`` and return how many were written."""
+    return render_entries(entries, [MarkdownRenderer(path, cache)])
+
+# Bump when the layout of shard pages changes, so every shard is re-rendered once
+SHARD_FORMAT_VERSION = 1
+SHARD_STATE_FILE = ".shards.json"
+SHARD_INDEX_PAGE = "README.md"
+SHARD_NAME_RE = re.compile(r"[^\w.-]+")
+
+def write_text_if_changed(path: pathlib.Path, text: str) -> bool:
+    """Write ``text`` to ``path`` through a temporary file unless it already holds exactly that.
+
+    Returns whether the file was written; an unchanged file keeps its mtime.
+    """
+    data = text.encode("utf-8")
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+def markdown_cell(text: str) -> str:
+    return text.replace("|", "\\|").replace("\n", " ")
+
+class ShardRenderer(Renderer):
+    """One markdown page per artifact, plus an index page per type and a top-level index.
+
+    Pages live under ``<dir>/<type>/<ref>.md`` with ``README.md`` index pages, so they
+    render as browsable folders on GitHub. ``<dir>/.shards.json`` records the entry
+    digest each page was rendered from: a page is only rendered again when its digest
+    changed (or the page is missing), and any page is only rewritten when its text
+    actually differs. Pages of artifacts that are gone are deleted. Regenerating after
+    a change therefore touches, and diffs, only the affected pages and indexes.
+    """
+
+    name = "shards"
+
+    def __init__(self, directory: pathlib.Path):
+        super().__init__(directory)
+        self.previous: Dict[str, str] = {}
+        try:
+            state = json.loads((directory / SHARD_STATE_FILE).read_text(encoding="utf-8"))
+            if state.get("version") == SHARD_FORMAT_VERSION:
+                self.previous = state["shards"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        self.shards: Dict[str, str] = {}  # page path relative to the directory -> entry digest
+        self.taken: set = set()
+        self.rows: List[Tuple[str, str, int]] = []
+        self.pages: List[Tuple[str, str]] = []  # (page path, name) per entry, in entry order
+        self.equivalence = SettingEquivalenceIndex()
+        self.written = 0
+        self.unchanged = 0
+
+    def page_for(self, e: Artifact) -> str:
+        folder = SHARD_NAME_RE.sub("-", e.type.lower())
+        stem = SHARD_NAME_RE.sub("-", e.ref) or "artifact"
+        page = f"{folder}/{stem}.md"
+        n = 1
+        # Compared case-insensitively: macOS volumes usually are
+        while page.lower() in self.taken or page.lower().endswith("/" + SHARD_INDEX_PAGE.lower()):
+            n += 1
+            page = f"{folder}/{stem}-{n}.md"
+        self.taken.add(page.lower())
+        return page
+
+    @staticmethod
+    def render_page(e: Artifact) -> str:
+        return (f"# {e.ref} ({e.type})\n\n"
+                f"[{e.type} index]({SHARD_INDEX_PAGE}) · [All artifacts](../{SHARD_INDEX_PAGE})\n\n"
+                + render_section_body(e))
+
+    def add(self, e: Artifact) -> None:
+        page = self.page_for(e)
+        digest = e.digest
+        path = self.path / page
+        if digest and self.previous.get(page) == digest and path.exists():
+            self.unchanged += 1
+        elif write_text_if_changed(path, self.render_page(e)):
+            self.written += 1
+        else:
+            self.unchanged += 1
+        self.shards[page] = digest
+        index_entry(self.equivalence, len(self.rows), e)
+        self.rows.append((e.ref, e.type, e.count))
+        self.pages.append((page, e.name or ""))
+
+    def index_pages(self) -> Iterator[Tuple[str, str]]:
+        """(page path, markdown) for every per-type index and the top-level index."""
+        by_type: Dict[str, List[int]] = {}
+        for n, (ref, type_, count) in enumerate(self.rows):
+            by_type.setdefault(type_, []).append(n)
+        summary: List[str] = []
+        for type_ in sorted(by_type):
+            numbers = by_type[type_]
+            folder = self.pages[numbers[0]][0].split("/", 1)[0]
+            md = [f"# {type_}\n\n", f"[All artifacts](../{SHARD_INDEX_PAGE})\n\n",
+                  "| Ref | Name | Settings Count |\n|-----|------|----------------|\n"]
+            for n in numbers:
+                page, name = self.pages[n]
+                md.append(f"| [{self.rows[n][0]}]({page.split('/', 1)[1]}) | {markdown_cell(name)} | {self.rows[n][2]} |\n")
+            yield f"{folder}/{SHARD_INDEX_PAGE}", "".join(md)
+            settings = sum(self.rows[n][2] for n in numbers)
+            summary.append(f"| [{type_}]({folder}/{SHARD_INDEX_PAGE}) | {len(numbers)} | {settings} |\n")
+        md = ["# Intune My Macs - Configuration Documentation\n\n",
+              f"**Total Artifacts:** {len(self.rows)}\n\n",
+              "| Type | Artifacts | Settings |\n|------|-----------|----------|\n"]
+        md.extend(summary)
+        md.append("\n")
+        md.append(render_overlaps(self.equivalence, self.rows, target=lambda n: self.pages[n][0]))
+        yield SHARD_INDEX_PAGE, "".join(md)
+
+    def close(self) -> None:
+        for page, text in self.index_pages():
+            self.shards[page] = ""
+            if write_text_if_changed(self.path / page, text):
+                self.written += 1
+        removed = 0
+        for page in set(self.previous) - set(self.shards):
+            path = self.path / page
+            if path.exists():
+                path.unlink()
+                removed += 1
+            with contextlib.suppress(OSError):
+                path.parent.rmdir()  # only succeeds once the folder is empty
+        state = {"version": SHARD_FORMAT_VERSION, "shards": dict(sorted(self.shards.items()))}
+        write_text_if_changed(self.path / SHARD_STATE_FILE, json.dumps(state, indent=1) + "\n")
+        print(f"[INFO] Wrote sharded documentation to {self.path}: "
+              f"{self.written} pages written, {self.unchanged} unchanged, {removed} removed")
+
+CATALOG_FILE_STEM = REPO_ROOT / "INTUNE-MY-MACS-CATALOG"
+
+def _catalog_default(value: Any) -> Any:
+    """JSON fallback for raw plist values (data, dates)."""
+    if isinstance(value, (bytes, bytearray)):
+        import base64
+        return base64.b64encode(value).decode("ascii")
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value)
+
+def catalog_record(e: Artifact) -> Dict[str, Any]:
+    """The catalog form of an entry.
+
+    ``settings`` holds ``[key, value]`` pairs, or ``[key, value, raw]`` when the raw
+    value differs from the normalized one (Settings Catalog choice ids, numbers, ...).
+    """
+    settings = [[key, value] if raw is None else [key, value, raw] for key, value, raw in e.settings]
+    record = {
+        "ref": e.ref,
+        "type": e.type,
+        "relpath": e.relpath,
+        "kind": e.kind,
+        "name": e.name,
+        "description": e.description,
+        "count": e.count,
+        "digest": e.digest,
+        "settings": settings,
+    }
+    if e.payload_types:
+        record["payload_types"] = list(e.payload_types)
+    return record
+
+class CatalogWriter(Renderer):
+    """Streams entries into ``<stem>.json`` and ``<stem>.ndjson``.
+
+    The JSON file is one object (header fields, "entries", then the final "count");
+    the NDJSON file is a header line followed by one record per line. Both are
+    written to temporary files and moved into place on ``close()`` with
+    replace_if_changed(). The header holds no timestamp, so a catalog of the same
+    entries keeps its bytes and mtime.
+    """
+
+    name = "json"
+
+    def __init__(self, stem: pathlib.Path):
+        super().__init__(stem)
+        self.paths = (stem.with_name(stem.name + ".json"), stem.with_name(stem.name + ".ndjson"))
+        self.count = 0
+        self.changed = False  # whether close() replaced either file
+        header = {"catalog": CATALOG_NAME, "version": CATALOG_VERSION}
+        self._tmp = [p.with_name(f".{p.name}.tmp") for p in self.paths]
+        self._json = self._tmp[0].open("w", encoding="utf-8")
+        self._ndjson = self._tmp[1].open("w", encoding="utf-8")
+        self._json.write(self._dumps(header)[:-1] + ',"entries":[\n')
+        self._ndjson.write(self._dumps(header) + "\n")
+
+    @staticmethod
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_catalog_default)
+
+    def add(self, e: Artifact) -> None:
+        line = self._dumps(catalog_record(e))
+        self._json.write(("," if self.count else "") + line + "\n")
+        self._ndjson.write(line + "\n")
+        self.count += 1
+
+    def close(self) -> None:
+        self._json.write(f'],"count":{self.count}}}\n')
+        self._json.close()
+        self._ndjson.close()
+        for tmp, path in zip(self._tmp, self.paths):
+            self.changed = replace_if_changed(tmp, path) or self.changed
+        print(f"[INFO] {'Wrote' if self.changed else 'Unchanged:'} catalog of {self.count} entries"
+              f" in {self.paths[0]} and {self.paths[1].name}")
+
+    def abort(self) -> None:
+        self._json.close()
+        self._ndjson.close()
+        for tmp in self._tmp:
+            tmp.unlink(missing_ok=True)
+
 def add_page_breaks_for_docx(markdown: str) -> str:
     """Add OpenXML page breaks to markdown for Word/pandoc conversion.
     
@@ -328,493 +880,1501 @@ def add_page_breaks_for_docx(markdown: str) -> str:
     
     return markdown
 
-def markdown_to_docx(md_text: str, docx_path: pathlib.Path) -> None:
-    """Very lightweight markdown to docx conversion focusing on headings, paragraphs, code spans and tables.
-    Requires python-docx.
+# --- Native DOCX writer -------------------------------------------------------------
+# WordprocessingML is streamed straight into the .docx zip. Every style the pandoc
+# post-processing used to apply (grid borders, shaded header row, Courier New 8pt
+# tables, Aptos body, cover page sizes, Word 2016 compatibility mode) is written
+# with the element itself, so there is no second pass over the document.
+
+DOCX_BODY_FONT = "Aptos"
+DOCX_BODY_SIZE = 22  # half-points (11pt)
+DOCX_TABLE_FONT = "Courier New"
+DOCX_TABLE_SIZE = 16  # 8pt
+DOCX_HEADER_FILL = "D9D9D9"
+DOCX_HEADING_SIZES = {1: 32, 2: 28, 3: 28}  # 16pt / 14pt / 14pt
+DOCX_COVER_HEADING_SIZES = {1: 72, 2: 48}  # 36pt / 24pt on the cover page
+DOCX_HEADING_COLOR = "0F4761"
+DOCX_COMPATIBILITY_MODE = "16"  # Word 2016+
+DOCX_BOLD_COLUMN = 1  # Value column of settings tables
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+DOCX_CONTENT_TYPES = XML_DECLARATION + (
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '<Override PartName="/word/settings.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.settings+xml"/>'
+    '<Override PartName="/word/numbering.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml"/>'
+    '<Override PartName="/docProps/core.xml" ContentType="application/vnd.openxmlformats-package.core-properties+xml"/>'
+    '<Override PartName="/docProps/app.xml" ContentType="application/vnd.openxmlformats-officedocument.extended-properties+xml"/>'
+    '</Types>'
+)
+
+DOCX_PACKAGE_RELS = XML_DECLARATION + (
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties" Target="docProps/core.xml"/>'
+    '<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/extended-properties" Target="docProps/app.xml"/>'
+    '</Relationships>'
+)
+
+DOCX_DOCUMENT_RELS = XML_DECLARATION + (
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/settings" Target="settings.xml"/>'
+    '<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/numbering" Target="numbering.xml"/>'
+    '</Relationships>'
+)
+
+# Custom document property holding docx_source_digest() of the markdown a DOCX was built from
+DOCX_SOURCE_PROPERTY = "docgen-source"
+DOCX_CUSTOM_PROPERTIES_TYPE = (
+    '<Override PartName="/docProps/custom.xml" ContentType="application/vnd.openxmlformats-officedocument.custom-properties+xml"/>'
+)
+DOCX_CUSTOM_PROPERTIES_REL = (
+    '<Relationship Id="rId4" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/custom-properties" Target="docProps/custom.xml"/>'
+)
+CUSTOM_PROPERTIES_NS = "http://schemas.openxmlformats.org/officeDocument/2006/custom-properties"
+
+def docx_custom_properties(properties: Dict[str, str]) -> str:
+    items = "".join(
+        f'<property fmtid="{{D5CDD505-2E9C-101B-9397-08002B2CF9AE}}" pid="{pid}" name="{docx_escape(name)}">'
+        f'<vt:lpwstr>{docx_escape(value)}</vt:lpwstr></property>'
+        for pid, (name, value) in enumerate(properties.items(), 2)
+    )
+    return (XML_DECLARATION + f'<Properties xmlns="{CUSTOM_PROPERTIES_NS}" '
+            f'xmlns:vt="http://schemas.openxmlformats.org/officeDocument/2006/docPropsVTypes">{items}</Properties>')
+
+DOCX_CORE_PROPERTIES = XML_DECLARATION + (
+    '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties"'
+    ' xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/"'
+    ' xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+    '<dc:title>Intune My Macs - Configuration Documentation</dc:title>'
+    '</cp:coreProperties>'
+)
+
+DOCX_APP_PROPERTIES = XML_DECLARATION + (
+    '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+    '<Application>Generate-ConfigurationDocumentation.py</Application>'
+    '</Properties>'
+)
+
+DOCX_SETTINGS = XML_DECLARATION + (
+    f'<w:settings xmlns:w="{W_NS}">'
+    '<w:defaultTabStop w:val="720"/>'
+    '<w:compat>'
+    f'<w:compatSetting w:name="compatibilityMode" w:uri="http://schemas.microsoft.com/office/word" w:val="{DOCX_COMPATIBILITY_MODE}"/>'
+    '</w:compat>'
+    '</w:settings>'
+)
+
+DOCX_NUMBERING = XML_DECLARATION + (
+    f'<w:numbering xmlns:w="{W_NS}">'
+    '<w:abstractNum w:abstractNumId="0"><w:multiLevelType w:val="singleLevel"/>'
+    '<w:lvl w:ilvl="0"><w:start w:val="1"/><w:numFmt w:val="bullet"/><w:lvlText w:val="•"/>'
+    '<w:lvlJc w:val="left"/><w:pPr><w:ind w:left="720" w:hanging="360"/></w:pPr></w:lvl>'
+    '</w:abstractNum>'
+    '<w:num w:numId="1"><w:abstractNumId w:val="0"/></w:num>'
+    '</w:numbering>'
+)
+
+DOCX_BORDER_SIDES = ("top", "left", "bottom", "right", "insideH", "insideV")
+DOCX_TABLE_BORDERS = "<w:tblBorders>" + "".join(
+    f'<w:{side} w:val="single" w:sz="6" w:space="0" w:color="000000"/>' for side in DOCX_BORDER_SIDES
+) + "</w:tblBorders>"
+
+def _docx_fonts(font: str) -> str:
+    return f'<w:rFonts w:ascii="{font}" w:hAnsi="{font}" w:eastAsia="{font}" w:cs="{font}"/>'
+
+def _docx_heading_style(level: int) -> str:
+    size = DOCX_HEADING_SIZES[level]
+    return (
+        f'<w:style w:type="paragraph" w:styleId="Heading{level}"><w:name w:val="heading {level}"/>'
+        '<w:basedOn w:val="Normal"/><w:next w:val="Normal"/><w:qFormat/>'
+        f'<w:pPr><w:keepNext/><w:keepLines/><w:spacing w:before="240" w:after="160"/><w:outlineLvl w:val="{level - 1}"/></w:pPr>'
+        f'<w:rPr><w:b/><w:bCs/><w:color w:val="{DOCX_HEADING_COLOR}"/><w:sz w:val="{size}"/><w:szCs w:val="{size}"/></w:rPr>'
+        '</w:style>'
+    )
+
+def _docx_character_style(style_id: str, name: str, size: int | None = None) -> str:
+    size_props = f'<w:sz w:val="{size}"/><w:szCs w:val="{size}"/>' if size else ""
+    return (
+        f'<w:style w:type="character" w:customStyle="1" w:styleId="{style_id}"><w:name w:val="{name}"/>'
+        f'<w:basedOn w:val="DefaultParagraphFont"/><w:rPr><w:b/><w:bCs/>{size_props}</w:rPr></w:style>'
+    )
+
+DOCX_STYLES = XML_DECLARATION + (
+    f'<w:styles xmlns:w="{W_NS}">'
+    '<w:docDefaults><w:rPrDefault><w:rPr>'
+    f'{_docx_fonts(DOCX_BODY_FONT)}<w:sz w:val="{DOCX_BODY_SIZE}"/><w:szCs w:val="{DOCX_BODY_SIZE}"/>'
+    '<w:lang w:val="en-US"/></w:rPr></w:rPrDefault>'
+    '<w:pPrDefault><w:pPr><w:spacing w:after="160" w:line="259" w:lineRule="auto"/></w:pPr></w:pPrDefault>'
+    '</w:docDefaults>'
+    '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/><w:qFormat/></w:style>'
+    + "".join(_docx_heading_style(level) for level in sorted(DOCX_HEADING_SIZES)) +
+    '<w:style w:type="paragraph" w:styleId="Compact"><w:name w:val="Compact"/><w:basedOn w:val="Normal"/>'
+    '<w:pPr><w:spacing w:before="36" w:after="36" w:line="240" w:lineRule="auto"/></w:pPr></w:style>'
+    # Paragraph styles pandoc assigns to body text
+    '<w:style w:type="paragraph" w:styleId="BodyText"><w:name w:val="Body Text"/><w:basedOn w:val="Normal"/>'
+    '<w:qFormat/><w:pPr><w:spacing w:before="180" w:after="180"/></w:pPr></w:style>'
+    '<w:style w:type="paragraph" w:customStyle="1" w:styleId="FirstParagraph"><w:name w:val="First Paragraph"/>'
+    '<w:basedOn w:val="BodyText"/><w:next w:val="BodyText"/><w:qFormat/></w:style>'
+    '<w:style w:type="paragraph" w:styleId="ListParagraph"><w:name w:val="List Paragraph"/><w:basedOn w:val="Normal"/>'
+    '<w:pPr><w:numPr><w:numId w:val="1"/></w:numPr><w:ind w:left="720" w:hanging="360"/></w:pPr></w:style>'
+    '<w:style w:type="character" w:default="1" w:styleId="DefaultParagraphFont"><w:name w:val="Default Paragraph Font"/><w:uiPriority w:val="1"/><w:semiHidden/></w:style>'
+    '<w:style w:type="character" w:styleId="Hyperlink"><w:name w:val="Hyperlink"/><w:basedOn w:val="DefaultParagraphFont"/>'
+    '<w:rPr><w:color w:val="0563C1"/><w:u w:val="single"/></w:rPr></w:style>'
+    # pandoc wraps `code` spans in Verbatim Char; they keep the surrounding font, as before
+    '<w:style w:type="character" w:customStyle="1" w:styleId="VerbatimChar"><w:name w:val="Verbatim Char"/>'
+    '<w:basedOn w:val="DefaultParagraphFont"/></w:style>'
+    + _docx_character_style("CoverTitle", "Cover Title", DOCX_COVER_HEADING_SIZES[1])
+    + _docx_character_style("CoverSubtitle", "Cover Subtitle", DOCX_COVER_HEADING_SIZES[2])
+    + _docx_character_style("CoverText", "Cover Text") +
+    '<w:style w:type="table" w:default="1" w:styleId="TableNormal"><w:name w:val="Normal Table"/><w:semiHidden/>'
+    '<w:tblPr><w:tblInd w:w="0" w:type="dxa"/><w:tblCellMar><w:top w:w="0" w:type="dxa"/><w:left w:w="108" w:type="dxa"/>'
+    '<w:bottom w:w="0" w:type="dxa"/><w:right w:w="108" w:type="dxa"/></w:tblCellMar></w:tblPr></w:style>'
+    '<w:style w:type="table" w:styleId="TableGrid"><w:name w:val="Table Grid"/><w:basedOn w:val="TableNormal"/>'
+    f'<w:pPr><w:spacing w:after="0" w:line="240" w:lineRule="auto"/></w:pPr><w:tblPr>{DOCX_TABLE_BORDERS}</w:tblPr></w:style>'
+    # pandoc's table style: the header row and value column formatting come from
+    # conditional formats (pandoc turns on firstRow and vertical banding in tblLook)
+    '<w:style w:type="table" w:styleId="Table"><w:name w:val="Table"/><w:basedOn w:val="TableNormal"/><w:qFormat/>'
+    f'<w:rPr>{_docx_fonts(DOCX_TABLE_FONT)}<w:sz w:val="{DOCX_TABLE_SIZE}"/><w:szCs w:val="{DOCX_TABLE_SIZE}"/></w:rPr>'
+    f'<w:tblPr><w:tblStyleColBandSize w:val="1"/>{DOCX_TABLE_BORDERS}</w:tblPr>'
+    '<w:tblStylePr w:type="band2Vert"><w:rPr><w:b/><w:bCs/></w:rPr></w:tblStylePr>'
+    '<w:tblStylePr w:type="firstRow"><w:rPr><w:b/><w:bCs/></w:rPr>'
+    f'<w:tcPr><w:shd w:val="clear" w:color="auto" w:fill="{DOCX_HEADER_FILL}"/></w:tcPr></w:tblStylePr>'
+    '</w:style>'
+    '</w:styles>'
+)
+
+DOCX_DOCUMENT_START = XML_DECLARATION + f'<w:document xmlns:w="{W_NS}" xmlns:r="{R_NS}"><w:body>'
+DOCX_DOCUMENT_END = (
+    '<w:sectPr><w:pgSz w:w="12240" w:h="15840"/>'
+    '<w:pgMar w:top="1440" w:right="1440" w:bottom="1440" w:left="1440" w:header="720" w:footer="720" w:gutter="0"/>'
+    '</w:sectPr></w:body></w:document>'
+)
+
+# **bold**, `code` and [text](#anchor) spans; everything else is plain text.
+DOCX_INLINE_RE = re.compile(r"\*\*(.+?)\*\*|`([^`]+)`|\[([^\]]+)\]\(#([^)\s]+)\)")
+# Characters that are not allowed in XML 1.0 documents.
+XML_INVALID_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+TABLE_SEPARATOR_RE = re.compile(r"^\s*\|[\s:|-]+\|?\s*$")
+
+def docx_escape(text: str) -> str:
+    """Escape text for use in WordprocessingML character data or attributes."""
+    text = XML_INVALID_RE.sub("", text)
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+def heading_anchor(text: str) -> str:
+    """Bookmark name for a heading, following pandoc's auto-identifier rules (see anchor_for())."""
+    anchor = re.sub(r"[^\w\s.-]", "", text.lower())
+    anchor = re.sub(r"\s+", "-", anchor.strip())
+    return re.sub(r"^[^a-z]+", "", anchor)
+
+def docx_run(text: str, bold: bool = False, size: int | None = None, font: str | None = None,
+             style: str | None = None) -> str:
+    """One <w:r> with direct formatting (element order follows the CT_RPr schema)."""
+    props = []
+    if style:
+        props.append(f'<w:rStyle w:val="{style}"/>')
+    if font:
+        props.append(_docx_fonts(font))
+    if bold:
+        props.append("<w:b/><w:bCs/>")
+    if size:
+        props.append(f'<w:sz w:val="{size}"/><w:szCs w:val="{size}"/>')
+    rpr = f"<w:rPr>{''.join(props)}</w:rPr>" if props else ""
+    return f'<w:r>{rpr}<w:t xml:space="preserve">{docx_escape(text)}</w:t></w:r>'
+
+def docx_inline(text: str, bold: bool = False, size: int | None = None, font: str | None = None) -> str:
+    """Runs for a line of markdown text: bold spans, code spans (backticks dropped) and internal links."""
+    runs: List[str] = []
+    pos = 0
+    for m in DOCX_INLINE_RE.finditer(text):
+        if m.start() > pos:
+            runs.append(docx_run(text[pos:m.start()], bold, size, font))
+        strong, code, label, anchor = m.groups()
+        if strong is not None:
+            runs.append(docx_run(strong.replace("`", ""), True, size, font))
+        elif code is not None:
+            runs.append(docx_run(code, bold, size, font))
+        else:
+            link = docx_run(label, bold, size, font, style="Hyperlink")
+            runs.append(f'<w:hyperlink w:anchor="{docx_escape(anchor)}" w:history="1">{link}</w:hyperlink>')
+        pos = m.end()
+    if pos < len(text):
+        runs.append(docx_run(text[pos:], bold, size, font))
+    return "".join(runs)
+
+# Fixed member timestamps keep a package's bytes a function of its content alone
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+def zip_member(name: str) -> zipfile.ZipInfo:
+    import zipfile
+    info = zipfile.ZipInfo(name, date_time=ZIP_EPOCH)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    return info
+
+@functools.lru_cache(maxsize=None)
+def generator_digest() -> str:
+    """Hash of this script, so converted outputs are rebuilt whenever the converter code changes."""
+    return hashlib.blake2b(pathlib.Path(__file__).read_bytes(), digest_size=16).hexdigest()
+
+def docx_source_digest(converter: str, markdown: Iterable[str]) -> str:
+    """Identify a DOCX build: the converter, this script and the markdown text it was made from."""
+    h = hashlib.blake2b(f"{converter}\0{generator_digest()}\0".encode("utf-8"), digest_size=16)
+    for chunk in markdown:
+        h.update(chunk.encode("utf-8"))
+    return h.hexdigest()
+
+def read_docx_source_digest(path: pathlib.Path) -> str | None:
+    """The DOCX_SOURCE_PROPERTY recorded in an existing DOCX, or None."""
+    import xml.etree.ElementTree as ET
+    import zipfile
+    try:
+        with zipfile.ZipFile(path) as package:
+            root = ET.fromstring(package.read("docProps/custom.xml"))
+    except (OSError, KeyError, zipfile.BadZipFile, ET.ParseError):
+        return None
+    for prop in root.iter(f"{{{CUSTOM_PROPERTIES_NS}}}property"):
+        if prop.get("name") == DOCX_SOURCE_PROPERTY:
+            return "".join(prop.itertext()).strip()
+    return None
+
+def split_table_row(line: str) -> List[str]:
+    """Cells of a markdown table row (same splitting the markdown renderer relies on)."""
+    return [c.strip('| ').strip() for c in line.split('|') if c]
+
+class DocxWriter:
+    """Stream markdown lines into a .docx package without building an object model.
+
+    The static parts (styles, settings, numbering, relationships) are written up front;
+    document.xml is then written through a zip entry stream one block at a time, so
+    memory use does not grow with the size of the document. Tables are emitted row by
+    row as their lines arrive.
     """
+
+    def __init__(self, path: pathlib.Path, source_digest: str = ""):
+        import zipfile
+        self.path = path
+        self.tmp = path.with_name(f".{path.name}.tmp")
+        self.zip = zipfile.ZipFile(self.tmp, "w", compression=zipfile.ZIP_DEFLATED)
+        parts = [("[Content_Types].xml", DOCX_CONTENT_TYPES), ("_rels/.rels", DOCX_PACKAGE_RELS),
+                 ("docProps/core.xml", DOCX_CORE_PROPERTIES), ("docProps/app.xml", DOCX_APP_PROPERTIES),
+                 ("word/_rels/document.xml.rels", DOCX_DOCUMENT_RELS), ("word/styles.xml", DOCX_STYLES),
+                 ("word/settings.xml", DOCX_SETTINGS), ("word/numbering.xml", DOCX_NUMBERING)]
+        if source_digest:
+            parts[0] = (parts[0][0], DOCX_CONTENT_TYPES.replace("</Types>", DOCX_CUSTOM_PROPERTIES_TYPE + "</Types>"))
+            parts[1] = (parts[1][0], DOCX_PACKAGE_RELS.replace("</Relationships>", DOCX_CUSTOM_PROPERTIES_REL + "</Relationships>"))
+            parts.append(("docProps/custom.xml", docx_custom_properties({DOCX_SOURCE_PROPERTY: source_digest})))
+        for name, data in parts:
+            self.zip.writestr(zip_member(name), data)
+        self.out = io.TextIOWrapper(self.zip.open(zip_member("word/document.xml"), "w"), encoding="utf-8")
+        self.out.write(DOCX_DOCUMENT_START)
+        self.h1_count = 0
+        self.bookmarks = 0
+        self.tables = 0
+        self.table_columns = 0  # > 0 while inside a table
+        self.table_rows = 0
+        self.fence: str | None = None  # info string of an open ``` block
+        self.pending: List[str] = []  # runs of the paragraph being collected
+
+    @property
+    def on_cover(self) -> bool:
+        # Everything up to the second H1 is the cover page
+        return self.h1_count <= 1
+
+    def feed(self, line: str) -> None:
+        """Convert one markdown line (without its newline)."""
+        line = line.rstrip("\r\n")
+        if self.fence is not None:
+            if line.startswith("```"):
+                self.fence = None
+            elif self.fence == "{=openxml}":
+                self.out.write(line)  # raw OpenXML passthrough, as pandoc does
+            else:
+                self.paragraph(docx_run(line, font=DOCX_TABLE_FONT, size=DOCX_TABLE_SIZE), style="Compact")
+            return
+        if line.lstrip().startswith("|") and not self.pending:
+            self.table_row(line)
+            return
+        self.end_table()
+        if not line.strip():
+            self.end_paragraph()
+        elif line.startswith("```"):
+            self.end_paragraph()
+            self.fence = line[3:].strip()
+        elif line.startswith("#"):
+            level = len(line) - len(line.lstrip("#"))
+            if 1 <= level <= 3 and line[level:level + 1] == " ":
+                self.end_paragraph()
+                self.heading(line[level + 1:].strip(), level)
+            else:
+                self.text(line)
+        elif line.startswith("---") and not line.strip("-"):
+            self.end_paragraph()
+            self.out.write('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+        elif line.startswith(("- ", "* ")):
+            self.end_paragraph()
+            self.paragraph(docx_inline(line[2:].strip(), bold=self.on_cover), style="ListParagraph")
+        else:
+            self.text(line)
+
+    def text(self, line: str) -> None:
+        """Collect a text line; consecutive lines form one paragraph, a trailing double space breaks the line."""
+        if self.pending and not self.pending[-1].endswith("<w:br/></w:r>"):
+            self.pending.append(docx_run(" ", self.on_cover))
+        self.pending.append(docx_inline(line.strip(), bold=self.on_cover))
+        if line.endswith("  "):
+            self.pending.append("<w:r><w:br/></w:r>")
+
+    def end_paragraph(self) -> None:
+        if self.pending:
+            if self.pending[-1] == "<w:r><w:br/></w:r>":
+                self.pending.pop()
+            self.paragraph("".join(self.pending))
+            self.pending = []
+
+    def paragraph(self, runs: str, style: str | None = None, page_break: bool = False) -> None:
+        props = ""
+        if style:
+            props += f'<w:pStyle w:val="{style}"/>'
+        if page_break:
+            props += "<w:pageBreakBefore/>"
+        self.out.write(f"<w:p><w:pPr>{props}</w:pPr>{runs}</w:p>" if props else f"<w:p>{runs}</w:p>")
+
+    def heading(self, text: str, level: int) -> None:
+        if level == 1:
+            self.h1_count += 1
+        # Cover, About, Index and Detailed Configuration each start on a new page
+        page_break = level == 1 and self.h1_count > 1
+        size = DOCX_COVER_HEADING_SIZES.get(level) if self.on_cover else None
+        self.bookmarks += 1
+        runs = (f'<w:bookmarkStart w:id="{self.bookmarks}" w:name="{docx_escape(heading_anchor(text))}"/>'
+                f'{docx_inline(text, size=size)}<w:bookmarkEnd w:id="{self.bookmarks}"/>')
+        self.paragraph(runs, style=f"Heading{level}", page_break=page_break)
+
+    def table_row(self, line: str) -> None:
+        if self.table_columns and self.table_rows == 1 and TABLE_SEPARATOR_RE.match(line):
+            return
+        cells = split_table_row(line)
+        if not self.table_columns:
+            self.start_table(cells)
+            return
+        # Pad short rows; fold overflow (an unescaped '|' inside a value) back into the last cell
+        if len(cells) > self.table_columns:
+            cells[self.table_columns - 1:] = [" | ".join(cells[self.table_columns - 1:])]
+        cells += [""] * (self.table_columns - len(cells))
+        self.out.write("<w:tr>")
+        for ci, cell in enumerate(cells):
+            runs = docx_inline(cell.replace("`", ""), bold=ci == DOCX_BOLD_COLUMN, size=DOCX_TABLE_SIZE, font=DOCX_TABLE_FONT)
+            self.out.write(f'<w:tc><w:p><w:pPr><w:pStyle w:val="Compact"/></w:pPr>{runs}</w:p></w:tc>')
+        self.out.write("</w:tr>")
+        self.table_rows += 1
+
+    def start_table(self, headers: List[str]) -> None:
+        self.tables += 1
+        self.table_columns = max(len(headers), 1)
+        self.table_rows = 1
+        self.out.write(
+            '<w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/><w:tblW w:w="0" w:type="auto"/>'
+            f'{DOCX_TABLE_BORDERS}<w:tblLayout w:type="autofit"/>'
+            '<w:tblLook w:val="04A0" w:firstRow="1" w:lastRow="0" w:firstColumn="1" w:lastColumn="0" w:noHBand="0" w:noVBand="1"/>'
+            '</w:tblPr><w:tblGrid>' + "<w:gridCol/>" * self.table_columns + '</w:tblGrid>'
+            '<w:tr><w:trPr><w:tblHeader/></w:trPr>'
+        )
+        for header in headers or [""]:
+            self.out.write(
+                f'<w:tc><w:tcPr><w:shd w:val="clear" w:color="auto" w:fill="{DOCX_HEADER_FILL}"/></w:tcPr>'
+                f'<w:p><w:pPr><w:pStyle w:val="Compact"/></w:pPr>'
+                f'{docx_run(header, True, DOCX_TABLE_SIZE, DOCX_TABLE_FONT)}</w:p></w:tc>'
+            )
+        self.out.write("</w:tr>")
+
+    def end_table(self) -> None:
+        if self.table_columns:
+            self.out.write("</w:tbl>")
+            self.table_columns = 0
+
+    def close(self) -> None:
+        if self.fence == "{=openxml}":
+            self.fence = None
+        self.end_paragraph()
+        self.end_table()
+        self.out.write(DOCX_DOCUMENT_END)
+        self.out.close()
+        self.zip.close()
+        os.replace(self.tmp, self.path)
+
+    def __enter__(self) -> "DocxWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.out.close()
+            self.zip.close()
+            self.tmp.unlink(missing_ok=True)
+
+def markdown_to_docx(markdown: str | Iterable[str], docx_path: pathlib.Path) -> None:
+    """Convert the generated markdown (a string or an iterable of lines, e.g. an open file) to DOCX.
+
+    Handles headings, paragraphs, bullet lists, bold/code spans, internal links and
+    tables; see DocxWriter. Needs no third-party packages.
+    """
+    lines = markdown.splitlines() if isinstance(markdown, str) else markdown
+    with DocxWriter(docx_path) as writer:
+        for line in lines:
+            writer.feed(line)
+    print(f"[INFO] Wrote DOCX to {docx_path} ({writer.tables} tables)")
+
+class DocxRenderer(MarkdownRenderer):
+    """The native DOCX document, converted from the markdown text without a file in between."""
+
+    name = "docx"
+
+    def write_document(self) -> None:
+        digest = docx_source_digest("native", self.document())
+        if read_docx_source_digest(self.path) == digest:
+            print(f"[INFO] DOCX unchanged: {self.path}")
+            return
+        with DocxWriter(self.path, digest) as writer:
+            for line in self.document_lines():
+                writer.feed(line)
+        self.changed = True
+        print(f"[INFO] Wrote DOCX to {self.path} ({writer.tables} tables)")
+
+PANDOC_REFERENCE_PREFIX = "reference-"
+# pandoc only gives pipe tables fixed relative column widths when a source line is
+# longer than --columns; keeping every table under the limit leaves them autofit.
+PANDOC_COLUMNS = 1_000_000
+
+def add_cover_styles_for_docx(markdown: str) -> str:
+    """Tag the cover page (everything before the second H1) with the Cover character styles.
+
+    Like add_page_breaks_for_docx(), this only shapes the markdown handed to pandoc.
+    """
+    end = markdown.find("\n# ", markdown.find("# ") + 1)
+    if end < 0:
+        return markdown
+    lines = []
+    in_fence = False
+    for line in markdown[:end].split("\n"):
+        if line.startswith("```"):
+            in_fence = not in_fence
+        elif in_fence:
+            pass
+        elif line.startswith("# "):
+            line = f'# [{line[2:].strip()}]{{custom-style="Cover Title"}}'
+        elif line.startswith("## "):
+            line = f'## [{line[3:].strip()}]{{custom-style="Cover Subtitle"}}'
+        elif line.strip() and not line.startswith("#"):
+            line = f'[{line.strip()}]{{custom-style="Cover Text"}}'
+        lines.append(line)
+    return "\n".join(lines) + markdown[end:]
+
+def pandoc_reference_doc() -> pathlib.Path:
+    """Return the styled reference.docx handed to pandoc, building it when the styles change.
+
+    It is the native writer's package with an empty body, so both DOCX paths share one
+    set of styles. Cached in CACHE_DIR under a hash of the style and settings parts.
+    """
+    key = entry_digest(DOCX_STYLES, DOCX_SETTINGS, DOCX_NUMBERING)
+    path = CACHE_DIR / f"{PANDOC_REFERENCE_PREFIX}{key}.docx"
+    if path.exists():
+        return path
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    for stale in CACHE_DIR.glob(f"{PANDOC_REFERENCE_PREFIX}*.docx"):
+        stale.unlink(missing_ok=True)
+    DocxWriter(path).close()
+    return path
+
+def pandoc_to_docx(markdown: str, docx_path: pathlib.Path, pandoc_exe: str) -> bool:
+    """Convert markdown with pandoc, styled entirely by the reference document (no post-processing).
+
+    pandoc is not run when ``docx_path`` was already built by pandoc from the same
+    markdown (see docx_source_digest()). Returns whether the DOCX was written.
+    """
+    import subprocess
+    digest = docx_source_digest("pandoc", [markdown])
+    if read_docx_source_digest(docx_path) == digest:
+        print(f"[INFO] DOCX unchanged, skipping pandoc: {docx_path}")
+        return False
+    source = add_cover_styles_for_docx(add_page_breaks_for_docx(markdown))
+    tmp_path = docx_path.with_name(f".{docx_path.name}.tmp")
+    cmd = [pandoc_exe, "-f", "markdown", "-t", "docx", "-o", str(tmp_path), "--standalone",
+           f"--reference-doc={pandoc_reference_doc()}", f"--columns={PANDOC_COLUMNS}",
+           f"--metadata={DOCX_SOURCE_PROPERTY}:{digest}"]
+    print(f"[INFO] Running pandoc: {' '.join(cmd)}")
     try:
-        from docx import Document
-    except ImportError:
-        print("[WARN] python-docx not installed; skipping DOCX generation")
-        return
+        subprocess.run(cmd, input=source.encode("utf-8"), check=True)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, docx_path)
+    print(f"[INFO] Wrote DOCX via pandoc to {docx_path}")
+    return True
+
+HTML_STYLE = (
+    f"body{{font-family:{DOCX_BODY_FONT},'Segoe UI',Helvetica,Arial,sans-serif;font-size:11pt;"
+    "max-width:64em;margin:2em auto;padding:0 1em;line-height:1.4}"
+    f"h1,h2,h3{{color:#{DOCX_HEADING_COLOR}}}"
+    f"table{{border-collapse:collapse;margin:0.5em 0;font:8pt '{DOCX_TABLE_FONT}',monospace}}"
+    "th,td{border:1px solid #000;padding:2px 6px;text-align:left;vertical-align:top}"
+    f"th{{background:#{DOCX_HEADER_FILL}}}"
+    f"td:nth-child({DOCX_BOLD_COLUMN + 1}){{font-weight:bold}}"
+    f"pre{{font:8pt '{DOCX_TABLE_FONT}',monospace;white-space:pre-wrap}}"
+    "hr{border:0;border-top:1px solid #999;margin:2em 0}"
+)
+HTML_DOCUMENT_START = (
+    '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+    "<title>Intune My Macs - Configuration Documentation</title>\n"
+    f"<style>{HTML_STYLE}</style>\n</head>\n<body>\n"
+)
+HTML_DOCUMENT_END = "</body>\n</html>\n"
+
+def html_inline(text: str) -> str:
+    """HTML for a line of markdown text: bold spans, code spans and internal links."""
+    parts: List[str] = []
+    pos = 0
+    for m in DOCX_INLINE_RE.finditer(text):
+        parts.append(docx_escape(text[pos:m.start()]))
+        strong, code, label, anchor = m.groups()
+        if strong is not None:
+            parts.append(f"<strong>{html_inline(strong)}</strong>")
+        elif code is not None:
+            parts.append(f"<code>{docx_escape(code)}</code>")
+        else:
+            parts.append(f'<a href="#{docx_escape(anchor)}">{docx_escape(label)}</a>')
+        pos = m.end()
+    parts.append(docx_escape(text[pos:]))
+    return "".join(parts)
+
+class HtmlWriter:
+    """Stream markdown lines into a standalone HTML page (inline stylesheet, no external assets).
+
+    Follows DocxWriter line for line: the same block rules, heading ids matching the
+    DOCX bookmarks (so the index links work), bold value column and shaded table
+    headers. Raw OpenXML fences are dropped.
+    """
+
+    def __init__(self, out: Any):
+        self.out = out
+        self.out.write(HTML_DOCUMENT_START)
+        self.tables = 0
+        self.table_columns = 0  # > 0 while inside a table
+        self.table_rows = 0
+        self.fence: str | None = None  # info string of an open ``` block
+        self.pending: List[str] = []  # lines of the paragraph being collected
+        self.in_list = False
+
+    def feed(self, line: str) -> None:
+        """Convert one markdown line (without its newline)."""
+        line = line.rstrip("\r\n")
+        if self.fence is not None:
+            if line.startswith("```"):
+                if self.fence != "{=openxml}":
+                    self.out.write("</pre>\n")
+                self.fence = None
+            elif self.fence != "{=openxml}":
+                self.out.write(docx_escape(line) + "\n")
+            return
+        if line.lstrip().startswith("|") and not self.pending:
+            self.end_list()
+            self.table_row(line)
+            return
+        self.end_table()
+        if not line.strip():
+            self.end_block()
+        elif line.startswith("```"):
+            self.end_block()
+            self.fence = line[3:].strip()
+            if self.fence != "{=openxml}":
+                self.out.write("<pre>")
+        elif line.startswith("#"):
+            level = len(line) - len(line.lstrip("#"))
+            if 1 <= level <= 3 and line[level:level + 1] == " ":
+                self.end_block()
+                text = line[level + 1:].strip()
+                self.out.write(f'<h{level} id="{docx_escape(heading_anchor(text))}">{html_inline(text)}</h{level}>\n')
+            else:
+                self.text(line)
+        elif line.startswith("---") and not line.strip("-"):
+            self.end_block()
+            self.out.write("<hr>\n")
+        elif line.startswith(("- ", "* ")):
+            self.end_paragraph()
+            if not self.in_list:
+                self.out.write("<ul>\n")
+                self.in_list = True
+            self.out.write(f"<li>{html_inline(line[2:].strip())}</li>\n")
+        else:
+            self.end_list()
+            self.text(line)
 
-    document = Document()
-    lines = md_text.splitlines()
-    table_buffer: List[List[str]] = []
+    def text(self, line: str) -> None:
+        """Collect a text line; consecutive lines form one paragraph, a trailing double space breaks the line."""
+        self.pending.append(html_inline(line.strip()) + ("<br>" if line.endswith("  ") else ""))
 
-    def flush_table():
-        nonlocal table_buffer
-        if not table_buffer:
+    def end_paragraph(self) -> None:
+        if self.pending:
+            text = " ".join(self.pending)
+            self.out.write(f"<p>{text[:-4] if text.endswith('<br>') else text}</p>\n")
+            self.pending = []
+
+    def end_list(self) -> None:
+        if self.in_list:
+            self.out.write("</ul>\n")
+            self.in_list = False
+
+    def end_block(self) -> None:
+        self.end_paragraph()
+        self.end_list()
+
+    def table_row(self, line: str) -> None:
+        if self.table_columns and self.table_rows == 1 and TABLE_SEPARATOR_RE.match(line):
             return
-        headers = []
-        if len(table_buffer) >= 2 and set(table_buffer[1][0]) == {'-'}:
-            headers = table_buffer[0]
-            data_rows = table_buffer[2:]
+        cells = split_table_row(line)
+        if not self.table_columns:
+            self.tables += 1
+            self.table_columns = max(len(cells), 1)
+            self.table_rows = 1
+            headers = "".join(f"<th>{docx_escape(c)}</th>" for c in cells or [""])
+            self.out.write(f"<table>\n<thead><tr>{headers}</tr></thead>\n<tbody>\n")
+            return
+        # Same padding and overflow folding as DocxWriter.table_row()
+        if len(cells) > self.table_columns:
+            cells[self.table_columns - 1:] = [" | ".join(cells[self.table_columns - 1:])]
+        cells += [""] * (self.table_columns - len(cells))
+        self.out.write("<tr>" + "".join(f"<td>{html_inline(c.replace('`', ''))}</td>" for c in cells) + "</tr>\n")
+        self.table_rows += 1
+
+    def end_table(self) -> None:
+        if self.table_columns:
+            self.out.write("</tbody>\n</table>\n")
+            self.table_columns = 0
+
+    def close(self) -> None:
+        if self.fence is not None and self.fence != "{=openxml}":
+            self.out.write("</pre>\n")
+        self.fence = None
+        self.end_block()
+        self.end_table()
+        self.out.write(HTML_DOCUMENT_END)
+
+class HtmlRenderer(MarkdownRenderer):
+    """The documentation as one standalone HTML page (see HtmlWriter)."""
+
+    name = "html"
+
+    def write_document(self) -> None:
+        def write(out: Any) -> None:
+            writer = HtmlWriter(out)
+            for line in self.document_lines():
+                writer.feed(line)
+            writer.close()
+        self.write_text(write)
+        print(f"[INFO] Wrote HTML to {self.path}" if self.changed else f"[INFO] HTML unchanged: {self.path}")
+
+SETTINGS_COLUMNS = ("Ref", "Type", "Name", "SourceFile", "Setting", "Value", "RawValue")
+ARTIFACT_COLUMNS = ("Ref", "Type", "Name", "SourceFile", "Settings", "Description")
+
+def _catalog_text(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=_catalog_default)
+
+def setting_rows(e: Artifact) -> Iterator[Tuple[str, ...]]:
+    """One SETTINGS_COLUMNS row per setting of an entry; RawValue is empty unless normalization changed it."""
+    head = (e.ref, e.type, e.name or "", e.relpath)
+    for key, value, raw in e.settings:
+        yield head + (key, value, "" if raw is None else _catalog_text(raw))
+
+class CsvRenderer(Renderer):
+    """Every setting of every entry as one CSV row (SETTINGS_COLUMNS), for spreadsheets and diffing."""
+
+    name = "csv"
+
+    def __init__(self, path: pathlib.Path):
+        import csv
+        super().__init__(path)
+        self.rows = 0
+        self._tmp = path.with_name(f".{path.name}.tmp")
+        self._file = self._tmp.open("w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(SETTINGS_COLUMNS)
+
+    def add(self, e: Artifact) -> None:
+        rows = list(setting_rows(e))
+        self._writer.writerows(rows)
+        self.rows += len(rows)
+
+    def close(self) -> None:
+        self._file.close()
+        written = replace_if_changed(self._tmp, self.path)
+        print(f"[INFO] {'Wrote' if written else 'Unchanged:'} {self.rows} settings in {self.path}")
+
+    def abort(self) -> None:
+        self._file.close()
+        self._tmp.unlink(missing_ok=True)
+
+SML_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+XLSX_MAX_CELL = 32767  # characters Excel accepts in one cell
+XLSX_COLUMN_WIDTHS = {"Ref": 18, "Type": 22, "Name": 40, "SourceFile": 48, "Setting": 60, "Value": 40,
+                      "RawValue": 30, "Settings": 10, "Description": 80}
+
+XLSX_CONTENT_TYPES = XML_DECLARATION + (
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet2.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+XLSX_PACKAGE_RELS = XML_DECLARATION + (
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+XLSX_WORKBOOK = XML_DECLARATION + (
+    f'<workbook xmlns="{SML_NS}" xmlns:r="{R_NS}"><sheets>'
+    '<sheet name="Settings" sheetId="1" r:id="rId1"/>'
+    '<sheet name="Artifacts" sheetId="2" r:id="rId2"/>'
+    '</sheets></workbook>'
+)
+
+XLSX_WORKBOOK_RELS = XML_DECLARATION + (
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet2.xml"/>'
+    '<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+# Style 1 is the header row: bold on the same grey as the DOCX table headers
+XLSX_STYLES = XML_DECLARATION + (
+    f'<styleSheet xmlns="{SML_NS}">'
+    f'<fonts count="2"><font><sz val="11"/><name val="{DOCX_BODY_FONT}"/></font>'
+    f'<font><b/><sz val="11"/><name val="{DOCX_BODY_FONT}"/></font></fonts>'
+    '<fills count="3"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill>'
+    f'<fill><patternFill patternType="solid"><fgColor rgb="FF{DOCX_HEADER_FILL}"/><bgColor indexed="64"/></patternFill></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="2" borderId="0" xfId="0" applyFont="1" applyFill="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+def xlsx_column(index: int) -> str:
+    """Spreadsheet column letters for a 0-based column index (0 -> A, 26 -> AA)."""
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+def xlsx_cell(value: Any, style: int = 0) -> str:
+    """One cell: integers as numbers, everything else as an inline string cut to XLSX_MAX_CELL."""
+    attrs = f' s="{style}"' if style else ""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return f"<c{attrs}><v>{value}</v></c>"
+    text = str(value)[:XLSX_MAX_CELL]
+    return f'<c{attrs} t="inlineStr"><is><t xml:space="preserve">{docx_escape(text)}</t></is></c>'
+
+def xlsx_row(values: Iterable[Any], style: int = 0) -> str:
+    return f'<row>{"".join(xlsx_cell(v, style) for v in values)}</row>'
+
+def xlsx_sheet_start(columns: Tuple[str, ...]) -> str:
+    """Worksheet XML up to the header row: frozen first row and column widths."""
+    widths = "".join(f'<col min="{i}" max="{i}" width="{XLSX_COLUMN_WIDTHS.get(name, 20)}" customWidth="1"/>'
+                     for i, name in enumerate(columns, 1))
+    return (XML_DECLARATION + f'<worksheet xmlns="{SML_NS}">'
+            '<sheetViews><sheetView workbookViewId="0">'
+            '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>'
+            f'<cols>{widths}</cols><sheetData>{xlsx_row(columns, style=1)}')
+
+def xlsx_sheet_end(columns: Tuple[str, ...], rows: int) -> str:
+    return f'</sheetData><autoFilter ref="A1:{xlsx_column(len(columns) - 1)}{rows + 1}"/></worksheet>'
+
+class XlsxRenderer(Renderer):
+    """A workbook with a Settings sheet (SETTINGS_COLUMNS) and an Artifacts sheet (ARTIFACT_COLUMNS).
+
+    Written as SpreadsheetML with inline strings, so no shared-string table has to be
+    held in memory: the Settings sheet is streamed straight into its zip entry, and the
+    Artifacts rows (a zip file takes one open entry at a time) are spooled to a
+    temporary file and copied in on ``close()``.
+    """
+
+    name = "xlsx"
+
+    def __init__(self, path: pathlib.Path):
+        import tempfile
+        import zipfile
+        super().__init__(path)
+        self.rows = 0
+        self.artifacts = 0
+        self._tmp = path.with_name(f".{path.name}.tmp")
+        self.zip = zipfile.ZipFile(self._tmp, "w", compression=zipfile.ZIP_DEFLATED)
+        for name, data in (("[Content_Types].xml", XLSX_CONTENT_TYPES), ("_rels/.rels", XLSX_PACKAGE_RELS),
+                           ("xl/workbook.xml", XLSX_WORKBOOK), ("xl/_rels/workbook.xml.rels", XLSX_WORKBOOK_RELS),
+                           ("xl/styles.xml", XLSX_STYLES)):
+            self.zip.writestr(zip_member(name), data)
+        self.out = io.TextIOWrapper(self.zip.open(zip_member("xl/worksheets/sheet1.xml"), "w"), encoding="utf-8")
+        self.out.write(xlsx_sheet_start(SETTINGS_COLUMNS))
+        self.spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+
+    def add(self, e: Artifact) -> None:
+        for row in setting_rows(e):
+            self.out.write(xlsx_row(row))
+            self.rows += 1
+        self.spool.write(xlsx_row((e.ref, e.type, e.name or "", e.relpath, e.count, e.description)))
+        self.artifacts += 1
+
+    def close(self) -> None:
+        import shutil
+        self.out.write(xlsx_sheet_end(SETTINGS_COLUMNS, self.rows))
+        self.out.close()
+        with io.TextIOWrapper(self.zip.open(zip_member("xl/worksheets/sheet2.xml"), "w"), encoding="utf-8") as out:
+            out.write(xlsx_sheet_start(ARTIFACT_COLUMNS))
+            self.spool.seek(0)
+            shutil.copyfileobj(self.spool, out)
+            out.write(xlsx_sheet_end(ARTIFACT_COLUMNS, self.artifacts))
+        self.spool.close()
+        self.zip.close()
+        written = replace_if_changed(self._tmp, self.path)
+        print(f"[INFO] {'Wrote' if written else 'Unchanged:'} {self.rows} settings from {self.artifacts} artifacts in {self.path}")
+
+    def abort(self) -> None:
+        self.spool.close()
+        with contextlib.suppress(Exception):
+            self.out.close()
+            self.zip.close()
+        self._tmp.unlink(missing_ok=True)
+
+# Entries buffered per renderer thread; bounds how far the fastest writer can run ahead
+RENDER_QUEUE_SIZE = 256
+_RENDER_DONE = object()
+_RENDER_ABORT = object()
+
+def _render_worker(renderer: Renderer, inbox: "queue.Queue[Any]", metrics: RunMetrics,
+                   errors: List[BaseException]) -> None:
+    """Thread body for render_entries(): feed queued entries to ``renderer`` until a sentinel arrives."""
+    clock = time.perf_counter
+    busy = 0.0
+    item: Any = None
+    try:
+        while True:
+            item = inbox.get()
+            if item is _RENDER_DONE or item is _RENDER_ABORT:
+                break
+            start = clock()
+            renderer.add(item)
+            busy += clock() - start
+        start = clock()
+        if item is _RENDER_DONE:
+            renderer.close()
         else:
-            headers = table_buffer[0]
-            data_rows = table_buffer[1:]
-        tbl = document.add_table(rows=1, cols=len(headers))
+            renderer.abort()
+        busy += clock() - start
+    except BaseException as exc:
+        errors.append(exc)
+        with contextlib.suppress(Exception):
+            renderer.abort()
+        # Keep taking entries so the producer never blocks on a full queue
+        while item is not _RENDER_DONE and item is not _RENDER_ABORT:
+            item = inbox.get()
+    metrics.add_time(f"render_{renderer.name}", busy)
+
+def render_entries(entries: Iterable[Artifact], renderers: List[Renderer],
+                   metrics: RunMetrics | None = None, threads: bool = True) -> int:
+    """Feed one pass over ``entries`` to every renderer, close them and return the entry count.
+
+    With several renderers each runs on a thread of its own behind a bounded queue, so
+    the slower writers (DOCX, XLSX compression, file I/O) overlap with parsing and with
+    each other instead of each needing its own pass. ``threads=False`` (or a single
+    renderer) runs them in turn on the calling thread, which is what cProfile sees.
+    If anything fails the renderers are aborted, leaving no partial outputs, and the
+    first error is raised. Time spent in each renderer is charged to stage ``render_<name>``.
+    """
+    if metrics is None:
+        metrics = RunMetrics(False)
+    if len(renderers) == 1 or not threads:
+        clock = time.perf_counter
+        busy = [0.0] * len(renderers)
+        count = 0
         try:
-            tbl.style = 'Table Grid'
-        except Exception:
-            pass  # style may not exist in some environments
-        # Header formatting
-        from docx.shared import Pt
-        from docx.oxml import OxmlElement
-        from docx.oxml.ns import qn
-        for i, h in enumerate(headers):
-            cell = tbl.rows[0].cells[i]
-            cell.text = h.strip('| ').strip()
-            for p in cell.paragraphs:
-                for run in p.runs:
-                    run.font.bold = True
-                    run.font.size = Pt(9)
-        # Apply shading to header row (light gray)
-        hdr_tr = tbl.rows[0]._tr
-        for tc in hdr_tr.tc_lst:
-            tcPr = tc.get_or_add_tcPr()
-            shd = OxmlElement('w:shd')
-            shd.set(qn('w:val'), 'clear')
-            shd.set(qn('w:color'), 'auto')
-            shd.set(qn('w:fill'), 'D9D9D9')  # light gray
-            tcPr.append(shd)
-        # Data rows
-        for r in data_rows:
-            row = tbl.add_row()
-            for i, c in enumerate(r):
-                cell = row.cells[i]
-                text = c.strip('| ').strip()
-                # Remove backticks for cleaner display
-                text = text.replace('`', '')
-                cell.text = text
-                for p in cell.paragraphs:
-                    for run in p.runs:
-                        run.font.size = Pt(9)
-                        # Monospace for first column (Key)
-                        if i == 0:
-                            run.font.name = 'Courier New'
-        # Auto-fit attempt (not always respected)
-        for col in tbl.columns:
-            for cell in col.cells:
-                for p in cell.paragraphs:
-                    for run in p.runs:
-                        if run.font.size is None:
-                            run.font.size = Pt(9)
-        table_buffer = []
-
-    for line in lines:
-        if re.match(r'^\s*\|', line):
-            # Part of a table
-            table_buffer.append([c for c in line.split('|') if c])
-            continue
+            for e in entries:
+                for i, renderer in enumerate(renderers):
+                    start = clock()
+                    renderer.add(e)
+                    busy[i] += clock() - start
+                count += 1
+            for i, renderer in enumerate(renderers):
+                start = clock()
+                renderer.close()
+                busy[i] += clock() - start
+        except BaseException:
+            for renderer in renderers:
+                with contextlib.suppress(Exception):
+                    renderer.abort()
+            raise
+        finally:
+            for renderer, seconds in zip(renderers, busy):
+                metrics.add_time(f"render_{renderer.name}", seconds)
+        return count
+
+    import queue
+    import threading
+    inboxes: List["queue.Queue[Any]"] = [queue.Queue(RENDER_QUEUE_SIZE) for _ in renderers]
+    errors: List[BaseException] = []
+    threads = [threading.Thread(target=_render_worker, args=(r, q, metrics, errors), name=f"render-{r.name}", daemon=True)
+               for r, q in zip(renderers, inboxes)]
+    for thread in threads:
+        thread.start()
+    count = 0
+    end = _RENDER_ABORT
+    try:
+        for e in entries:
+            if errors:
+                break
+            for inbox in inboxes:
+                inbox.put(e)
+            count += 1
         else:
-            flush_table()
-        if line.startswith('# '):
-            document.add_heading(line[2:].strip(), level=1)
-        elif line.startswith('## '):
-            document.add_heading(line[3:].strip(), level=2)
-        elif line.startswith('### '):
-            document.add_heading(line[4:].strip(), level=3)
-        elif line.startswith('---'):
-            document.add_page_break()
-        elif line.strip():
-            # Inline code spans: replace `text` with just text (could style later)
-            cleaned = re.sub(r'`([^`]+)`', r'\1', line)
-            document.add_paragraph(cleaned)
-    flush_table()
-    document.save(str(docx_path))
-    print(f"[INFO] Wrote DOCX to {docx_path}")
-
-def build_entries(include_mde: bool = False) -> List[Dict[str, Any]]:
-    json_files = gather_files(JSON_GLOB, suffix=".json")
-    mc_files = gather_files(MOBILECONFIG_GLOB, suffix=".mobileconfig")
-    
-    # Filter out MDE folder unless --mde flag is passed
-    if not include_mde:
-        json_files = [f for f in json_files if not str(f).startswith(str(REPO_ROOT / "mde"))]
-        mc_files = [f for f in mc_files if not str(f).startswith(str(REPO_ROOT / "mde"))]
-    
-    entries: List[Dict[str, Any]] = []
-    # Helper: try to load manifest XML next to source file (same base name)
-    def load_manifest_metadata(source_path: pathlib.Path) -> Dict[str, str]:
-        meta: Dict[str, str] = {}
-        manifest_path = source_path.with_suffix('.xml')
-        if manifest_path.exists():
-            try:
-                tree = ET.parse(manifest_path)
-                root = tree.getroot()
-                name_el = root.find('Name')
-                desc_el = root.find('Description')
-                type_el = root.find('Type')
-                if name_el is not None and name_el.text:
-                    meta['name'] = name_el.text.strip()
-                if desc_el is not None and desc_el.text:
-                    meta['description'] = desc_el.text.strip()
-                if type_el is not None and type_el.text:
-                    meta['type'] = type_el.text.strip()
-            except Exception as e:
-                print(f"[WARN] Failed to parse manifest XML {manifest_path}: {e}")
-        return meta
-    for f in json_files:
-        doc = safe_read_json(f)
-        if not doc:
-            continue
-        
-        # Determine policy type and extract settings accordingly
-        odata_type = doc.get("@odata.type", "")
-        settings = []
-        
-        # Try Settings Catalog format first
-        settings = extract_settings_catalog(doc)
-        
-        # If no settings found, check for compliance policy
-        if not settings and "CompliancePolicy" in odata_type:
-            settings = extract_compliance_policy(doc)
-        
-        # Fallback for enrollment restriction style JSON
-        if not settings and odata_type.endswith("deviceEnrollmentPlatformRestriction"):
-            pr = doc.get("platformRestriction", {})
-            if isinstance(pr, dict):
-                for k, v in pr.items():
-                    settings.append((f"platformRestriction.{k}", simplify_value(v)))
-        
-        rel = f.relative_to(REPO_ROOT)
-        ref_id = f.stem
-        manifest_meta = load_manifest_metadata(f)
-        derived_type = classify_type(f)
-        if 'type' in manifest_meta:
-            derived_type = manifest_meta['type']
-        entries.append({
-            "ref": ref_id,
-            "type": derived_type,
-            "relpath": str(rel),
-            "name": manifest_meta.get("name"),
-            "description": manifest_meta.get("description"),
-            "settings": settings,
-            "count": len(settings)
-        })
-
-    # Add standalone manifests for Package, Script, CustomAttribute not covered above
-    # We discover all XML manifests and include those whose SourceFile points to a .pkg/.sh/.zsh etc.
-    xml_manifests = list(REPO_ROOT.rglob("*.xml"))
-    
-    # Filter out MDE folder unless include_mde is True
-    if not include_mde:
-        xml_manifests = [m for m in xml_manifests if not str(m).startswith(str(REPO_ROOT / "mde"))]
-    
-    for mpath in xml_manifests:
+            end = _RENDER_DONE
+    finally:
+        for inbox in inboxes:
+            inbox.put(end)
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+    return count
+
+# Folders --watch observes (plus MDE_DIR with --mde)
+WATCH_DIRS = ("configurations", "scripts", "apps", "custom attributes")
+# Quiet time that ends a burst of changes (an editor save, a git checkout)
+WATCH_DEBOUNCE = 0.25
+WATCH_POLL_INTERVAL = 1.0
+# Editor swap/backup files that never affect the documentation
+WATCH_IGNORED_RE = re.compile(r"(^\.|~$|\.sw[a-p]$|^4913$)")
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+INOTIFY_EVENT_FORMAT = "iIII"  # struct inotify_event without the name
+
+class InotifyWatcher:
+    """Linux inotify through ctypes: one watch per directory, new directories watched as they appear.
+
+    ``poll()`` returns the paths with events, an empty set on timeout, or None when
+    the kernel queue overflowed and the caller has to assume anything changed.
+    """
+
+    name = "inotify"
+
+    def __init__(self, roots: List[pathlib.Path]):
+        import ctypes
+        import struct
+        self.event = struct.Struct(INOTIFY_EVENT_FORMAT)
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: Dict[int, pathlib.Path] = {}
         try:
-            tree = ET.parse(mpath)
-            root = tree.getroot()
-            if root.tag != 'MacIntuneManifest':
-                continue
-            type_el = root.find('Type')
-            src_el = root.find('SourceFile')
-            name_el = root.find('Name')
-            desc_el = root.find('Description')
-            ref_id_el = root.find('ReferenceId')
-            if type_el is None or src_el is None:
-                continue
-            artifact_type = type_el.text.strip()
-            rel_source = src_el.text.strip()
-            
-            # Skip if already processed:
-            # - Policy/CustomConfig/Compliance that point to .json files (handled by JSON processing)
-            # - CustomConfig that points to .mobileconfig (handled by plist processing)
-            # These should ALWAYS be skipped since JSON/mobileconfig processing happens first
-            if artifact_type in {'Policy', 'CustomConfig', 'Compliance'} and rel_source.endswith('.json'):
-                continue
-            if artifact_type == 'CustomConfig' and rel_source.endswith('.mobileconfig'):
+            for root in roots:
+                self.add_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def add_tree(self, root: pathlib.Path) -> None:
+        for dirpath, _, _ in os.walk(root):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), INOTIFY_MASK)
+            if wd < 0:
+                import ctypes
+                err = ctypes.get_errno()
+                raise OSError(err, f"inotify_add_watch({dirpath}): {os.strerror(err)}")
+            self.dirs[wd] = pathlib.Path(dirpath)
+
+    def poll(self, timeout: float | None = None) -> Set[pathlib.Path] | None:
+        import select
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: Set[pathlib.Path] = set()
+        overflow = False
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = self.event.unpack_from(data, offset)
+                name = data[offset + self.event.size:offset + self.event.size + length].rstrip(b"\0")
+                offset += self.event.size + length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                base = self.dirs.get(wd)
+                if base is None:
+                    continue
+                if mask & IN_IGNORED:
+                    del self.dirs[wd]
+                    continue
+                path = base / os.fsdecode(name) if name else base
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    with contextlib.suppress(OSError):
+                        self.add_tree(path)
+                changed.add(path)
+        return None if overflow else changed
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class PollingWatcher:
+    """Portable fallback: rescans the watched trees every ``interval`` seconds and diffs (size, mtime)."""
+
+    name = "polling"
+
+    def __init__(self, roots: List[pathlib.Path], interval: float = WATCH_POLL_INTERVAL):
+        self.roots = roots
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self) -> Dict[pathlib.Path, Tuple[int, int]]:
+        found: Dict[pathlib.Path, Tuple[int, int]] = {}
+        stack = [str(root) for root in self.roots]
+        while stack:
+            try:
+                it = os.scandir(stack.pop())
+            except OSError:
                 continue
-            
-            # Additional check: skip if already in entries by relpath
-            rel_path_obj = REPO_ROOT / rel_source
-            already = any(e['relpath'] == rel_source for e in entries)
-            if already:
+            with it:
+                for de in it:
+                    try:
+                        if de.is_dir(follow_symlinks=False):
+                            stack.append(de.path)
+                            continue
+                        st = de.stat()
+                    except OSError:
+                        continue
+                    found[pathlib.Path(de.path)] = (st.st_size, st.st_mtime_ns)
+        return found
+
+    def poll(self, timeout: float | None = None) -> Set[pathlib.Path] | None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.interval if deadline is None else min(self.interval, max(0.0, deadline - time.monotonic()))
+            time.sleep(wait)
+            current = self.scan()
+            previous = self.snapshot
+            self.snapshot = current
+            changed = {p for p in current.keys() | previous.keys() if current.get(p) != previous.get(p)}
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        pass
+
+def open_watcher(roots: List[pathlib.Path]) -> InotifyWatcher | PollingWatcher:
+    """inotify where the platform has it (and the watch limit allows), polling otherwise."""
+    try:
+        return InotifyWatcher(roots)
+    except (OSError, AttributeError) as e:
+        if sys.platform.startswith("linux"):
+            print(f"[WARN] inotify unavailable ({e}); polling every {WATCH_POLL_INTERVAL:g}s")
+        return PollingWatcher(roots)
+
+def watch(model: DocumentModel, regenerate: Callable[[], Any], roots: List[pathlib.Path],
+          lock: threading.Lock | None = None, ready: threading.Event | None = None) -> None:
+    """--watch: after each burst of changes under ``roots``, refresh ``model`` and call ``regenerate`` until Ctrl+C.
+
+    ``lock`` is held around each update when other threads read the model (--serve);
+    ``ready`` is set once changes are being recorded.
+    """
+    roots = [root for root in roots if root.is_dir()]
+    try:
+        watcher = open_watcher(roots)
+    finally:
+        if ready is not None:
+            ready.set()
+    print(f"[INFO] Watching {', '.join(str(r.relative_to(REPO_ROOT)) for r in roots)} ({watcher.name}); press Ctrl+C to stop")
+    try:
+        while True:
+            changed = watcher.poll()
+            # Debounce: keep collecting until the tree has been quiet for WATCH_DEBOUNCE
+            while changed is not None:
+                more = watcher.poll(WATCH_DEBOUNCE)
+                if not more:
+                    changed = None if more is None else changed
+                    break
+                changed |= more
+            if changed is not None:
+                changed = {p for p in changed if not WATCH_IGNORED_RE.search(p.name)}
+                if not changed:
+                    continue
+            start = time.perf_counter()
+            with lock or contextlib.nullcontext():
+                reread = model.refresh(changed)
+                regenerate()
+            what = "overflow" if changed is None else f"{len(changed)} change(s)"
+            print(f"[INFO] Updated after {what}: {reread} file(s) re-read, "
+                  f"{len(model.entries)} entries, {time.perf_counter() - start:.2f}s")
+    except KeyboardInterrupt:
+        print("[INFO] Stopped watching")
+    finally:
+        watcher.close()
+
+# --serve: Unix socket by default, or [HOST:]PORT for HTTP on localhost
+SERVE_SOCKET = CACHE_DIR / "docgen.sock"
+SERVE_PORT_RE = re.compile(r"^(?:([^/:]*):)?(\d+)$")
+SERVE_DEFAULT_HOST = "127.0.0.1"
+# Matches returned by one /settings request unless it passes limit=
+SERVE_QUERY_LIMIT = 200
+
+def is_loopback_host(host: str) -> bool:
+    """Whether ``host`` only accepts connections from this machine; other host names count as remote."""
+    import ipaddress
+    if host.lower() == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+def query_settings(entries: List[Artifact], pattern: str, limit: int = SERVE_QUERY_LIMIT) -> Dict[str, Any]:
+    """Settings whose id or canonical "<domain>.<key>" matches the case-insensitive glob ``pattern``."""
+    import fnmatch
+    match = re.compile(fnmatch.translate(pattern.lower())).match
+    found: List[Dict[str, Any]] = []
+    total = 0
+    for e in entries:
+        payload_types = e.payload_types
+        for key, value, raw in e.settings:
+            domain, name = canonical_setting_key(key, payload_types)
+            canonical = f"{domain}.{name}" if domain else name
+            if not (match(key.lower()) or match(canonical)):
                 continue
-            # Extract subtree settings for Script, Package, CustomAttribute
-            settings: List[Tuple[str, str]] = []
-            if artifact_type in {"Script", "Package", "CustomAttribute"}:
-                subtree_tag = {
-                    "Script": "Script",
-                    "Package": "Package",
-                    "CustomAttribute": "CustomAttribute"
-                }[artifact_type]
-                subtree = root.find(subtree_tag)
-                if subtree is not None:
-                    for child in list(subtree):
-                        if child.text:
-                            settings.append((child.tag, child.text.strip()))
-            entries.append({
-                "ref": (rel_path_obj.stem if rel_path_obj.exists() else (mpath.stem)),
-                "type": artifact_type,
-                "relpath": rel_source,
-                "name": name_el.text.strip() if name_el is not None and name_el.text else None,
-                "description": desc_el.text.strip() if desc_el is not None and desc_el.text else "",
-                "settings": settings,
-                "count": len(settings),
-            })
-        except Exception as e:
-            print(f"[WARN] Failed processing manifest {mpath}: {e}")
-    for f in mc_files:
-        doc = safe_read_plist(f)
-        if not doc:
-            continue
-        settings = extract_mobileconfig(doc)
-        rel = f.relative_to(REPO_ROOT)
-        ref_id = f.stem
-        manifest_meta = load_manifest_metadata(f)
-        derived_type = classify_type(f)
-        if 'type' in manifest_meta:
-            derived_type = manifest_meta['type']
-        entries.append({
-            "ref": ref_id,
-            "type": derived_type,
-            "relpath": str(rel),
-            "name": manifest_meta.get("name") or doc.get("PayloadDisplayName"),
-            "description": manifest_meta.get("description", ""),
-            "settings": settings,
-            "count": len(settings)
-        })
-    
-    # Deduplicate entries by (ref, type, relpath) tuple
-    seen = set()
-    deduped = []
-    for entry in entries:
-        key = (entry['ref'], entry['type'], entry['relpath'])
-        if key not in seen:
-            seen.add(key)
-            deduped.append(entry)
-    
-    deduped.sort(key=lambda x: x['ref'])
-    return deduped
+            total += 1
+            if len(found) < limit:
+                found.append({"ref": e.ref, "type": e.type, "name": e.name, "source": e.relpath,
+                              "setting": key, "canonical": canonical, "value": value, "raw": raw})
+    return {"query": pattern, "total": total, "settings": found}
+
+Route = Callable[[Dict[str, Any]], Any]
+
+def daemon_routes(model: DocumentModel, render: Callable[[], Dict[str, Any]]) -> Dict[Tuple[str, str], Route]:
+    """The requests --serve answers, keyed by (HTTP method, path); ``render`` writes the outputs."""
+    return {
+        ("GET", "/status"): lambda params: {
+            "root": str(REPO_ROOT), "pid": os.getpid(), "generation": model.generation, "mde": model.include_mde,
+            "entries": len(model.entries), "files": len(model.known)},
+        ("GET", "/settings"): lambda params: query_settings(
+            model.entries, params.get("q") or "*", int(params.get("limit", SERVE_QUERY_LIMIT))),
+        ("GET", "/validate"): lambda params: {**validate_model(model), "mde": model.include_mde},
+        ("POST", "/render"): lambda params: render(),
+    }
+
+@functools.lru_cache(maxsize=None)
+def daemon_request_handler() -> type:
+    """The --serve request handler class, defined on first use so only the daemon imports http.server."""
+    import http.server
+    import urllib.parse
+
+    class DaemonRequestHandler(http.server.BaseHTTPRequestHandler):
+        """JSON over HTTP/1.1: query-string parameters (plus a JSON object body on POST) in, one JSON object out."""
+
+        protocol_version = "HTTP/1.1"
+        server_version = "docgen"
+
+        def do_GET(self) -> None:
+            self.dispatch("GET")
+
+        def do_POST(self) -> None:
+            self.dispatch("POST")
+
+        def dispatch(self, method: str) -> None:
+            url = urllib.parse.urlsplit(self.path)
+            params: Dict[str, Any] = dict(urllib.parse.parse_qsl(url.query))
+            length = int(self.headers.get("Content-Length") or 0)
+            route = self.server.routes.get((method, url.path))
+            try:
+                if length:
+                    body = json.loads(self.rfile.read(length))
+                    if not isinstance(body, dict):
+                        raise ValueError("request body must be a JSON object")
+                    params.update(body)
+                if route is None:
+                    self.reply(404, {"error": f"no such request: {method} {url.path}"})
+                    return
+                self.reply(200, route(params))
+            except ValueError as e:
+                self.reply(400, {"error": str(e)})
+            except Exception as e:
+                print(f"[WARN] {method} {url.path} failed: {e}")
+                self.reply(500, {"error": str(e)})
+
+        def reply(self, status: int, body: Any) -> None:
+            data = json.dumps(body, ensure_ascii=False, default=_catalog_default).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass  # editors and hooks call often; failures are printed by dispatch()
+
+    return DaemonRequestHandler
+
+def open_server(address: str) -> socketserver.BaseServer:
+    """Bind ``address``: [HOST:]PORT for HTTP (HOST defaults to loopback), anything else is a Unix socket path."""
+    import http.server
+    import socket
+    import socketserver
+
+    class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    m = SERVE_PORT_RE.match(address)
+    if m:
+        return http.server.ThreadingHTTPServer((m.group(1) or SERVE_DEFAULT_HOST, int(m.group(2))), daemon_request_handler())
+    path = pathlib.Path(address)
+    if path.exists():
+        # A socket left behind by a daemon that died; refuse to steal a live one
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(path))
+            raise OSError("another daemon is already listening there")
+        except (ConnectionRefusedError, FileNotFoundError):
+            path.unlink()
+        finally:
+            probe.close()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return UnixHTTPServer(str(path), daemon_request_handler())
+
+def serve(server: socketserver.BaseServer, model: DocumentModel, routes: Dict[Tuple[str, str], Route],
+          roots: List[pathlib.Path], refreshed: Callable[[], Any]) -> None:
+    """--serve: answer ``routes`` on ``server`` while a watcher thread keeps ``model`` fresh, until Ctrl+C or POST /shutdown.
+
+    Requests and model updates take turns on one lock, so a request never sees a
+    half-refreshed model. ``refreshed`` runs after each update; outputs are only
+    written when a client asks for a render.
+    """
+    import threading
+    lock = threading.Lock()
+
+    def locked(route: Route) -> Route:
+        def call(params: Dict[str, Any]) -> Any:
+            with lock:
+                return route(params)
+        return call
+
+    def shutdown(params: Dict[str, Any]) -> Dict[str, Any]:
+        # shutdown() waits for serve_forever() to return, so it cannot run on a request thread
+        threading.Thread(target=server.shutdown).start()
+        return {"stopping": True}
+
+    server.routes = {key: locked(route) for key, route in routes.items()}
+    server.routes[("POST", "/shutdown")] = shutdown
+    # Announce the daemon only once edits made from here on are seen
+    watching = threading.Event()
+    threading.Thread(target=watch, args=(model, refreshed, roots, lock, watching), name="watch", daemon=True).start()
+    watching.wait()
+    unix = isinstance(server.server_address, str)  # AF_UNIX: the socket path
+    where = relative_path(pathlib.Path(server.server_address)) if unix else "http://%s:%d" % server.server_address[:2]
+    print(f"[INFO] Serving {len(model.entries)} entries on {where}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if unix:
+            pathlib.Path(server.server_address).unlink(missing_ok=True)
+    print("[INFO] Daemon stopped")
 
 def main() -> None:
+    import argparse
     parser = argparse.ArgumentParser(description="Generate payload documentation (Markdown + optional DOCX)")
     parser.add_argument("--docx", action="store_true", help="Also generate a DOCX file")
     parser.add_argument("--pandoc", action="store_true", help="Use pandoc for DOCX conversion (requires pandoc installed)")
+    parser.add_argument("--formats", default="", metavar="LIST",
+                        help=f"Also write these outputs in the same pass, comma-separated: {', '.join(OUTPUT_FORMATS)}")
+    parser.add_argument("--sharded", nargs="?", const=SHARD_DIR, type=pathlib.Path, metavar="DIR",
+                        help=f"Write one page per artifact plus index pages to DIR instead of the single markdown document (default: {SHARD_DIR.relative_to(REPO_ROOT)})")
+    parser.add_argument("--date", choices=("today", "source", "none"), default="today",
+                        help="Cover page date: today (default), source = newest artifact's commit or modification date, none = omitted")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and regenerate whenever files under the artifact folders change")
+    parser.add_argument("--serve", nargs="?", const=str(SERVE_SOCKET), metavar="ADDRESS",
+                        help=f"Keep the parsed entries in memory, follow file changes and answer render/settings/validate requests on a Unix socket path or [HOST:]PORT (default: {SERVE_SOCKET.relative_to(REPO_ROOT)})")
+    parser.add_argument("--serve-remote", action="store_true",
+                        help="Let --serve listen on a HOST other machines can reach; anyone who can connect can write the outputs and stop the daemon")
     parser.add_argument("--mde", action="store_true", help="Include MDE (Microsoft Defender for Endpoint) folder in documentation")
+    parser.add_argument("--no-cache", action="store_true", help=f"Re-parse every artifact and skip the parse cache ({CACHE_FILE.relative_to(REPO_ROOT)})")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N", help="Parse artifacts on N worker processes (default: 1, 0 = one per CPU)")
+    parser.add_argument("--metrics", nargs="?", const=CACHE_DIR / "metrics", type=pathlib.Path, metavar="DIR",
+                        help=f"Write metrics.json and metrics.prom with stage timings and per-file stats to DIR (default: {(CACHE_DIR / 'metrics').relative_to(REPO_ROOT)})")
+    parser.add_argument("--metrics-top", type=int, default=10, metavar="N", help="Slowest/largest artifacts listed in the metrics report (default: 10)")
+    parser.add_argument("--catalog", nargs="?", const=CATALOG_FILE_STEM, type=pathlib.Path, metavar="STEM",
+                        help=f"Also write every entry to STEM.json and STEM.ndjson (default: {CATALOG_FILE_STEM.relative_to(REPO_ROOT)}.json/.ndjson)")
+    parser.add_argument("--profile", nargs="?", const=CACHE_DIR / "profile", type=pathlib.Path, metavar="DIR",
+                        help=f"Profile each stage with cProfile and tracemalloc, writing collapsed stacks and allocation diffs to DIR (default: {(CACHE_DIR / 'profile').relative_to(REPO_ROOT)})")
     args = parser.parse_args()
+    formats = {name.strip().lower() for name in args.formats.split(",") if name.strip()}
+    unknown = formats - set(OUTPUT_FORMATS) - {"markdown"}
+    if unknown:
+        parser.error(f"unknown output format(s): {', '.join(sorted(unknown))}")
+    if args.sharded and args.docx and args.pandoc:
+        parser.error("--pandoc converts the single markdown document and cannot be combined with --sharded")
+    if args.watch and args.serve:
+        parser.error("--serve already follows file changes; drop --watch")
+    serve_port = SERVE_PORT_RE.match(args.serve) if args.serve else None
+    if serve_port and not args.serve_remote and not is_loopback_host(serve_port.group(1) or SERVE_DEFAULT_HOST):
+        parser.error(f"--serve {args.serve} would take requests (including render and shutdown) from other machines;"
+                     " add --serve-remote to allow that")
+    if (args.watch or args.serve) and args.profile:
+        parser.error(f"--profile cannot be combined with {'--watch' if args.watch else '--serve'}")
+
+    metrics = RunMetrics(args.metrics is not None)
+    profiler = StageProfiler(args.profile)
 
-    entries = build_entries(include_mde=args.mde)
-    markdown = generate_markdown(entries)
-    OUTPUT_FILE.write_text(markdown, encoding="utf-8")
-    print(f"[INFO] Wrote markdown to {OUTPUT_FILE}")
-    print(f"[INFO] Documented {len(entries)} payload artifacts")
+    def stage(name: str) -> contextlib.ExitStack:
+        stack = contextlib.ExitStack()
+        stack.enter_context(metrics.stage(name))
+        stack.enter_context(profiler.stage(name))
+        return stack
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    cache = ParseCache(None if args.no_cache else CACHE_FILE, metrics)
+    if args.catalog:
+        formats.add("json")
+    pandoc_exe = None
     if args.docx:
-        if args.pandoc:
-            # Attempt pandoc conversion
-            import shutil, subprocess, tempfile
-            pandoc_exe = shutil.which("pandoc")
-            if not pandoc_exe:
-                print("[WARN] --pandoc requested but pandoc not found; falling back to internal converter")
-                markdown_to_docx(markdown, DOCX_OUTPUT_FILE)
-            else:
-                try:
-                    # Create markdown with page breaks for Word conversion
-                    markdown_with_breaks = add_page_breaks_for_docx(markdown)
-                    # Write temp markdown file, run pandoc
-                    with tempfile.NamedTemporaryFile(suffix='.md', delete=False) as tmp_md:
-                        tmp_md.write(markdown_with_breaks.encode('utf-8'))
-                        tmp_md_path = tmp_md.name
-                    cmd = [pandoc_exe, '-f', 'markdown', tmp_md_path, '-o', str(DOCX_OUTPUT_FILE), '--standalone']
-                    print(f"[INFO] Running pandoc: {' '.join(cmd)}")
-                    subprocess.run(cmd, check=True)
-                    print(f"[INFO] Wrote DOCX via pandoc to {DOCX_OUTPUT_FILE}")
-                    # Post-process tables for styling
-                    try:
-                        from docx import Document
-                        from docx.shared import Pt
-                        from docx.oxml import OxmlElement
-                        from docx.oxml.ns import qn
-                        doc = Document(str(DOCX_OUTPUT_FILE))
-                        table_count = 0
-                        for tbl_idx, tbl in enumerate(doc.tables):
-                            table_count += 1
-                            # Apply grid style if exists
-                            try:
-                                tbl.style = 'Table Grid'
-                            except Exception:
-                                pass
-                            # First table is summary table - use smaller font (9pt) for all cells
-                            is_summary_table = (tbl_idx == 0)
-                            # Set table to autofit contents
-                            from docx.oxml import OxmlElement
-                            from docx.oxml.ns import qn
-                            tbl_element = tbl._tbl
-                            tblPr = tbl_element.tblPr
-                            if tblPr is None:
-                                tblPr = OxmlElement('w:tblPr')
-                                tbl_element.insert(0, tblPr)
-                            
-                            # Remove any existing table width setting
-                            for e in list(tblPr):
-                                if e.tag == qn('w:tblW'):
-                                    tblPr.remove(e)
-                            
-                            # Set table width to AUTO (0) to enable autofit to contents
-                            tblW = OxmlElement('w:tblW')
-                            tblW.set(qn('w:w'), '0')
-                            tblW.set(qn('w:type'), 'auto')
-                            tblPr.append(tblW)
-                            
-                            # Set autofit layout
-                            for e in list(tblPr):
-                                if e.tag == qn('w:tblLayout'):
-                                    tblPr.remove(e)
-                            layout = OxmlElement('w:tblLayout')
-                            layout.set(qn('w:type'), 'autofit')
-                            tblPr.append(layout)
-                            
-                            # Remove fixed width constraints on all columns to allow autofit
-                            tblGrid = tbl_element.find(qn('w:tblGrid'))
-                            if tblGrid is not None:
-                                for gridCol in tblGrid.findall(qn('w:gridCol')):
-                                    # Remove w:w attribute (fixed width)
-                                    if qn('w:w') in gridCol.attrib:
-                                        del gridCol.attrib[qn('w:w')]
-                            
-                            # Remove cell width constraints
-                            for row in tbl._element.findall(qn('w:tr')):
-                                for tc in row.findall(qn('w:tc')):
-                                    tcPr = tc.find(qn('w:tcPr'))
-                                    if tcPr is not None:
-                                        tcW = tcPr.find(qn('w:tcW'))
-                                        if tcW is not None:
-                                            tcPr.remove(tcW)
-                            # Enforce borders (grid) even if style not applied
-                            from docx.oxml import OxmlElement
-                            from docx.oxml.ns import qn
-                            # Access or create tblPr for borders
-                            tbl_element = tbl._tbl
-                            tblPr = tbl_element.tblPr
-                            if tblPr is None:
-                                tblPr = OxmlElement('w:tblPr')
-                                tbl_element.insert(0, tblPr)
-                            # Remove existing borders then set new
-                            for e in list(tblPr):
-                                if e.tag == qn('w:tblBorders'):
-                                    tblPr.remove(e)
-                            borders = OxmlElement('w:tblBorders')
-                            for side in ['top','left','bottom','right','insideH','insideV']:
-                                elem = OxmlElement(f'w:{side}')
-                                elem.set(qn('w:val'), 'single')
-                                elem.set(qn('w:sz'), '6')  # ~0.5pt
-                                elem.set(qn('w:space'), '0')
-                                elem.set(qn('w:color'), '000000')
-                                borders.append(elem)
-                            tblPr.append(borders)
-                            if tbl.rows:
-                                # Header row shading & bold
-                                hdr = tbl.rows[0]
-                                for ci, cell in enumerate(hdr.cells):
-                                    for p in cell.paragraphs:
-                                        for run in p.runs:
-                                            run.font.bold = True
-                                            run.font.name = 'Courier New'
-                                            run.font.size = Pt(8)
-                                    tc = cell._tc
-                                    tcPr = tc.get_or_add_tcPr()
-                                    shd = OxmlElement('w:shd')
-                                    shd.set(qn('w:val'), 'clear')
-                                    shd.set(qn('w:color'), 'auto')
-                                    shd.set(qn('w:fill'), 'D9D9D9')
-                                    tcPr.append(shd)
-                            # Data rows formatting
-                            for r_index, row in enumerate(tbl.rows[1:], start=1):
-                                for ci, cell in enumerate(row.cells):
-                                    for p in cell.paragraphs:
-                                        # Also check for hyperlinks which have separate styling
-                                        for hyperlink in p._element.findall('.//' + qn('w:hyperlink')):
-                                            for run_elem in hyperlink.findall('.//' + qn('w:r')):
-                                                rPr = run_elem.find(qn('w:rPr'))
-                                                if rPr is None:
-                                                    rPr = OxmlElement('w:rPr')
-                                                    run_elem.insert(0, rPr)
-                                                # Remove existing font size
-                                                for sz in list(rPr.findall(qn('w:sz'))):
-                                                    rPr.remove(sz)
-                                                for szCs in list(rPr.findall(qn('w:szCs'))):
-                                                    rPr.remove(szCs)
-                                                # Set new font size
-                                                if is_summary_table:
-                                                    sz = OxmlElement('w:sz')
-                                                    sz.set(qn('w:val'), '16')  # 8pt = 16 half-points
-                                                    rPr.append(sz)
-                                                    szCs = OxmlElement('w:szCs')
-                                                    szCs.set(qn('w:val'), '16')
-                                                    rPr.append(szCs)
-                                        
-                                        for run in p.runs:
-                                            # All table text uses Courier New 8pt
-                                            run.font.name = 'Courier New'
-                                            run.font.size = Pt(8)
-                                            # Value column (second column, ci==1) should be bold
-                                            if ci == 1:
-                                                run.font.bold = True
-                        
-                        # Set paragraph and heading fonts to Aptos
-                        # Find first 3 headings (cover page sections) and make them large/bold
-                        h1_count = 0
-                        for para in doc.paragraphs:
-                            # Count H1 headings to track pages (0=cover, 1=description, 2=index, 3+=details)
-                            if para.style.name == 'Heading 1':
-                                h1_count += 1
-                            
-                            is_cover_page = (h1_count == 1)  # First H1 is cover page
-                            
-                            for run in para.runs:
-                                run.font.name = 'Aptos'
-                                run.font.size = Pt(11)
-                                # Make cover page text bold
-                                if is_cover_page:
-                                    run.font.bold = True
-                            
-                            # Headings get larger font
-                            if para.style.name.startswith('Heading'):
-                                para.paragraph_format.space_after = Pt(8)
-                                para.paragraph_format.space_before = Pt(12)
-                                for run in para.runs:
-                                    if para.style.name == 'Heading 1':
-                                        # Cover page gets huge fonts
-                                        run.font.size = Pt(36 if is_cover_page else 16)
-                                    elif para.style.name == 'Heading 2':
-                                        run.font.size = Pt(24 if is_cover_page else 14)
-                                    else:
-                                        run.font.size = Pt(14)
-                        
-                        # Set document to modern Word format (removes compatibility mode)
-                        # Create new compat settings for Word 2016+
-                        settings_element = doc.settings.element
-                        
-                        # Remove old compatibility settings
-                        for compat in list(settings_element.findall(qn('w:compat'))):
-                            settings_element.remove(compat)
-                        
-                        # Add modern compatibility mode settings
-                        compat = OxmlElement('w:compat')
-                        # Set compatibilityMode to 15 (Word 2013+) or 16 (Word 2016+)
-                        compat_setting = OxmlElement('w:compatSetting')
-                        compat_setting.set(qn('w:name'), 'compatibilityMode')
-                        compat_setting.set(qn('w:uri'), 'http://schemas.microsoft.com/office/word')
-                        compat_setting.set(qn('w:val'), '16')  # Word 2016+ format
-                        compat.append(compat_setting)
-                        settings_element.append(compat)
-                        
-                        doc.save(str(DOCX_OUTPUT_FILE))
-                        print(f"[INFO] Post-processed {table_count} tables in pandoc DOCX (autofit=on by default)")
-                    except Exception as e:
-                        print(f"[WARN] DOCX post-processing failed: {e}")
-                except subprocess.CalledProcessError as e:
-                    print(f"[WARN] pandoc failed ({e}); falling back to internal converter")
-                    markdown_to_docx(markdown, DOCX_OUTPUT_FILE)
-                finally:
-                    try:
-                        pathlib.Path(tmp_md_path).unlink(missing_ok=True)
-                    except Exception:
-                        pass
-        else:
-            markdown_to_docx(markdown, DOCX_OUTPUT_FILE)
+        import shutil
+        pandoc_exe = shutil.which("pandoc") if args.pandoc else None
+        if args.pandoc and not pandoc_exe:
+            print("[WARN] --pandoc requested but pandoc not found; falling back to internal converter")
+        if not pandoc_exe:
+            formats.add("docx")
+
+    def document_date(index: PathIndex) -> str | None:
+        if args.date == "source":
+            date = source_date(index)
+            return format_document_date(date) if date else ""
+        return "" if args.date == "none" else None
+
+    def make_renderers(fragments: Any, generated: str | None) -> List[Renderer]:
+        """The document renderer first, then one per requested format; ``fragments`` supplies rendered sections."""
+        outputs = {
+            "docx": lambda: DocxRenderer(DOCX_OUTPUT_FILE, fragments, generated),
+            "html": lambda: HtmlRenderer(HTML_OUTPUT_FILE, fragments, generated),
+            "csv": lambda: CsvRenderer(CSV_OUTPUT_FILE),
+            "json": lambda: CatalogWriter(args.catalog or CATALOG_FILE_STEM),
+            "xlsx": lambda: XlsxRenderer(XLSX_OUTPUT_FILE),
+        }
+        document = ShardRenderer(args.sharded) if args.sharded else MarkdownRenderer(OUTPUT_FILE, fragments, generated)
+        return [document] + [outputs[name]() for name in OUTPUT_FORMATS if name in formats]
+
+    def finish(document: Renderer, count: int) -> None:
+        if not args.sharded:
+            print(f"[INFO] Wrote markdown to {OUTPUT_FILE}" if document.changed else f"[INFO] Markdown unchanged: {OUTPUT_FILE}")
+        print(f"[INFO] Documented {count} payload artifacts")
+        if pandoc_exe:
+            import subprocess
+            # pandoc needs the finished markdown, so it runs after the render pass
+            try:
+                with stage("pandoc"):
+                    pandoc_to_docx(OUTPUT_FILE.read_text(encoding="utf-8"), DOCX_OUTPUT_FILE, pandoc_exe)
+            except subprocess.CalledProcessError as e:
+                print(f"[WARN] pandoc failed ({e}); falling back to internal converter")
+                with stage("docx"), OUTPUT_FILE.open(encoding="utf-8") as md_lines:
+                    markdown_to_docx(md_lines, DOCX_OUTPUT_FILE)
+
+    if args.watch or args.serve:
+        model = DocumentModel(args.mde, cache, jobs)
+
+        def regenerate() -> Dict[str, Any]:
+            start = time.perf_counter()
+            renderers = make_renderers(model.sections, document_date(model.index))
+            count = render_entries(model.entries, renderers)
+            cache.save()
+            finish(renderers[0], count)
+            return {
+                "documented": count,
+                "outputs": [{"format": r.name, "path": relative_path(r.path), "changed": getattr(r, "changed", None)}
+                            for r in renderers],
+                "seconds": round(time.perf_counter() - start, 3),
+            }
+
+        roots = [REPO_ROOT / d for d in WATCH_DIRS + ((MDE_DIR,) if args.mde else ())]
+        if args.serve:
+            # Bind before parsing so a second daemon fails fast
+            try:
+                server = open_server(args.serve)
+            except OSError as e:
+                print(f"[WARN] Cannot serve on {args.serve}: {e}")
+                sys.exit(1)
+            model.refresh()
+            # Commit, not save(): nothing has been rendered yet, and save() would prune the cached sections
+            cache.commit()
+            serve(server, model, daemon_routes(model, regenerate), roots, cache.commit)
+            return
+        model.refresh()
+        regenerate()
+        watch(model, regenerate, roots)
+        return
+
+    with stage("walk"):
+        index = gather_files(include_mde=args.mde)
+    entries = iter_entries(include_mde=args.mde, cache=cache, jobs=jobs, index=index)
+    if profiler.enabled:
+        # Build the entry list first so parsing and rendering are profiled separately;
+        # the build_entries stage's allocation diff is then what the list retains.
+        with stage("build_entries"):
+            entries = list(entries)
+    else:
+        entries = metrics.timed_iter(entries, "entries")
+    renderers = make_renderers(cache, document_date(index))
+    with stage("write_outputs"):
+        count = render_entries(entries, renderers, metrics, threads=not profiler.enabled)
+    with stage("cache_save"):
+        cache.save()
+    if metrics.enabled:
+        metrics.count("artifacts_documented", count)
+        metrics.count("parse_cache_hits", cache.hits)
+        metrics.count("parse_cache_misses", cache.misses)
+    if cache.enabled:
+        print(f"[INFO] Parse cache: {cache.hits} hits, {cache.misses} misses")
+    finish(renderers[0], count)
+    if metrics.enabled:
+        metrics.write(args.metrics, top=args.metrics_top)
+    profiler.close()
 
 if __name__ == "__main__":
     main()
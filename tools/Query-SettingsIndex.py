@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Query-SettingsIndex.py
+
+Keeps a SQLite index of every documented artifact and setting, and answers questions
+about them without regenerating the documentation:
+
+  - which artifacts set a setting, and to what value
+  - which artifacts have more (or fewer) than N settings
+  - full-text search over names and descriptions
+  - arbitrary read-only SQL
+
+`update` runs the generator's entry pipeline (docgen_core.iter_entries(), with its
+parse cache) and rewrites only artifacts whose entry digest changed; unchanged artifacts
+are left alone and deleted files are dropped. Queries only read the database, so
+they return in milliseconds and do not import docgen_core.
+
+Tables:
+  artifacts(id, relpath, ref, type, kind, name, description, setting_count, digest)
+  settings(id, setting_id, domain, key, canonical)   -- canonical = "<domain>.<key>"
+  setting_values(artifact_id, position, setting, value)
+  artifacts_fts(ref, name, description)               -- FTS5, when SQLite has it
+
+Usage:
+  python3 tools/Query-SettingsIndex.py update [--mde] [-j N]
+  python3 tools/Query-SettingsIndex.py setting com.apple.mcx.filevault2_enable
+  python3 tools/Query-SettingsIndex.py setting 'com.apple.screensaver*'
+  python3 tools/Query-SettingsIndex.py artifacts --min-settings 100
+  python3 tools/Query-SettingsIndex.py search filevault
+  python3 tools/Query-SettingsIndex.py sql "SELECT type, COUNT(*) FROM artifacts GROUP BY type"
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import pathlib
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+TOOLS_DIR = pathlib.Path(__file__).resolve().parent
+REPO_ROOT = TOOLS_DIR.parent
+INDEX_FILE = REPO_ROOT / ".docgen-cache" / "settings-index.sqlite3"
+INDEX_VERSION = "1"
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS artifacts (
+    id INTEGER PRIMARY KEY,
+    relpath TEXT NOT NULL UNIQUE,
+    ref TEXT NOT NULL,
+    type TEXT NOT NULL,
+    kind TEXT,
+    name TEXT,
+    description TEXT,
+    setting_count INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_setting_count ON artifacts (setting_count);
+CREATE TABLE IF NOT EXISTS settings (
+    id INTEGER PRIMARY KEY,
+    setting_id TEXT NOT NULL UNIQUE,
+    domain TEXT NOT NULL,
+    key TEXT NOT NULL,
+    canonical TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS settings_canonical ON settings (canonical);
+CREATE TABLE IF NOT EXISTS setting_values (
+    artifact_id INTEGER NOT NULL REFERENCES artifacts (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    setting INTEGER NOT NULL REFERENCES settings (id),
+    value TEXT,
+    PRIMARY KEY (artifact_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS setting_values_setting ON setting_values (setting, artifact_id);
+"""
+# External-content FTS table kept in step with artifacts by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS artifacts_fts USING fts5 (
+    ref, name, description, content='artifacts', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS artifacts_fts_insert AFTER INSERT ON artifacts BEGIN
+    INSERT INTO artifacts_fts (rowid, ref, name, description) VALUES (new.id, new.ref, new.name, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS artifacts_fts_delete AFTER DELETE ON artifacts BEGIN
+    INSERT INTO artifacts_fts (artifacts_fts, rowid, ref, name, description)
+    VALUES ('delete', old.id, old.ref, old.name, old.description);
+END;
+"""
+
+def fts_query(text: str) -> str:
+    """``text`` as an FTS5 query: each word a quoted string, so punctuation is literal; a trailing * matches a prefix."""
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*") and word != "*"
+        word = word[:-1] if prefix else word
+        terms.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+class SettingsIndex:
+    """The SQLite settings index.
+
+    Opening a missing index, or one written by another INDEX_VERSION, (re)creates
+    the schema; after that only update() writes.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path))
+        self.db.execute("PRAGMA foreign_keys = ON")
+        tables = {name for (name,) in self.db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        version = self.db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone() if "meta" in tables else None
+        if version is None or version[0] != INDEX_VERSION:
+            self._create(tables)
+        else:
+            self.fts = "artifacts_fts" in tables
+
+    def _create(self, tables: set) -> None:
+        """Create the schema, dropping an index written by another INDEX_VERSION."""
+        if "meta" in tables:
+            self.db.executescript("DROP TABLE IF EXISTS artifacts_fts; DROP TABLE IF EXISTS setting_values; "
+                                  "DROP TABLE IF EXISTS settings; DROP TABLE IF EXISTS artifacts; DROP TABLE meta;")
+        self.db.executescript(INDEX_SCHEMA)
+        try:
+            self.db.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5; search falls back to LIKE
+            self.fts = False
+        self.db.execute("INSERT INTO meta (key, value) VALUES ('version', ?)", (INDEX_VERSION,))
+        self.db.commit()
+
+    def update(self, entries, canonical_key) -> Dict[str, int]:
+        """Bring the index in line with ``entries`` (Artifacts), rewriting only artifacts whose digest changed.
+
+        ``canonical_key`` is the generator's canonical_setting_key(). Entries without a
+        digest (parse cache disabled) are always rewritten.
+        """
+        db = self.db
+        known = {relpath: (artifact_id, digest)
+                 for artifact_id, relpath, digest in db.execute("SELECT id, relpath, digest FROM artifacts")}
+        setting_ids = dict(db.execute("SELECT setting_id, id FROM settings"))
+        seen = set()
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        with db:
+            for e in entries:
+                relpath = e.relpath
+                if relpath in seen:
+                    continue
+                seen.add(relpath)
+                previous = known.get(relpath)
+                if previous is not None:
+                    if e.digest and previous[1] == e.digest:
+                        counts["unchanged"] += 1
+                        continue
+                    db.execute("DELETE FROM artifacts WHERE id = ?", (previous[0],))
+                    counts["updated"] += 1
+                else:
+                    counts["added"] += 1
+                cursor = db.execute(
+                    "INSERT INTO artifacts (relpath, ref, type, kind, name, description, setting_count, digest)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (relpath, e.ref, e.type, e.kind, e.name, e.description, e.count, e.digest),
+                )
+                artifact_id = cursor.lastrowid
+                payload_types = e.payload_types
+                rows = []
+                for position, (setting_id, value) in enumerate(e.pairs()):
+                    number = setting_ids.get(setting_id)
+                    if number is None:
+                        domain, key = canonical_key(setting_id, payload_types)
+                        number = db.execute(
+                            "INSERT INTO settings (setting_id, domain, key, canonical) VALUES (?, ?, ?, ?)",
+                            (setting_id, domain, key, f"{domain}.{key}" if domain else key),
+                        ).lastrowid
+                        setting_ids[setting_id] = number
+                    rows.append((artifact_id, position, number, value))
+                db.executemany("INSERT INTO setting_values (artifact_id, position, setting, value) VALUES (?, ?, ?, ?)", rows)
+            gone = [(artifact_id,) for relpath, (artifact_id, _) in known.items() if relpath not in seen]
+            db.executemany("DELETE FROM artifacts WHERE id = ?", gone)
+            counts["removed"] = len(gone)
+            db.execute("DELETE FROM settings WHERE id NOT IN (SELECT DISTINCT setting FROM setting_values)")
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('updated', ?)", (str(int(time.time())),))
+        return counts
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+        cursor = self.db.execute(sql, params)
+        columns = [d[0] for d in cursor.description] if cursor.description else []
+        return columns, cursor.fetchall()
+
+    def setting(self, pattern: str) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+        """Artifacts setting ``pattern`` (a setting id or canonical domain.key; * and ? wildcards allowed)."""
+        op = "GLOB" if any(c in pattern for c in "*?[") else "="
+        return self.query(
+            "SELECT s.setting_id, v.value, a.ref, a.type, a.relpath FROM settings s"
+            " JOIN setting_values v ON v.setting = s.id JOIN artifacts a ON a.id = v.artifact_id"
+            f" WHERE s.setting_id {op} ?1 OR s.canonical {op} lower(?1)"
+            " ORDER BY s.setting_id, a.ref, v.position",
+            (pattern,),
+        )
+
+    def artifacts(self, min_settings: int | None = None, max_settings: int | None = None,
+                  type_: str | None = None) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+        """Artifacts with more than ``min_settings`` / fewer than ``max_settings`` settings."""
+        clauses, params = [], []
+        if min_settings is not None:
+            clauses.append("setting_count > ?")
+            params.append(min_settings)
+        if max_settings is not None:
+            clauses.append("setting_count < ?")
+            params.append(max_settings)
+        if type_:
+            clauses.append("type = ?")
+            params.append(type_)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self.query(f"SELECT ref, type, setting_count, relpath FROM artifacts{where} ORDER BY setting_count DESC, ref", params)
+
+    def search(self, text: str) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+        """Full-text search over artifact refs, names and descriptions."""
+        if self.fts:
+            try:
+                return self.query(
+                    "SELECT a.ref, a.type, a.name, a.relpath FROM artifacts_fts f JOIN artifacts a ON a.id = f.rowid"
+                    " WHERE artifacts_fts MATCH ? ORDER BY f.rank", (fts_query(text),))
+            except sqlite3.OperationalError:
+                pass  # nothing FTS5 can search for (an empty query); LIKE takes it literally
+        like = f"%{text}%"
+        return self.query("SELECT ref, type, name, relpath FROM artifacts WHERE ref LIKE ?1 OR name LIKE ?1"
+                          " OR description LIKE ?1 ORDER BY ref", (like,))
+
+    def close(self) -> None:
+        self.db.close()
+
+def print_rows(columns: List[str], rows: List[Tuple[Any, ...]], as_json: bool = False) -> None:
+    if as_json:
+        print(json.dumps([dict(zip(columns, row)) for row in rows], indent=2, ensure_ascii=False))
+        return
+    if not columns:
+        return
+    text = [[("" if v is None else str(v)) for v in row] for row in rows]
+    widths = [max([len(c)] + [len(r[i]) for r in text]) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)).rstrip())
+    print("  ".join("-" * w for w in widths))
+    for r in text:
+        print("  ".join(v.ljust(w) for v, w in zip(r, widths)).rstrip())
+    print(f"({len(rows)} rows)")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build and query the SQLite settings index")
+    parser.add_argument("--db", type=pathlib.Path, default=INDEX_FILE, help=f"Index database (default: {INDEX_FILE.relative_to(REPO_ROOT)})")
+    parser.add_argument("--json", action="store_true", help="Print query results as JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    update = commands.add_parser("update", help="Index new and changed artifacts, drop deleted ones")
+    update.add_argument("--mde", action="store_true", help="Include the MDE folder")
+    update.add_argument("--no-cache", action="store_true", help="Re-parse every artifact (rewrites every row)")
+    update.add_argument("--jobs", "-j", type=int, default=1, metavar="N", help="Parse artifacts on N worker processes (0 = one per CPU)")
+
+    setting = commands.add_parser("setting", help="Which artifacts set a setting, and to what value")
+    setting.add_argument("pattern", help="Setting id or canonical domain.key; * and ? wildcards allowed")
+
+    artifacts = commands.add_parser("artifacts", help="List artifacts by setting count")
+    artifacts.add_argument("--min-settings", type=int, metavar="N", help="Only artifacts with more than N settings")
+    artifacts.add_argument("--max-settings", type=int, metavar="N", help="Only artifacts with fewer than N settings")
+    artifacts.add_argument("--type", help="Only artifacts of this type (Policy, CustomConfig, ...)")
+
+    search = commands.add_parser("search", help="Full-text search over names and descriptions")
+    search.add_argument("text", help="FTS5 query (words, \"phrases\", prefix*)")
+
+    sql = commands.add_parser("sql", help="Run a read-only SQL query")
+    sql.add_argument("statement")
+    args = parser.parse_args()
+
+    if args.command != "update" and not args.db.exists():
+        print(f"[WARN] No settings index at {args.db}; run the 'update' command first")
+        sys.exit(1)
+    index = SettingsIndex(args.db)
+    try:
+        if args.command == "update":
+            # Only updates parse the repository; queries return without docgen_core
+            import docgen_core as core
+            jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+            cache = core.ParseCache(None if args.no_cache else core.CACHE_FILE)
+            start = time.perf_counter()
+            counts = index.update(core.iter_entries(include_mde=args.mde, cache=cache, jobs=jobs), core.canonical_setting_key)
+            cache.save()
+            summary = ", ".join(f"{n} {what}" for what, n in counts.items())
+            print(f"[INFO] Updated {args.db} in {time.perf_counter() - start:.2f}s: {summary}")
+        elif args.command == "setting":
+            print_rows(*index.setting(args.pattern), as_json=args.json)
+        elif args.command == "artifacts":
+            print_rows(*index.artifacts(args.min_settings, args.max_settings, args.type), as_json=args.json)
+        elif args.command == "search":
+            print_rows(*index.search(args.text), as_json=args.json)
+        else:
+            index.db.execute("PRAGMA query_only = ON")
+            print_rows(*index.query(args.statement), as_json=args.json)
+    except sqlite3.Error as e:
+        print(f"[WARN] Query failed: {e}")
+        sys.exit(1)
+    finally:
+        index.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Send-DocumentationRequest.py
+
+Client for the documentation daemon (Generate-ConfigurationDocumentation.py --serve).
+The daemon keeps every parsed entry in memory and follows file changes, so each
+request below is answered from that model instead of a fresh run:
+
+  - render    write the documentation outputs the daemon was started with
+  - setting   which artifacts configure a setting, and to what value
+  - validate  unparsable files, broken manifests, duplicate ReferenceIds, conflicts
+  - status    entry count and model generation
+  - stop      shut the daemon down
+
+The client only imports the standard library pieces it needs to talk HTTP/JSON over
+the daemon's Unix socket (or localhost port), so a call costs milliseconds; `imm
+validate` reuses request() and print_validation().
+
+Usage:
+  python3 tools/Generate-ConfigurationDocumentation.py --serve &
+  python3 tools/Send-DocumentationRequest.py render
+  python3 tools/Send-DocumentationRequest.py setting 'com.apple.screensaver*'
+  python3 tools/Send-DocumentationRequest.py validate
+  python3 tools/Send-DocumentationRequest.py --address 8765 status
+"""
+
+from __future__ import annotations
+# Kept to what a request needs (no pathlib, re or argparse at import time): the
+# interpreter's startup is most of what a call costs.
+import json
+import os
+import sys
+from typing import Any, Dict, Tuple
+
+TOOLS_DIR = os.path.dirname(os.path.realpath(__file__))
+REPO_ROOT = os.path.dirname(TOOLS_DIR)
+# Same default as the generator's SERVE_SOCKET
+DAEMON_SOCKET = os.path.join(REPO_ROOT, ".docgen-cache", "docgen.sock")
+DEFAULT_HOST = "127.0.0.1"
+# render runs the whole output pass; everything else is answered from memory
+TIMEOUT = 600
+
+def tcp_address(address: str) -> Tuple[str, int] | None:
+    """(host, port) for a [HOST:]PORT address, None for a socket path (the generator's SERVE_PORT_RE rule)."""
+    host, _, port = address.rpartition(":")
+    if not port.isdigit() or "/" in host or ":" in host:
+        return None
+    return host or DEFAULT_HOST, int(port)
+
+def request(address: str, method: str, path: str, params: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    """Send one request and return the decoded reply; raises OSError when no daemon answers.
+
+    A one-shot HTTP/1.1 exchange written directly on the socket: http.client alone
+    (with the email and ssl modules it pulls in) would take longer to import than
+    the daemon takes to answer. socket itself is imported here, so `imm validate
+    --no-daemon` can print a report without it.
+    """
+    import socket
+    tcp = tcp_address(address)
+    if tcp is not None:
+        sock = socket.create_connection(tcp, timeout=TIMEOUT)
+    else:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(TIMEOUT)
+    with sock:
+        if tcp is None:
+            sock.connect(address)
+        if params:
+            import urllib.parse
+            path += "?" + urllib.parse.urlencode(params)
+        sock.sendall(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: 0\r\n"
+                     "Connection: close\r\n\r\n".encode("ascii"))
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    head, _, body = b"".join(chunks).partition(b"\r\n\r\n")
+    status = head.split(b" ", 2)[1:2]
+    if not status:
+        raise OSError("the daemon closed the connection without replying")
+    reply = json.loads(body or b"{}")
+    if status[0] != b"200":
+        raise RuntimeError(reply.get("error") or f"HTTP {status[0].decode()}")
+    return reply
+
+def print_settings(reply: Dict[str, Any]) -> None:
+    for s in reply["settings"]:
+        print(f"{s['ref']} ({s['type']})  {s['setting']} = {s['value']}")
+        print(f"    {s['source']}")
+    shown = len(reply["settings"])
+    more = f", first {shown} shown" if shown < reply["total"] else ""
+    print(f"({reply['total']} matches{more})")
+
+def print_validation(reply: Dict[str, Any]) -> None:
+    for problem in reply["problems"]:
+        print(f"[{problem['level'].upper()}] {problem['path']}: {problem['message']}")
+    print(f"{reply['errors']} error(s), {reply['warnings']} warning(s)")
+
+def main() -> None:
+    import argparse
+    parser = argparse.ArgumentParser(description="Send a request to the documentation daemon")
+    parser.add_argument("--address", default=DAEMON_SOCKET, metavar="ADDRESS",
+                        help=f"Daemon Unix socket path or [HOST:]PORT (default: {os.path.relpath(DAEMON_SOCKET, REPO_ROOT)})")
+    parser.add_argument("--json", action="store_true", help="Print the daemon's reply as JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("render", help="Write the documentation outputs")
+    setting = commands.add_parser("setting", help="Which artifacts configure a setting, and to what value")
+    setting.add_argument("pattern", help="Setting id or canonical <domain>.<key>, with * and ? wildcards (case-insensitive)")
+    setting.add_argument("--limit", type=int, metavar="N", help="Return at most N matches (default: the daemon's)")
+    commands.add_parser("validate", help="Report unparsable files, broken manifests and conflicting settings")
+    commands.add_parser("status", help="Show what the daemon has loaded")
+    commands.add_parser("stop", help="Shut the daemon down")
+    args = parser.parse_args()
+
+    calls = {
+        "render": ("POST", "/render", None),
+        "setting": ("GET", "/settings", {"q": args.pattern, **({"limit": args.limit} if args.limit else {})}
+                    if args.command == "setting" else None),
+        "validate": ("GET", "/validate", None),
+        "status": ("GET", "/status", None),
+        "stop": ("POST", "/shutdown", None),
+    }
+    try:
+        reply = request(args.address, *calls[args.command])
+    except OSError as e:
+        print(f"[WARN] No documentation daemon at {args.address} ({e}); start one with "
+              "'python3 tools/Generate-ConfigurationDocumentation.py --serve'")
+        sys.exit(1)
+    except RuntimeError as e:
+        print(f"[WARN] Request failed: {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(reply, indent=2, ensure_ascii=False))
+    elif args.command == "render":
+        for output in reply["outputs"]:
+            state = {True: "written", False: "unchanged"}.get(output["changed"], "written")
+            print(f"[INFO] {output['format']}: {output['path']} ({state})")
+        print(f"[INFO] Documented {reply['documented']} payload artifacts in {reply['seconds']:.2f}s")
+    elif args.command == "setting":
+        print_settings(reply)
+    elif args.command == "validate":
+        print_validation(reply)
+    elif args.command == "status":
+        print(f"[INFO] Daemon {reply['pid']} serving {reply['root']}: {reply['entries']} entries "
+              f"from {reply['files']} files (generation {reply['generation']})")
+    else:
+        print("[INFO] Daemon stopping")
+    if args.command == "validate" and not reply["ok"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+bench_normalization.py
+
+Microbenchmark for simplify_display_value() in docgen_core.py.
+
+Replays every (settingDefinitionId, raw value) pair found in the repository's Settings
+Catalog policies, repeated the way they repeat across a large tenant export, and reports
+the per-call cost of:
+ - legacy:   the original regex/split implementation (kept below for reference)
+ - rules:    the table-driven rule set without the memo
+ - memoized: simplify_display_value() as used by the generator (warm LRU)
+
+All three are checked to produce identical results before timing.
+
+Usage:
+  python3 tools/benchmarks/bench_normalization.py [--repeat 200]
+"""
+
+from __future__ import annotations
+import argparse
+import pathlib
+import re
+import sys
+import timeit
+from typing import Any, List, Tuple
+
+TOOLS_DIR = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(TOOLS_DIR))
+
+import docgen_core as core  # noqa: E402
+
+def legacy_simplify_display_value(key: str, raw_val: Any, simplify_value) -> str:
+    """The implementation prior to the rule engine, kept verbatim as the baseline."""
+    val = simplify_value(raw_val)
+    if not isinstance(val, str):
+        return val
+    if re.search(r"{{.*?}}", val):
+        return val
+    lower_val = val.lower()
+    for suf, mapped in {"_true": "True", "_false": "False"}.items():
+        if lower_val.endswith(suf):
+            prefix_part = val[: -len(suf)]
+            if key.startswith(prefix_part.split('.')[-1]) or prefix_part.endswith(key.split('.')[-1]):
+                return mapped
+            if prefix_part == key:
+                return mapped
+    if val.startswith(key + "_"):
+        trimmed = val[len(key) + 1:]
+        return trimmed
+    if val.startswith(key):
+        remainder = val[len(key):]
+        remainder = remainder.lstrip('_')
+        if remainder:
+            return remainder
+    return val
+
+def collect_pairs() -> List[Tuple[str, Any]]:
+    """Gather raw (settingDefinitionId, value) pairs from every Settings Catalog policy."""
+    pairs: List[Tuple[str, Any]] = []
+
+    def walk(node: Any) -> None:
+        if isinstance(node, dict):
+            sdid = node.get("settingDefinitionId")
+            if sdid:
+                for block in ("choiceSettingValue", "simpleSettingValue"):
+                    value = node.get(block)
+                    if isinstance(value, dict) and value.get("value") is not None:
+                        pairs.append((sdid, value["value"]))
+                for item in node.get("simpleSettingCollectionValue") or []:
+                    if isinstance(item, dict) and item.get("value") is not None:
+                        pairs.append((sdid, item["value"]))
+            for v in node.values():
+                walk(v)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    for path in core.gather_files(include_mde=True).files(".json", under=core.ARTIFACT_DIRS):
+        doc = core.safe_read_json(path)
+        if doc:
+            walk(doc.get("settings", []))
+    return pairs
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-call cost of simplify_display_value before and after memoization")
+    parser.add_argument("--repeat", type=int, default=200, help="How many times the repo's pairs are replayed (simulates a large tenant)")
+    args = parser.parse_args()
+
+    pairs = collect_pairs()
+    if not pairs:
+        print("[WARN] No Settings Catalog values found")
+        return
+    workload = pairs * args.repeat
+
+    for key, raw in pairs:
+        expected = legacy_simplify_display_value(key, raw, core.simplify_value)
+        assert core._normalize_display_value(key, raw) == expected, (key, raw)
+        assert core.simplify_display_value(key, raw) == expected, (key, raw)
+
+    candidates = [
+        ("legacy", lambda: [legacy_simplify_display_value(k, v, core.simplify_value) for k, v in workload]),
+        ("rules", lambda: [core._normalize_display_value(k, v) for k, v in workload]),
+        ("memoized", lambda: [core.simplify_display_value(k, v) for k, v in workload]),
+    ]
+    print(f"[INFO] {len(pairs)} values x {args.repeat} = {len(workload)} calls per run")
+    baseline = None
+    for name, fn in candidates:
+        best = min(timeit.repeat(fn, number=1, repeat=5))
+        per_call_ns = best / len(workload) * 1e9
+        baseline = baseline or per_call_ns
+        print(f"{name:>9}: {per_call_ns:8.1f} ns/call  ({baseline / per_call_ns:4.1f}x vs legacy)")
+    print(f"[INFO] Memo: {core.normalization_cache_info()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+bench_pipeline.py
+
+Stage benchmarks for Generate-ConfigurationDocumentation.py with stored baselines.
+
+Each stage of the generator is timed on fixed corpora:
+ - small: the first few artifacts of the repository
+ - repo:  the repository itself
+ - 10k:   the repository's artifacts replicated to 10,000 artifacts
+ - synthetic (opt-in): 10,000 seeded artifacts from generate_corpus.py
+
+Stages: gather_files, build_entries (no parse cache, one process), extract_settings_catalog
+(over every Settings Catalog policy), generate_markdown, add_page_breaks_for_docx and
+markdown_to_docx. For every stage the report gives the best wall time of --repeat runs,
+the tracemalloc peak of one traced run and the number of memory blocks the stage left
+allocated (its result).
+
+Corpora other than 'repo' are built in a temporary directory and walked from there
+(gather_files(root=...)); parsing and rendering do not depend on where the tools live.
+
+Usage:
+  python3 tools/benchmarks/bench_pipeline.py [--corpora small,repo,10k] [--repeat 3]
+  python3 tools/benchmarks/bench_pipeline.py --save            # write tools/benchmarks/baseline.json
+  python3 tools/benchmarks/bench_pipeline.py --compare --threshold 0.25
+      exit status 1 if any stage is more than 25% slower or larger than the baseline
+"""
+
+from __future__ import annotations
+import argparse
+import contextlib
+import datetime
+import gc
+import io
+import json
+import pathlib
+import platform
+import re
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+TOOLS_DIR = pathlib.Path(__file__).resolve().parent.parent
+REPO_ROOT = TOOLS_DIR.parent
+DEFAULT_BASELINE = pathlib.Path(__file__).resolve().parent / "baseline.json"
+CORPORA = ("small", "repo", "10k")
+OPTIONAL_CORPORA = ("synthetic",)
+SMALL_CORPUS_SIZE = 8
+LARGE_CORPUS_SIZE = 10_000
+# Differences below these are noise, whatever the relative change
+MIN_WALL_DELTA_S = 0.005
+MIN_PEAK_DELTA_KIB = 256
+SOURCE_FILE_RE = re.compile(r"(<SourceFile>\s*)((?:[^<]*/)?)([^/<]+</SourceFile>)")
+
+sys.path.insert(0, str(TOOLS_DIR))
+
+import docgen_core as core  # noqa: E402
+from intune_my_macs import load_generator  # noqa: E402
+
+def artifact_groups() -> List[List[pathlib.Path]]:
+    """Group the repository's indexed files by directory and stem (an artifact and its manifest)."""
+    groups: Dict[Tuple[pathlib.Path, str], List[pathlib.Path]] = {}
+    index = core.gather_files(include_mde=False)
+    for suffix in core.INDEXED_SUFFIXES:
+        for path in index.files(suffix):
+            groups.setdefault((path.parent, path.stem), []).append(path)
+    return [groups[key] for key in sorted(groups)]
+
+def build_corpus(root: pathlib.Path, groups: List[List[pathlib.Path]], count: int) -> pathlib.Path:
+    """Lay out ``count`` artifact groups under ``root``, cycling through the repository's.
+
+    Every pass over the repository goes into its own r<N> subdirectory, so file names
+    (and therefore reference IDs and types) stay realistic. Manifest SourceFile paths
+    are pointed into the same subdirectory so replicated entries stay distinct.
+    """
+    for i in range(count):
+        group = groups[i % len(groups)]
+        replica = f"r{i // len(groups):04d}"
+        for src in group:
+            rel = src.parent.relative_to(REPO_ROOT)
+            dest_dir = root / rel / replica
+            dest_dir.mkdir(parents=True, exist_ok=True)
+            if src.suffix == ".xml":
+                text = SOURCE_FILE_RE.sub(rf"\g<1>\g<2>{replica}/\g<3>", src.read_text(encoding="utf-8"))
+                (dest_dir / src.name).write_text(text, encoding="utf-8")
+            else:
+                shutil.copyfile(src, dest_dir / src.name)
+    return root
+
+def build_synthetic_corpus(root: pathlib.Path, count: int) -> pathlib.Path:
+    """Generate ``count`` artifacts with generate_corpus.py (90% policies, 8% profiles, 2% compliance)."""
+    from generate_corpus import CorpusGenerator
+    profiles, compliance = count * 8 // 100, count * 2 // 100
+    CorpusGenerator(seed=0).write(root, count - profiles - compliance, profiles, compliance)
+    return root
+
+def measure(fn: Callable[[], Any], repeat: int, setup: Callable[[], None] | None = None) -> Tuple[Any, Dict[str, float]]:
+    """Run ``fn`` ``repeat`` times untraced plus once under tracemalloc; return its result and metrics."""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+        del result
+    if setup:
+        setup()
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sys.getallocatedblocks() - blocks_before
+    return result, {"wall_s": round(best, 6), "peak_kib": round(peak / 1024, 1), "blocks": blocks}
+
+def bench_corpus(gen, root: pathlib.Path, repeat: int, workdir: pathlib.Path) -> Dict[str, Any]:
+    """Time every stage on the corpus at ``root``."""
+    stages: Dict[str, Dict[str, float]] = {}
+    clear_memo = core._normalize_display_value_cached.cache_clear
+    with contextlib.redirect_stdout(io.StringIO()):
+        index, stages["gather_files"] = measure(lambda: core.gather_files(include_mde=False, root=root), repeat)
+        cache = core.ParseCache(None, root=root)
+        entries, stages["build_entries"] = measure(lambda: core.build_entries(cache=cache, index=index), repeat, clear_memo)
+        docs = [doc for doc in map(core.safe_read_json, index.files(".json", under=core.ARTIFACT_DIRS))
+                if isinstance(doc, dict) and isinstance(doc.get("settings"), list)]
+        _, stages["extract_settings_catalog"] = measure(
+            lambda: [core.extract_settings_catalog(doc) for doc in docs], repeat, clear_memo)
+        markdown, stages["generate_markdown"] = measure(lambda: gen.generate_markdown(entries), repeat)
+        _, stages["add_page_breaks_for_docx"] = measure(lambda: gen.add_page_breaks_for_docx(markdown), repeat)
+        docx_path = workdir / "bench.docx"
+        _, stages["markdown_to_docx"] = measure(lambda: gen.markdown_to_docx(markdown, docx_path), repeat)
+    return {"artifacts": len(entries), "markdown_bytes": len(markdown.encode("utf-8")), "stages": stages}
+
+def run(corpora: List[str], repeat: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    gen = load_generator()
+    groups = artifact_groups()
+    with tempfile.TemporaryDirectory(prefix="imm-bench-") as tmp:
+        workdir = pathlib.Path(tmp)
+        for corpus in corpora:
+            if corpus == "repo":
+                root = REPO_ROOT
+            elif corpus == "synthetic":
+                root = build_synthetic_corpus(workdir / corpus, LARGE_CORPUS_SIZE)
+            else:
+                size = SMALL_CORPUS_SIZE if corpus == "small" else LARGE_CORPUS_SIZE
+                root = build_corpus(workdir / corpus, groups, size)
+            print(f"[INFO] Benchmarking corpus '{corpus}'", file=sys.stderr)
+            results[corpus] = bench_corpus(gen, root, repeat, workdir)
+    return results
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Describe every stage whose wall time or peak memory grew by more than ``threshold``."""
+    regressions: List[str] = []
+    for corpus, result in current.items():
+        old_stages = baseline.get(corpus, {}).get("stages", {})
+        for stage, metrics in result["stages"].items():
+            old = old_stages.get(stage)
+            if not old:
+                continue
+            for key, floor in (("wall_s", MIN_WALL_DELTA_S), ("peak_kib", MIN_PEAK_DELTA_KIB)):
+                before, after = old[key], metrics[key]
+                if after - before > floor and after > before * (1 + threshold):
+                    regressions.append(f"{corpus}/{stage}: {key} {before} -> {after} (+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+def print_report(results: Dict[str, Any], baseline: Dict[str, Any] | None) -> None:
+    for corpus, result in results.items():
+        print(f"\n{corpus}: {result['artifacts']} artifacts, {result['markdown_bytes'] / 1024:.0f} KiB markdown")
+        print(f"  {'stage':<26}{'wall ms':>10}{'peak KiB':>12}{'blocks':>10}{'vs baseline':>14}")
+        old_stages = (baseline or {}).get(corpus, {}).get("stages", {})
+        for stage, m in result["stages"].items():
+            old = old_stages.get(stage)
+            delta = f"{(m['wall_s'] / old['wall_s'] - 1) * 100:+.0f}%" if old and old["wall_s"] else ""
+            print(f"  {stage:<26}{m['wall_s'] * 1000:>10.1f}{m['peak_kib']:>12.1f}{m['blocks']:>10}{delta:>14}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the documentation generator stages against a stored baseline")
+    parser.add_argument("--corpora", default=",".join(CORPORA), help=f"Comma-separated corpora to run (default: {','.join(CORPORA)})")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage; the best is reported (default: 3)")
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, type=pathlib.Path, metavar="FILE",
+                        help=f"Store the results as a baseline (default: {DEFAULT_BASELINE.relative_to(REPO_ROOT)})")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, type=pathlib.Path, metavar="FILE",
+                        help="Compare with a stored baseline and exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown/growth per stage (default: 0.25)")
+    args = parser.parse_args()
+
+    corpora = [c.strip() for c in args.corpora.split(",") if c.strip()]
+    unknown = sorted(set(corpora) - set(CORPORA) - set(OPTIONAL_CORPORA))
+    if unknown:
+        parser.error(f"unknown corpora: {', '.join(unknown)} (choose from {', '.join(CORPORA + OPTIONAL_CORPORA)})")
+
+    baseline = None
+    if args.compare:
+        if not args.compare.exists():
+            parser.error(f"baseline not found: {args.compare}")
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))["results"]
+
+    results = run(corpora, max(args.repeat, 1))
+    print_report(results, baseline)
+
+    if args.save:
+        document = {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "results": results,
+        }
+        args.save.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+        print(f"\n[INFO] Saved baseline to {args.save}")
+
+    if baseline is not None:
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n[WARN] {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\n[INFO] No regressions beyond {args.threshold:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+generate_corpus.py
+
+Synthetic Intune corpus for load testing the tools at tenant scale.
+
+Writes, under OUTPUT/configurations/intune/:
+ - pol-syn-NNNNN-*.json          Settings Catalog policies in the Graph shape of pol-*.json
+                                 (group collections, choice / simple / simple collection values)
+ - cfg-syn-NNNNN-*.mobileconfig  custom configuration profiles (PayloadContent plists)
+ - cmp-syn-NNNNN-*.json          macOSCompliancePolicy documents like cmp-cmp-001
+and a MacIntuneManifest .xml sibling for every artifact.
+
+The output is a pure function of the options: the same --seed always produces
+byte-identical files.
+
+Usage:
+  python3 tools/benchmarks/generate_corpus.py OUTPUT [--policies 1000] [--mobileconfigs 100]
+      [--compliance 20] [--settings 12] [--depth 3] [--collection-size 4]
+      [--value-mix 6:3:1] [--placeholder-rate 0.05] [--seed 0] [--with-generator]
+
+  --value-mix is the choice:simple:collection weighting of leaf settings.
+  --with-generator copies Generate-ConfigurationDocumentation.py and docgen_core.py into
+  OUTPUT/tools/ so the corpus can be documented directly:
+      python3 OUTPUT/tools/Generate-ConfigurationDocumentation.py
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import pathlib
+import plistlib
+import random
+import shutil
+import uuid
+from typing import Any, Dict, List, Tuple
+from xml.sax.saxutils import escape
+
+TOOLS_DIR = pathlib.Path(__file__).resolve().parent.parent
+GENERATOR_FILES = ("Generate-ConfigurationDocumentation.py", "docgen_core.py")
+ARTIFACT_DIR = pathlib.Path("configurations") / "intune"
+
+GRAPH = "#microsoft.graph."
+GROUP_COLLECTION = GRAPH + "deviceManagementConfigurationGroupSettingCollectionInstance"
+CHOICE = GRAPH + "deviceManagementConfigurationChoiceSettingInstance"
+SIMPLE = GRAPH + "deviceManagementConfigurationSimpleSettingInstance"
+SIMPLE_COLLECTION = GRAPH + "deviceManagementConfigurationSimpleSettingCollectionInstance"
+STRING_VALUE = GRAPH + "deviceManagementConfigurationStringSettingValue"
+INTEGER_VALUE = GRAPH + "deviceManagementConfigurationIntegerSettingValue"
+
+# Preference domains and key vocabulary the synthetic settings are drawn from
+DOMAINS = (
+    "com.apple.mcx", "com.apple.security.firewall", "com.apple.screensaver", "com.apple.loginwindow",
+    "com.apple.systempolicy.control", "com.apple.softwareupdate", "com.apple.applicationaccess",
+    "com.apple.MCX.FileVault2", "com.apple.dock", "com.apple.SetupAssistant.managed",
+    "com.microsoft.office", "com.microsoft.Edge", "com.microsoft.autoupdate2", "com.apple.extensiblesso",
+)
+KEY_WORDS = (
+    "allow", "enable", "disable", "force", "require", "show", "hide", "auto", "login", "screen",
+    "update", "password", "timeout", "delay", "policy", "account", "network", "remote", "defer",
+    "install", "notify", "lock", "guest", "admin", "window", "level", "mode", "list", "message",
+)
+OPTIONS = ("true", "false", "0", "1", "2", "enabled", "disabled", "always", "never")
+PLACEHOLDERS = ("mail", "userprincipalname", "DEVICEREGISTRATION", "serialnumber", "deviceid", "username")
+STRING_WORDS = ("contoso", "fabrikam", "northwind", "https://portal.example.com", "*.example.com", "Intune", "macOS")
+COMPLIANCE_FIELDS = (
+    ("passwordRequired", bool), ("passwordBlockSimple", bool), ("passwordMinimumLength", int),
+    ("passwordMinutesOfInactivityBeforeLock", int), ("passwordExpirationDays", int),
+    ("storageRequireEncryption", bool), ("deviceThreatProtectionEnabled", bool),
+    ("firewallEnabled", bool), ("firewallBlockAllIncoming", bool), ("firewallEnableStealthMode", bool),
+    ("systemIntegrityProtectionEnabled", bool), ("gatekeeperAllowedAppSource", str),
+    ("managedEmailProfileRequired", bool),
+)
+CATEGORIES = ("Security", "System", "Apps", "Config", "Identity")
+
+class CorpusGenerator:
+    """Seeded generator of Settings Catalog, mobileconfig, compliance and manifest documents."""
+
+    def __init__(self, seed: int = 0, settings: int = 12, depth: int = 3, collection_size: int = 4,
+                 value_mix: Tuple[int, int, int] = (6, 3, 1), placeholder_rate: float = 0.05):
+        self.rng = random.Random(seed)
+        self.settings = max(settings, 1)
+        self.depth = max(depth, 1)
+        self.collection_size = max(collection_size, 1)
+        self.value_mix = value_mix
+        self.placeholder_rate = placeholder_rate
+        self.leaves = 0  # leaf settings emitted for the current policy
+
+    # --- building blocks ---------------------------------------------------------
+
+    def uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def key(self) -> str:
+        first, second = self.rng.sample(KEY_WORDS, 2)
+        return first + second.capitalize()
+
+    def sentence(self, words: int = 12) -> str:
+        text = " ".join(self.rng.choice(KEY_WORDS) for _ in range(words))
+        return text.capitalize() + "."
+
+    def string_value(self) -> str:
+        if self.rng.random() < self.placeholder_rate:
+            return f"{{{{{self.rng.choice(PLACEHOLDERS)}}}}}@{self.rng.choice(STRING_WORDS)}"
+        return self.rng.choice(STRING_WORDS)
+
+    def simple_value(self) -> Dict[str, Any]:
+        if self.rng.random() < 0.5:
+            return {"@odata.type": INTEGER_VALUE, "settingValueTemplateReference": None, "value": self.rng.randint(0, 3600)}
+        return {"@odata.type": STRING_VALUE, "settingValueTemplateReference": None, "value": self.string_value()}
+
+    # --- Settings Catalog ---------------------------------------------------------
+
+    def leaf(self, domain: str, level: int) -> Dict[str, Any]:
+        self.leaves += 1
+        definition = f"{domain}_{self.key()}".lower()
+        kind = self.rng.choices(("choice", "simple", "collection"), weights=self.value_mix)[0]
+        if kind == "choice":
+            children = []
+            if level < self.depth and self.rng.random() < 0.2:
+                children = [self.leaf(domain, level + 1) for _ in range(self.rng.randint(1, 2))]
+            return {
+                "@odata.type": CHOICE,
+                "settingDefinitionId": definition,
+                "settingInstanceTemplateReference": None,
+                "choiceSettingValue": {
+                    "settingValueTemplateReference": None,
+                    "value": f"{definition}_{self.rng.choice(OPTIONS)}",
+                    "children": children,
+                },
+            }
+        if kind == "simple":
+            return {
+                "@odata.type": SIMPLE,
+                "settingDefinitionId": definition,
+                "settingInstanceTemplateReference": None,
+                "simpleSettingValue": self.simple_value(),
+            }
+        return {
+            "@odata.type": SIMPLE_COLLECTION,
+            "settingDefinitionId": definition,
+            "settingInstanceTemplateReference": None,
+            "simpleSettingCollectionValue": [
+                {"@odata.type": STRING_VALUE, "settingValueTemplateReference": None, "value": self.string_value()}
+                for _ in range(self.rng.randint(1, self.collection_size))
+            ],
+        }
+
+    def group(self, domain: str, level: int) -> Dict[str, Any]:
+        """A group setting collection; nests further groups until ``depth`` is reached.
+
+        Like real exports, most groups hold a single item; one in five repeats it.
+        """
+        items = []
+        repeats = self.rng.randint(1, self.collection_size) if self.rng.random() < 0.2 else 1
+        for _ in range(repeats):
+            children = []
+            for _ in range(self.rng.randint(1, self.collection_size)):
+                if level < self.depth and self.rng.random() < 0.25:
+                    children.append(self.group(domain, level + 1))
+                else:
+                    children.append(self.leaf(domain, level + 1))
+            items.append({"settingValueTemplateReference": None, "children": children})
+        return {
+            "@odata.type": GROUP_COLLECTION,
+            "settingDefinitionId": f"{domain}_{domain}".lower() if level == 1 else f"{domain}_{self.key()}".lower(),
+            "settingInstanceTemplateReference": None,
+            "groupSettingCollectionValue": items,
+        }
+
+    def policy(self, name: str) -> Dict[str, Any]:
+        """A policy with roughly ``settings`` leaf settings spread over top-level instances."""
+        target = self.rng.randint(max(1, self.settings // 2), self.settings + self.settings // 2)
+        self.leaves = 0
+        settings = []
+        while self.leaves < target:
+            domain = self.rng.choice(DOMAINS)
+            instance = self.group(domain, 1) if self.rng.random() < 0.7 else self.leaf(domain, 1)
+            settings.append({"id": str(len(settings)), "settingInstance": instance})
+        count = len(settings)
+        stamp = f"2025-{self.rng.randint(1, 12):02d}-{self.rng.randint(1, 28):02d}T12:00:00.000Z"
+        return {
+            "@odata.context": "https://graph.microsoft.com/beta/$metadata#deviceManagement/configurationPolicies/$entity",
+            "createdDateTime": stamp,
+            "creationSource": None,
+            "description": self.sentence(),
+            "lastModifiedDateTime": stamp,
+            "name": name,
+            "platforms": "macOS",
+            "priorityMetaData": None,
+            "roleScopeTagIds": ["0"],
+            "settingCount": count,
+            "technologies": "mdm,appleRemoteManagement",
+            "templateReference": {"templateId": "", "templateFamily": "none", "templateDisplayName": None, "templateDisplayVersion": None},
+            "settings": settings,
+        }
+
+    # --- mobileconfig / compliance ------------------------------------------------
+
+    def plist_value(self, level: int = 0) -> Any:
+        kind = self.rng.choice(("bool", "int", "string", "array", "dict") if level < 2 else ("bool", "int", "string"))
+        if kind == "bool":
+            return self.rng.random() < 0.5
+        if kind == "int":
+            return self.rng.randint(0, 86400)
+        if kind == "string":
+            return self.string_value()
+        if kind == "array":
+            return [self.string_value() for _ in range(self.rng.randint(1, self.collection_size))]
+        return {self.key(): self.plist_value(level + 1) for _ in range(self.rng.randint(1, 3))}
+
+    def mobileconfig(self, name: str, identifier: str) -> Dict[str, Any]:
+        payloads = []
+        for _ in range(self.rng.randint(1, 3)):
+            domain = self.rng.choice(DOMAINS)
+            payload: Dict[str, Any] = {
+                "PayloadDisplayName": f"{name} ({domain})",
+                "PayloadIdentifier": f"{domain}.{self.uuid()}",
+                "PayloadType": domain,
+                "PayloadUUID": self.uuid(),
+                "PayloadVersion": 1,
+            }
+            for _ in range(self.rng.randint(1, self.settings)):
+                payload[self.key()] = self.plist_value()
+            payloads.append(payload)
+        return {
+            "PayloadContent": payloads,
+            "PayloadDisplayName": name,
+            "PayloadIdentifier": identifier,
+            "PayloadType": "Configuration",
+            "PayloadUUID": self.uuid(),
+            "PayloadVersion": 1,
+        }
+
+    def compliance(self, name: str) -> Dict[str, Any]:
+        doc: Dict[str, Any] = {"@odata.type": GRAPH + "macOSCompliancePolicy", "displayName": name, "description": self.sentence()}
+        for field, kind in self.rng.sample(COMPLIANCE_FIELDS, self.rng.randint(4, len(COMPLIANCE_FIELDS))):
+            if kind is bool:
+                doc[field] = self.rng.random() < 0.5
+            elif kind is int:
+                doc[field] = self.rng.randint(1, 30)
+            else:
+                doc[field] = self.rng.choice(("macAppStore", "macAppStoreAndIdentifiedDevelopers", "anywhere"))
+        doc["osMinimumVersion"] = f"{self.rng.randint(13, 15)}.{self.rng.randint(0, 6)}"
+        doc["scheduledActionsForRule"] = [{
+            "ruleName": "default",
+            "scheduledActionConfigurations": [{"actionType": "block", "gracePeriodHours": self.rng.choice((0, 24, 72)), "notificationTemplateId": None}],
+        }]
+        return doc
+
+    def manifest(self, ref: str, type_: str, name: str, source: str, settings_count: int | None = None) -> str:
+        lines = [
+            "<MacIntuneManifest>",
+            f"  <ReferenceId>{escape(ref)}</ReferenceId>",
+            "  <Version>1.0</Version>",
+            f"  <Type>{type_}</Type>",
+            f"  <Name>{escape(ref)} - {escape(name)}</Name>",
+            f"  <Description>{escape(self.sentence(20))}</Description>",
+            "  <Platform>macOS</Platform>",
+            f"  <Category>{self.rng.choice(CATEGORIES)}</Category>",
+            f"  <SourceFile>{escape(source)}</SourceFile>",
+        ]
+        if settings_count is not None:
+            lines.append(f"  <SettingsCount>{settings_count}</SettingsCount>")
+        lines.append("</MacIntuneManifest>")
+        return "\n".join(lines) + "\n"
+
+    # --- output ---------------------------------------------------------------------
+
+    def write(self, root: pathlib.Path, policies: int, mobileconfigs: int, compliance: int) -> Dict[str, int]:
+        """Write the corpus under ``root`` and return how many artifacts of each kind were written."""
+        out_dir = root / ARTIFACT_DIR
+        out_dir.mkdir(parents=True, exist_ok=True)
+        plan: List[Tuple[str, str, str, int]] = (
+            [("pol", "Policy", ".json", i) for i in range(1, policies + 1)]
+            + [("cfg", "CustomConfig", ".mobileconfig", i) for i in range(1, mobileconfigs + 1)]
+            + [("cmp", "Compliance", ".json", i) for i in range(1, compliance + 1)]
+        )
+        counts = {"Policy": 0, "CustomConfig": 0, "Compliance": 0}
+        for prefix, type_, suffix, i in plan:
+            slug = f"{self.rng.choice(KEY_WORDS)}-{self.rng.choice(KEY_WORDS)}"
+            stem = f"{prefix}-syn-{i:05d}-{slug}"
+            ref = f"{prefix}-syn-{i:05d}".upper()
+            name = slug.replace("-", " ").title()
+            source = (ARTIFACT_DIR / f"{stem}{suffix}").as_posix()
+            settings_count = None
+            if type_ == "Policy":
+                doc = self.policy(name)
+                settings_count = doc["settingCount"]
+                data = json.dumps(doc, indent=2).encode("utf-8")
+            elif type_ == "Compliance":
+                data = json.dumps(self.compliance(name), indent=2).encode("utf-8")
+            else:
+                data = plistlib.dumps(self.mobileconfig(name, f"com.contoso.{stem}"), sort_keys=False)
+            (out_dir / f"{stem}{suffix}").write_bytes(data)
+            (out_dir / f"{stem}.xml").write_text(self.manifest(ref, type_, name, source, settings_count), encoding="utf-8")
+            counts[type_] += 1
+        return counts
+
+def parse_value_mix(text: str) -> Tuple[int, int, int]:
+    parts = [int(p) for p in text.split(":")]
+    if len(parts) != 3 or min(parts) < 0 or not any(parts):
+        raise argparse.ArgumentTypeError("expected choice:simple:collection weights, e.g. 6:3:1")
+    return parts[0], parts[1], parts[2]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a reproducible synthetic Intune corpus for load testing")
+    parser.add_argument("output", type=pathlib.Path, help="Directory to write the corpus into (laid out like the repository)")
+    parser.add_argument("--policies", type=int, default=1000, help="Settings Catalog policies (default: 1000)")
+    parser.add_argument("--mobileconfigs", type=int, default=100, help="Custom configuration profiles (default: 100)")
+    parser.add_argument("--compliance", type=int, default=20, help="Compliance policies (default: 20)")
+    parser.add_argument("--settings", type=int, default=12, help="Average leaf settings per policy, keys per payload (default: 12)")
+    parser.add_argument("--depth", type=int, default=3, help="Maximum nesting depth of setting groups (default: 3)")
+    parser.add_argument("--collection-size", type=int, default=4, help="Maximum items per collection (default: 4)")
+    parser.add_argument("--value-mix", type=parse_value_mix, default=(6, 3, 1), metavar="C:S:L",
+                        help="Relative weights of choice, simple and simple-collection leaf settings (default: 6:3:1)")
+    parser.add_argument("--placeholder-rate", type=float, default=0.05, help="Share of string values containing a {{placeholder}} (default: 0.05)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed; identical seeds give identical output (default: 0)")
+    parser.add_argument("--with-generator", action="store_true", help=f"Copy {' and '.join(GENERATOR_FILES)} into OUTPUT/tools/")
+    args = parser.parse_args()
+
+    generator = CorpusGenerator(seed=args.seed, settings=args.settings, depth=args.depth,
+                                collection_size=args.collection_size, value_mix=args.value_mix,
+                                placeholder_rate=args.placeholder_rate)
+    counts = generator.write(args.output, args.policies, args.mobileconfigs, args.compliance)
+    if args.with_generator:
+        tools = args.output / "tools"
+        tools.mkdir(parents=True, exist_ok=True)
+        for name in GENERATOR_FILES:
+            shutil.copyfile(TOOLS_DIR / name, tools / name)
+    summary = ", ".join(f"{n} {kind}" for kind, n in counts.items())
+    print(f"[INFO] Wrote {summary} (+ manifests) to {args.output / ARTIFACT_DIR}")
+
+if __name__ == "__main__":
+    main()
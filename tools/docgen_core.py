@@ -0,0 +1,1337 @@
+"""
+docgen_core
+
+What every tool needs to read the repository: the walk, the parse cache, manifest,
+Graph JSON and mobileconfig parsing, the Artifact model and validation.
+Generate-ConfigurationDocumentation.py builds the documentation on top of it;
+Find-DuplicatePayloadSettings.py, Query-SettingsIndex.py, `imm validate` and
+intune_my_macs.py import only this module, so they start without the generator's
+rendering code.
+
+Modules only some runs need (the XML and plist parsers on cache misses, sqlite3
+and pickle for the parse cache, --jobs workers) are imported where they are used.
+"""
+
+from __future__ import annotations
+import functools
+import hashlib
+import json
+import os
+import pathlib
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Set, Tuple
+
+TOOLS_DIR = pathlib.Path(__file__).resolve().parent
+REPO_ROOT = TOOLS_DIR.parent
+CACHE_DIR = REPO_ROOT / ".docgen-cache"
+CACHE_FILE = CACHE_DIR / "parse-cache.sqlite3"
+CACHE_VERSION = 2
+# A change to either file discards the cache: parsing lives here, rendering in the generator
+CACHE_SOURCES = (pathlib.Path(__file__).resolve(), TOOLS_DIR / "Generate-ConfigurationDocumentation.py")
+# Files modified this recently may change again within the same mtime tick,
+# so their stat signature is not trusted on the next run.
+CACHE_RACY_WINDOW_NS = 2_000_000_000
+
+# Top-level directories whose .json / .mobileconfig files are documented artifacts.
+# Manifest XML (.xml) is picked up anywhere in the repository.
+ARTIFACT_DIRS = ("configurations", "mde")
+MDE_DIR = "mde"
+INDEXED_SUFFIXES = (".json", ".mobileconfig", ".xml")
+# Never descended into, regardless of .gitignore
+ALWAYS_PRUNED = {".git"}
+
+METADATA_KEYS = {"PayloadDisplayName", "PayloadIdentifier", "PayloadType", "PayloadUUID", "PayloadVersion"}
+
+class IgnoreRules:
+    """Subset of .gitignore semantics used to prune the repository walk.
+
+    Supports comments, ``!`` negation (last match wins), trailing ``/`` for
+    directory-only patterns and leading or embedded ``/`` for anchored patterns.
+    Unanchored patterns match the basename at any depth.
+    """
+
+    def __init__(self, lines: List[str]):
+        self.rules: List[Tuple[str, bool, bool, bool]] = []
+        for line in lines:
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            self.rules.append((line.lstrip("/"), negate, dir_only, anchored))
+
+    @classmethod
+    def from_file(cls, path: pathlib.Path) -> IgnoreRules:
+        try:
+            return cls(path.read_text(encoding="utf-8").splitlines())
+        except OSError:
+            return cls([])
+
+    def ignored(self, rel: str, name: str, is_dir: bool) -> bool:
+        import fnmatch
+        result = False
+        for pattern, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if fnmatch.fnmatchcase(rel if anchored else name, pattern):
+                result = not negate
+        return result
+
+class PathIndex:
+    """Files discovered by a single walk of the repository, grouped by suffix.
+
+    Each group is a sorted list of (posix relpath, absolute path) pairs so stages
+    can filter by directory with plain string prefixes; relpaths are relative to
+    ``root``.
+    """
+
+    def __init__(self, include_mde: bool, root: pathlib.Path = REPO_ROOT):
+        self.include_mde = include_mde
+        self.root = root
+        self.by_suffix: Dict[str, List[Tuple[str, pathlib.Path]]] = {s: [] for s in INDEXED_SUFFIXES}
+
+    def files(self, suffix: str, under: Tuple[str, ...] | None = None) -> List[pathlib.Path]:
+        """Return indexed files with ``suffix``, optionally limited to top-level directories ``under``."""
+        items = self.by_suffix.get(suffix, [])
+        if under is None:
+            return [p for _, p in items]
+        prefixes = tuple(d + "/" for d in under)
+        return [p for rel, p in items if rel.startswith(prefixes)]
+
+def walk_repository(include_mde: bool = False, root: pathlib.Path = REPO_ROOT) -> PathIndex:
+    """Walk ``root`` once with os.scandir, classifying files by suffix.
+
+    Prunes .git and anything matched by the root .gitignore, and skips the MDE
+    folder entirely unless ``include_mde`` is set.
+    """
+    ignore = IgnoreRules.from_file(root / ".gitignore")
+    index = PathIndex(include_mde, root)
+    stack: List[Tuple[str, str]] = [(str(root), "")]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            it = os.scandir(dir_path)
+        except OSError as e:
+            print(f"[WARN] Failed to list directory {dir_path}: {e}")
+            continue
+        with it:
+            for de in it:
+                rel = rel_dir + de.name
+                if de.is_dir(follow_symlinks=False):
+                    if de.name in ALWAYS_PRUNED or (not include_mde and rel == MDE_DIR):
+                        continue
+                    if not ignore.ignored(rel, de.name, True):
+                        stack.append((de.path, rel + "/"))
+                    continue
+                group = index.by_suffix.get(os.path.splitext(de.name)[1])
+                if group is not None and de.is_file() and not ignore.ignored(rel, de.name, False):
+                    group.append((rel, pathlib.Path(de.path)))
+    for group in index.by_suffix.values():
+        group.sort()
+    return index
+
+def gather_files(include_mde: bool = False, root: pathlib.Path = REPO_ROOT) -> PathIndex:
+    """Discover all candidate artifact and manifest files (see walk_repository)."""
+    return walk_repository(include_mde, root)
+
+def safe_read_json(path: pathlib.Path, raw: bytes | None = None) -> Dict[str, Any] | None:
+    """Read JSON tolerating UTF-8 BOM. ``raw`` skips the read when the bytes are already loaded."""
+    try:
+        # Read raw then decode handling BOM if present
+        if raw is None:
+            raw = path.read_bytes()
+        text = raw.decode("utf-8-sig")  # utf-8-sig strips BOM if present
+        return json.loads(text)
+    except Exception as e:
+        print(f"[WARN] Failed to parse JSON {path}: {e}")
+        return None
+
+def safe_read_plist(path: pathlib.Path, raw: bytes | None = None) -> Dict[str, Any] | None:
+    import plistlib
+    try:
+        if raw is not None:
+            return plistlib.loads(raw)
+        with path.open("rb") as f:
+            return plistlib.load(f)
+    except Exception as e:
+        print(f"[WARN] Failed to parse mobileconfig plist {path}: {e}")
+        return None
+
+def file_digest(raw: bytes) -> str:
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS records (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime_ns INTEGER,
+    digest TEXT NOT NULL,
+    value BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fragments (key TEXT PRIMARY KEY, text TEXT NOT NULL);
+"""
+# Max host parameters per "IN (...)" lookup (SQLite's historical default limit is 999)
+CACHE_LOOKUP_CHUNK = 500
+
+class ParseCache:
+    """On-disk cache of parsed artifacts and rendered markdown fragments.
+
+    Level 1 maps a repo-relative path to its (size, mtime_ns) signature, content
+    digest and the values extracted from it. A matching signature is trusted as-is;
+    a mismatch falls back to comparing the content digest, so files that were only
+    touched are not re-parsed. Level 2 maps an entry key (built from the digests of
+    the artifact and its manifest) to the rendered markdown section.
+
+    Records live in a SQLite file and are looked up per batch, so memory does not
+    grow with the size of the cache. The whole cache is discarded when one of the
+    CACHE_SOURCES changes, so extraction or rendering changes never serve stale
+    results. ``metrics`` is the generator's RunMetrics (--metrics), if any.
+    ``ParseCache(None)`` is a pass-through that never reads or writes anything.
+    Record paths are relative to ``root``, so one cache file serves one checkout;
+    the tools all share CACHE_FILE.
+    """
+
+    def __init__(self, path: pathlib.Path | None, metrics: Any = None, root: pathlib.Path = REPO_ROOT):
+        import threading
+        self.path = path
+        self.root = root
+        self.enabled = path is not None
+        self.metrics = metrics
+        self.hits = 0
+        self.misses = 0
+        self._db: sqlite3.Connection | None = None
+        self._used_records: set[str] = set()
+        self._used_fragments: set[str] = set()
+        self._dirty = False
+        # Renderer threads read and add fragments while the main thread fetches records
+        self._lock = threading.Lock()
+        if self.enabled:
+            self._open()
+
+    def _open(self) -> None:
+        import sqlite3
+        stamp = ":".join([str(CACHE_VERSION)] + [file_digest(p.read_bytes()) for p in CACHE_SOURCES if p.is_file()])
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), check_same_thread=False)
+            db.executescript(CACHE_SCHEMA)
+            row = db.execute("SELECT value FROM meta WHERE key = 'stamp'").fetchone()
+            if row is None or row[0] != stamp:
+                db.execute("DELETE FROM records")
+                db.execute("DELETE FROM fragments")
+                db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('stamp', ?)", (stamp,))
+                db.commit()
+        except (OSError, sqlite3.Error) as e:
+            print(f"[WARN] Parse cache unavailable, continuing without it ({self.path}): {e}")
+            self.enabled = False
+            return
+        self._db = db
+
+    def _lookup(self, keys: List[str]) -> Dict[str, Tuple[int | None, int | None, str, bytes]]:
+        found: Dict[str, Tuple[int | None, int | None, str, bytes]] = {}
+        for start in range(0, len(keys), CACHE_LOOKUP_CHUNK):
+            chunk = keys[start:start + CACHE_LOOKUP_CHUNK]
+            query = f"SELECT path, size, mtime_ns, digest, value FROM records WHERE path IN ({','.join('?' * len(chunk))})"
+            for key, size, mtime_ns, digest, value in self._db.execute(query, chunk):
+                found[key] = (size, mtime_ns, digest, value)
+        return found
+
+    def fetch(self, path: pathlib.Path, parse: Callable[[pathlib.Path, bytes | None], Any]) -> Tuple[Any, str]:
+        """Return (value, digest) for ``path``, calling ``parse(path, raw)`` only when the file changed.
+
+        A ``None`` result from ``parse`` signals a failure and is never cached, so the
+        file keeps being retried (and warned about) on later runs.
+        """
+        return self.fetch_many([path], parse)[0]
+
+    def fetch_many(self, paths: List[pathlib.Path], parse: Callable[[pathlib.Path, bytes | None], Any],
+                   pool: WorkerPool | None = None) -> List[Tuple[Any, str]]:
+        """Batch form of fetch(): cache misses are read and parsed on ``pool``.
+
+        Results come back in the order of ``paths`` and any [WARN] output is replayed
+        in that same order, whatever the number of workers.
+        """
+        import pickle
+        results: List[Tuple[Any, str]] = [(None, "")] * len(paths)
+        keys = [path.relative_to(self.root).as_posix() for path in paths]
+        if self.enabled:
+            with self._lock:
+                records = self._lookup(keys)
+        else:
+            records = {}
+        pending: List[Tuple[int, Tuple[int, int | None] | None, Tuple[Any, ...] | None]] = []
+        now = time.time_ns()
+        for i, (path, key) in enumerate(zip(paths, keys)):
+            record = records.get(key)
+            sig = None
+            if self.enabled:
+                try:
+                    st = path.stat()
+                except OSError:
+                    st = None
+                if st is not None:
+                    if record is not None and record[:2] == (st.st_size, st.st_mtime_ns):
+                        self.hits += 1
+                        self._used_records.add(key)
+                        results[i] = (pickle.loads(record[3]), record[2])
+                        continue
+                    # Leave mtime unset for files modified within the racy window
+                    sig = (st.st_size, st.st_mtime_ns if st.st_mtime_ns <= now - CACHE_RACY_WINDOW_NS else None)
+            pending.append((i, sig, record))
+
+        collect = self.metrics is not None and self.metrics.enabled
+        tasks = [(parse, paths[i], record[2] if record else None, self.enabled, collect) for i, _, record in pending]
+        outcomes = pool.starmap(load_artifact, tasks) if pool is not None else [load_artifact(*t) for t in tasks]
+        for (i, sig, record), (parsed, value, digest, log, stats) in zip(pending, outcomes):
+            if log:
+                print(log, end="")
+            if stats is not None:
+                self.metrics.record_file(keys[i], paths[i].suffix, stats)
+            if not parsed:
+                self.hits += 1
+                value = pickle.loads(record[3])
+            elif self.enabled:
+                self.misses += 1
+            results[i] = (value, digest)
+            if self.enabled and value is not None:
+                size, mtime_ns = sig if sig is not None else (None, None)
+                blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                with self._lock:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO records (path, size, mtime_ns, digest, value) VALUES (?, ?, ?, ?, ?)",
+                        (keys[i], size, mtime_ns, digest, blob),
+                    )
+                self._used_records.add(keys[i])
+                self._dirty = True
+        return results
+
+    def fragment(self, key: str, render: Callable[[], str]) -> str:
+        """Return the cached rendering for ``key`` or render and remember it."""
+        if not self.enabled or not key:
+            return render()
+        with self._lock:
+            row = self._db.execute("SELECT text FROM fragments WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            text = row[0]
+        else:
+            text = render()
+            with self._lock:
+                self._db.execute("INSERT OR REPLACE INTO fragments (key, text) VALUES (?, ?)", (key, text))
+                self._dirty = True
+        self._used_fragments.add(key)
+        return text
+
+    def commit(self) -> None:
+        """Commit pending writes without pruning, so other processes are not locked out between saves."""
+        if self.enabled and self._dirty:
+            import sqlite3
+            with self._lock:
+                try:
+                    self._db.commit()
+                    self._dirty = False
+                except sqlite3.Error as e:
+                    print(f"[WARN] Failed to write parse cache {self.path}: {e}")
+
+    def save(self) -> None:
+        """Commit this run's changes and drop what no run can use any more.
+
+        The tools share one cache file and each fetches its own subset of the files,
+        so a record is only dropped once its file is gone. Fragments are dropped
+        when this run rendered without them (their entry changed or went away).
+        """
+        if not self.enabled:
+            return
+        import sqlite3
+        try:
+            unused = [k for (k,) in self._db.execute("SELECT path FROM records").fetchall() if k not in self._used_records]
+            stale_records = [(k,) for k in unused if not (self.root / k).exists()]
+            stale_fragments = []
+            if self._used_fragments:
+                stale_fragments = [(k,) for (k,) in self._db.execute("SELECT key FROM fragments").fetchall() if k not in self._used_fragments]
+            if not (self._dirty or stale_records or stale_fragments):
+                return
+            self._db.executemany("DELETE FROM records WHERE path = ?", stale_records)
+            self._db.executemany("DELETE FROM fragments WHERE key = ?", stale_fragments)
+            self._db.commit()
+            self._dirty = False
+        except sqlite3.Error as e:
+            print(f"[WARN] Failed to write parse cache {self.path}: {e}")
+
+def load_artifact(parse: Callable[..., Any], path: pathlib.Path, known_digest: str | None,
+                  want_digest: bool, collect: bool = False) -> Tuple[bool, Any, str, str, Dict[str, Any] | None]:
+    """Read, hash and, when its digest differs from ``known_digest``, parse one file.
+
+    This is the unit of work shipped to --jobs workers. Anything ``parse`` prints
+    ([WARN] lines) is captured and returned so the caller can replay it in order.
+    Returns (parsed, value, digest, log, stats); ``parsed`` is False when the digest
+    matched. ``stats`` (bytes read, read/parse seconds, the parser's counters and the
+    normalization memo's hits/misses) is only gathered when ``collect`` is set,
+    otherwise it is None.
+    """
+    import contextlib
+    import io
+    log = io.StringIO()
+    stats: Dict[str, Any] | None = None
+    with contextlib.redirect_stdout(log):
+        start = time.perf_counter() if collect else 0.0
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            return True, parse(path, None), "", log.getvalue(), None
+        digest = file_digest(raw) if want_digest else ""
+        if known_digest is not None and digest == known_digest:
+            return False, None, digest, "", None
+        if collect:
+            stats = {"bytes": len(raw), "read_s": time.perf_counter() - start}
+            memo = normalization_cache_info()
+            start = time.perf_counter()
+            value = parse(path, raw, stats)
+            stats["parse_s"] = time.perf_counter() - start
+            after = normalization_cache_info()
+            stats["normalization_hits"] = after.hits - memo.hits
+            stats["normalization_misses"] = after.misses - memo.misses
+        else:
+            value = parse(path, raw)
+    return True, value, digest, log.getvalue(), stats
+
+class WorkerPool:
+    """Process pool behind --jobs. ``WorkerPool(1)`` runs everything inline.
+
+    Workers are only sent load_artifact() and this module's parse functions, so
+    whatever the start method (spawn is the macOS default) they just import this
+    module by name from the sys.path they inherit.
+    """
+
+    def __init__(self, jobs: int = 1):
+        self.jobs = max(1, jobs)
+        self._executor = None
+        if self.jobs > 1:
+            import concurrent.futures
+            self._executor = concurrent.futures.ProcessPoolExecutor(self.jobs)
+
+    def starmap(self, fn: Callable[..., Any], tasks: List[Tuple[Any, ...]]) -> List[Any]:
+        """Apply ``fn`` to each argument tuple, returning results in task order."""
+        if self._executor is None or len(tasks) < 2:
+            return [fn(*t) for t in tasks]
+        chunksize = max(1, len(tasks) // (self.jobs * 4))
+        return list(self._executor.map(fn, *zip(*tasks), chunksize=chunksize))
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> WorkerPool:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+# Manifest fields kept by parse_manifest(); the rest are not documented
+MANIFEST_FIELDS = ("ReferenceId", "Type", "Name", "Description", "SourceFile")
+# Type-specific manifest subtrees whose children are documented as settings
+MANIFEST_SUBTREES = ("Script", "Package", "CustomAttribute")
+
+def parse_manifest(path: pathlib.Path, raw: bytes | None = None,
+                   counters: Dict[str, Any] | None = None) -> Dict[str, Any] | None:
+    """Parse a manifest XML into plain data: root tag, MANIFEST_FIELDS texts and MANIFEST_SUBTREES.
+
+    Texts are kept unstripped (``None`` when empty) so callers can apply the same
+    checks they would on the ElementTree nodes.
+    """
+    import xml.etree.ElementTree as ET
+    start = time.perf_counter() if counters is not None else 0.0
+    try:
+        root = ET.fromstring(raw) if raw is not None else ET.parse(path).getroot()
+    except Exception as e:
+        print(f"[WARN] Failed to parse manifest XML {path}: {e}")
+        return None
+    if counters is not None:
+        counters["decode_s"] = time.perf_counter() - start
+    fields: Dict[str, str | None] = {}
+    subtrees: Dict[str, List[Tuple[str, str | None]]] = {}
+    for child in root:
+        tag = sys.intern(child.tag)
+        if tag in MANIFEST_FIELDS:
+            fields.setdefault(tag, child.text)
+        elif tag in MANIFEST_SUBTREES and tag not in subtrees:
+            subtrees[tag] = [(sys.intern(c.tag), c.text) for c in child]
+    return {"root": root.tag, "fields": fields, "subtrees": subtrees}
+
+def manifest_metadata(manifest: Dict[str, Any] | None) -> Dict[str, str]:
+    """Return the name/description/type metadata documented for a sibling manifest."""
+    meta: Dict[str, str] = {}
+    if not manifest:
+        return meta
+    fields = manifest["fields"]
+    for tag, key in (("Name", "name"), ("Description", "description"), ("Type", "type")):
+        text = fields.get(tag)
+        if text:
+            meta[key] = text.strip()
+    return meta
+
+# Keys under which Settings Catalog instances nest further instances. Everything else
+# (template references, simple values, metadata) holds no settingDefinitionId to extract.
+SETTINGS_CONTAINER_KEYS = frozenset({
+    "settingInstance",
+    "groupSettingValue",
+    "groupSettingCollectionValue",
+    "choiceSettingValue",
+    "choiceSettingCollectionValue",
+    "children",
+})
+
+def extract_settings_catalog(json_doc: Dict[str, Any], counters: Dict[str, int] | None = None,
+                             raw: List[Any] | None = None) -> List[Tuple[str, str]]:
+    """Return list of (settingDefinitionId, value) pairs by depth-first traversal.
+    Handles nested settingInstance and groupSettingCollectionValue/children structures.
+    Walks with an explicit stack and only descends into SETTINGS_CONTAINER_KEYS, so deep
+    trees cannot hit the recursion limit. Visited dict/list nodes are added to
+    ``counters['settings_nodes']`` when a counters dict is passed. When ``raw`` is
+    given it receives, in step with the result, each unnormalized value (see raw_value()).
+    """
+    out: List[Tuple[str, str]] = []
+    # Children are pushed in reverse so they pop in document order (pre-order DFS)
+    stack: List[Any] = [json_doc.get("settings", [])]
+    pop, push, extend = stack.pop, stack.append, stack.extend
+    visited = 0
+    while stack:
+        node = pop()
+        visited += 1
+        if isinstance(node, list):
+            extend(node[::-1])
+            continue
+        if not isinstance(node, dict):
+            continue
+        sdid = node.get("settingDefinitionId")
+        if sdid:
+            # Extract choice value
+            choice_block = node.get("choiceSettingValue")
+            if isinstance(choice_block, dict):
+                choice_val = choice_block.get("value")
+                if choice_val is not None:
+                    out.append((sdid, simplify_display_value(sdid, choice_val)))
+                    if raw is not None:
+                        raw.append(raw_value(choice_val, out[-1][1]))
+            # Extract simple value
+            simple_val_block = node.get("simpleSettingValue")
+            if isinstance(simple_val_block, dict):
+                val = simple_val_block.get("value")
+                if val is not None:
+                    out.append((sdid, simplify_display_value(sdid, val)))
+                    if raw is not None:
+                        raw.append(raw_value(val, out[-1][1]))
+            # Extract collection values (arrays)
+            collection_block = node.get("simpleSettingCollectionValue")
+            if isinstance(collection_block, list):
+                for idx, item in enumerate(collection_block):
+                    if isinstance(item, dict):
+                        val = item.get("value")
+                        if val is not None:
+                            # Use index suffix for multiple values
+                            out.append((f"{sdid}[{idx}]", simplify_display_value(sdid, val)))
+                            if raw is not None:
+                                raw.append(raw_value(val, out[-1][1]))
+        nested = [k for k in node if k in SETTINGS_CONTAINER_KEYS]
+        if len(nested) == 1:
+            # Common case: a single container key per node
+            value = node[nested[0]]
+            if value:
+                push(value)
+        elif nested:
+            extend([node[k] for k in reversed(nested) if node[k]])
+    if counters is not None:
+        counters["settings_nodes"] = counters.get("settings_nodes", 0) + visited
+    return out
+
+def simplify_value(val: Any) -> str:
+    """Basic normalization converting numbers and truncating long strings."""
+    if val is None:
+        return ""
+    if isinstance(val, (int, float)):
+        return str(val)
+    if isinstance(val, str):
+        if len(val) > 120:
+            return val[:117] + "..."
+        return val
+    return json.dumps(val)
+
+BOOLEAN_SUFFIXES = {"_true": "True", "_false": "False"}
+PLACEHOLDER_RE = re.compile(r"{{.*?}}")
+# Distinct (key, raw value) pairs remembered by simplify_display_value()
+NORMALIZATION_CACHE_SIZE = 65536
+
+def _rule_placeholder(key: str, val: str) -> str | None:
+    """Preserve Jinja/placeholder tokens like {{mail}} untouched."""
+    if PLACEHOLDER_RE.search(val):
+        return val
+    return None
+
+def _rule_boolean_suffix(key: str, val: str) -> str | None:
+    """Map *_true/*_false to True/False when the preceding part matches the key."""
+    tail = val[-6:].lower()
+    for suf, mapped in BOOLEAN_SUFFIXES.items():
+        if tail.endswith(suf):
+            # Only if preceding part matches key prefix to avoid accidental mapping
+            prefix_part = val[: -len(suf)]
+            if key.startswith(prefix_part.rpartition('.')[2]) or prefix_part.endswith(key.rpartition('.')[2]):
+                return mapped
+    return None
+
+def _rule_key_prefix(key: str, val: str) -> str | None:
+    """Strip a value's leading copy of the key (plus one underscore, or all underscores otherwise)."""
+    if not val.startswith(key):
+        return None
+    # If value starts with the key, strip that prefix plus underscore
+    if val.startswith("_", len(key)):
+        return val[len(key) + 1:]
+    # Some values fully repeat path segments with underscores; attempt to drop matching leading portion
+    remainder = val[len(key):].lstrip('_')
+    return remainder or None
+
+# Applied in order; the first rule returning a string wins, otherwise the value is kept.
+NORMALIZATION_RULES: Tuple[Callable[[str, str], str | None], ...] = (
+    _rule_placeholder,
+    _rule_boolean_suffix,
+    _rule_key_prefix,
+)
+
+def _normalize_display_value(key: str, raw_val: Any) -> str:
+    val = simplify_value(raw_val)
+    for rule in NORMALIZATION_RULES:
+        result = rule(key, val)
+        if result is not None:
+            return result
+    return val
+
+_normalize_display_value_cached = functools.lru_cache(maxsize=NORMALIZATION_CACHE_SIZE, typed=True)(_normalize_display_value)
+
+def simplify_display_value(key: str, raw_val: Any) -> str:
+    """Remove duplicated key prefix embedded in Settings Catalog choice/simple values.
+    Examples:
+      key='com.apple.mcx.filevault2_enable', value='com.apple.mcx.filevault2_enable_0' -> '0'
+      key='com.apple.systempolicy.control_EnableAssessment', value='com.apple.systempolicy.control_EnableAssessment_true' -> 'True'
+      key='com.apple.managedclient.preferences_channelname', value='com.apple.managedclient.preferences_channelname_0' -> '0'
+    Also converts *_true/*_false suffixes to True/False.
+    Leaves placeholder tokens like {{mail}} intact.
+    The same (key, value) pairs repeat heavily across policies, so results are
+    memoized in a bounded LRU (see normalization_cache_info()).
+    """
+    try:
+        return _normalize_display_value_cached(key, raw_val)
+    except TypeError:
+        # Unhashable raw value (list/dict); normalize without the memo
+        return _normalize_display_value(key, raw_val)
+
+def normalization_cache_info() -> functools._CacheInfo:
+    return _normalize_display_value_cached.cache_info()
+
+def raw_value(raw: Any, display: str) -> Any:
+    """What extractors record as a setting's raw value: None when normalization left it unchanged."""
+    return None if raw == display and isinstance(raw, str) else raw
+
+def extract_mobileconfig(plist_doc: Dict[str, Any], raw: List[Any] | None = None) -> List[Tuple[str, str]]:
+    out: List[Tuple[str, str]] = []
+    payloads = plist_doc.get("PayloadContent", [])
+    for payload in payloads:
+        if not isinstance(payload, dict):
+            continue
+        # Use PayloadType as prefix (more meaningful than DisplayName)
+        prefix = payload.get("PayloadType", "payload")
+        for k, v in payload.items():
+            if k in METADATA_KEYS:
+                continue
+            if isinstance(v, (str, int, float)):
+                out.append((f"{prefix}.{k}", simplify_value(v)))
+            elif isinstance(v, (list, dict)):
+                # Summarize complex structure size
+                out.append((f"{prefix}.{k}", f"complex:{type(v).__name__}"))
+            else:
+                continue
+            if raw is not None:
+                raw.append(raw_value(v, out[-1][1]))
+    return out
+
+def mobileconfig_payload_types(plist_doc: Dict[str, Any]) -> Tuple[str, ...]:
+    """PayloadTypes used as setting id prefixes by extract_mobileconfig(), longest first."""
+    types = {p.get("PayloadType", "payload") for p in plist_doc.get("PayloadContent", []) if isinstance(p, dict)}
+    return tuple(sorted((t for t in types if isinstance(t, str)), key=len, reverse=True))
+
+def extract_compliance_policy(json_doc: Dict[str, Any], counters: Dict[str, Any] | None = None,
+                              raw: List[Any] | None = None) -> List[Tuple[str, str]]:
+    """Extract settings from compliance policy JSON (flat structure).
+    Ignores metadata fields and extracts policy configuration.
+    Derived rows (action counts and summaries) have no raw value.
+    """
+    out: List[Tuple[str, str]] = []
+    IGNORE_KEYS = {
+        "@odata.type", "displayName", "description", "id", "createdDateTime", 
+        "lastModifiedDateTime", "version", "roleScopeTagIds"
+    }
+    
+    for key, value in json_doc.items():
+        if key in IGNORE_KEYS:
+            continue
+        # Handle scheduledActionsForRule separately
+        if key == "scheduledActionsForRule" and isinstance(value, list):
+            for idx, rule in enumerate(value):
+                if isinstance(rule, dict):
+                    rule_name = rule.get("ruleName", f"rule_{idx}")
+                    configs = rule.get("scheduledActionConfigurations", [])
+                    if configs:
+                        out.append((f"{key}.{rule_name}.actionCount", str(len(configs))))
+                        for cidx, config in enumerate(configs):
+                            if isinstance(config, dict):
+                                action_type = config.get("actionType", "unknown")
+                                grace = config.get("gracePeriodHours", 0)
+                                out.append((f"{key}.{rule_name}.action_{cidx}", f"{action_type} (grace: {grace}h)"))
+            if raw is not None:
+                raw.extend([None] * (len(out) - len(raw)))
+        else:
+            out.append((key, simplify_value(value)))
+            if raw is not None:
+                raw.append(raw_value(value, out[-1][1]))
+    
+    return out
+
+# Preference-domain suffixes Settings Catalog uses for the user-scoped variant of a domain
+# (com.apple.screensaver.user_idleTime); they configure the same key as the device domain.
+SCOPE_DOMAIN_SUFFIXES = (".user",)
+COLLECTION_INDEX_RE = re.compile(r"\[\d+\]$")
+
+@functools.lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def canonical_setting_key(setting_id: str, payload_types: Tuple[str, ...] = ()) -> Tuple[str, str]:
+    """Map a setting id from any artifact format to a case-insensitive (domain, key) identity.
+
+    Settings Catalog ids are ``<domain>_<key>`` (``com.apple.screensaver_idletime``);
+    extract_mobileconfig() ids are ``<PayloadType>.<key>``, where both halves may contain
+    dots, so ``payload_types`` (the profile's PayloadTypes) says where the domain ends.
+    Collection indexes ("[0]") and user-scope domain suffixes are dropped. Ids in
+    neither form (compliance properties) get an empty domain.
+    """
+    setting_id = COLLECTION_INDEX_RE.sub("", setting_id)
+    for payload_type in payload_types:
+        if setting_id.startswith(payload_type + "."):
+            domain, key = payload_type, setting_id[len(payload_type) + 1:]
+            break
+    else:
+        domain, sep, key = setting_id.partition("_")
+        if not sep or "." not in domain:
+            return "", setting_id.lower()
+    domain = domain.lower()
+    for suffix in SCOPE_DOMAIN_SUFFIXES:
+        if domain.endswith(suffix):
+            domain = domain[:-len(suffix)]
+    return domain, key.lower()
+
+def classify_type(path: pathlib.Path) -> str:
+    name = path.name
+    # Derive from filename prefix (ref ID)
+    m = re.match(r"([a-z]{3})-([a-z]{3})-(\d{3})", name)
+    if m:
+        prefix = m.group(1)
+        mapping = {
+            "pol": "Policy",
+            "cfg": "CustomConfig",
+            "cmp": "Compliance",
+            "scr": "Script",
+            "cat": "CustomAttribute",
+            "app": "Package",
+        }
+        return mapping.get(prefix, "Unknown")
+    # fallback
+    if name.endswith(".mobileconfig"):
+        return "CustomConfig"
+    return "Policy"
+
+# Values up to this length are interned: "True", "0", enum names... repeat across
+# thousands of artifacts, while long ones (scripts, descriptions) rarely do
+INTERN_VALUE_MAX = 64
+
+class Setting(NamedTuple):
+    """One setting of an artifact; ``raw`` is None unless normalization changed the value."""
+    key: str
+    value: str
+    raw: Any = None
+
+class Artifact:
+    """One documented artifact (a policy, profile, script, package...).
+
+    Settings are stored column-wise instead of one tuple per setting: ``keys``
+    (interned, so an id shared by many artifacts is held once), ``values`` and
+    ``raw``, which is empty when no value was normalized. ``settings`` builds
+    Setting tuples on demand; ``pairs()`` yields (key, value) without them.
+    """
+
+    __slots__ = ("ref", "type", "relpath", "kind", "name", "description", "keys", "values", "raw",
+                 "payload_types", "digest")
+
+    def __init__(self, ref: str, type: str, relpath: str, kind: str | None, name: str | None,
+                 description: str | None, settings: Iterable[Tuple[str, str]] = (), raw: Iterable[Any] = (),
+                 payload_types: Tuple[str, ...] = (), digest: str = ""):
+        self.ref = ref
+        self.type = type
+        self.relpath = relpath
+        self.kind = kind
+        self.name = name
+        self.description = description or ""
+        intern = sys.intern
+        keys: List[str] = []
+        values: List[str] = []
+        for key, value in settings:
+            keys.append(intern(key))
+            values.append(intern(value) if len(value) <= INTERN_VALUE_MAX else value)
+        self.keys = tuple(keys)
+        self.values = tuple(values)
+        raw = tuple(raw)
+        self.raw = raw if any(r is not None for r in raw) else ()
+        self.payload_types = tuple(payload_types)
+        self.digest = digest
+
+    @property
+    def count(self) -> int:
+        return len(self.keys)
+
+    @property
+    def settings(self) -> List[Setting]:
+        raw = self.raw or (None,) * len(self.keys)
+        return list(map(Setting, self.keys, self.values, raw))
+
+    def pairs(self) -> Iterator[Tuple[str, str]]:
+        return zip(self.keys, self.values)
+
+    def __repr__(self) -> str:
+        return f"Artifact({self.ref!r}, {self.type!r}, {self.relpath!r}, {self.count} settings)"
+
+# Written by the generator's --catalog (CatalogWriter)
+CATALOG_NAME = "intune-my-macs"
+# Bump when a record field changes meaning or is removed; adding fields keeps the version
+CATALOG_VERSION = 1
+
+def iter_catalog(path: pathlib.Path) -> Iterator[Artifact]:
+    """Read an NDJSON catalog back as Artifacts."""
+    with path.open(encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("catalog") != CATALOG_NAME or header.get("version") != CATALOG_VERSION:
+            raise ValueError(f"{path} is not a version {CATALOG_VERSION} {CATALOG_NAME} catalog")
+        for line in f:
+            record = json.loads(line)
+            settings = record["settings"]
+            yield Artifact(record["ref"], record["type"], record["relpath"], record.get("kind"), record.get("name"),
+                           record.get("description"), [(s[0], s[1]) for s in settings],
+                           [s[2] if len(s) > 2 else None for s in settings],
+                           tuple(record.get("payload_types", ())), record.get("digest", ""))
+
+def extract_platform_restriction(doc: Dict[str, Any], counters: Dict[str, Any] | None = None,
+                                 raw: List[Any] | None = None) -> List[Tuple[str, str]]:
+    """Extract the platformRestriction block of an enrollment restriction JSON."""
+    out: List[Tuple[str, str]] = []
+    pr = doc.get("platformRestriction", {})
+    if isinstance(pr, dict):
+        for k, v in pr.items():
+            out.append((f"platformRestriction.{k}", simplify_value(v)))
+            if raw is not None:
+                raw.append(raw_value(v, out[-1][1]))
+    return out
+
+# A Graph JSON extractor takes (doc, counters, raw) like extract_settings_catalog() and
+# returns (key, display value) pairs, appending the matching raw values to ``raw``.
+JsonExtractor = Callable[..., List[Tuple[str, str]]]
+
+# Extractors by the end of the @odata.type name ("CompliancePolicy" covers
+# macOSCompliancePolicy, iosCompliancePolicy...); the longest matching suffix wins
+JSON_EXTRACTORS_BY_TYPE: Dict[str, JsonExtractor] = {
+    "CompliancePolicy": extract_compliance_policy,
+    "deviceEnrollmentPlatformRestriction": extract_platform_restriction,
+}
+# Extractors by top-level key, for documents whose @odata.type is missing or not
+# registered above (Settings Catalog exports carry none); first match wins
+JSON_EXTRACTORS_BY_SHAPE: Dict[str, JsonExtractor] = {
+    "settings": extract_settings_catalog,
+}
+
+def register_json_extractor(extractor: JsonExtractor, *odata_types: str, shape: str | None = None) -> JsonExtractor:
+    """Dispatch documents whose @odata.type ends with one of ``odata_types`` (or, failing
+    that, which have a top-level ``shape`` key) to ``extractor``.
+
+    Register at import time: worker processes (--jobs) and the parse cache, which is
+    only invalidated when a CACHE_SOURCES file changes, know nothing of later registrations.
+    """
+    for odata_type in odata_types:
+        JSON_EXTRACTORS_BY_TYPE[odata_type] = extractor
+    if shape is not None:
+        JSON_EXTRACTORS_BY_SHAPE[shape] = extractor
+    json_extractor_for_type.cache_clear()
+    return extractor
+
+@functools.lru_cache(maxsize=None)
+def json_extractor_for_type(odata_type: str) -> JsonExtractor | None:
+    name = odata_type.rpartition(".")[2]
+    for suffix in sorted(JSON_EXTRACTORS_BY_TYPE, key=len, reverse=True):
+        if name.endswith(suffix):
+            return JSON_EXTRACTORS_BY_TYPE[suffix]
+    return None
+
+def json_extractor_for(doc: Dict[str, Any]) -> JsonExtractor | None:
+    """The extractor for a Graph JSON document, from its top level only: @odata.type, then shape."""
+    odata_type = doc.get("@odata.type")
+    if isinstance(odata_type, str):
+        extractor = json_extractor_for_type(odata_type)
+        if extractor is not None:
+            return extractor
+    for key, extractor in JSON_EXTRACTORS_BY_SHAPE.items():
+        if key in doc:
+            return extractor
+    return None
+
+def extract_json_settings(doc: Dict[str, Any], counters: Dict[str, Any] | None = None,
+                          raw: List[Any] | None = None) -> List[Tuple[str, str]]:
+    """Extract settings from a Graph policy JSON with the extractor registered for its kind."""
+    extractor = json_extractor_for(doc)
+    return extractor(doc, counters, raw) if extractor is not None else []
+
+# Artifact parsers take (path, raw) and, when --metrics is on, a counters dict that
+# receives decode_s / extract_s timings and the settings walk's node count. They return
+# a dict with "settings" (key, display value) pairs and the matching "raw" values.
+
+def parse_json_artifact(path: pathlib.Path, raw: bytes | None = None,
+                        counters: Dict[str, Any] | None = None) -> Dict[str, Any] | None:
+    start = time.perf_counter() if counters is not None else 0.0
+    doc = safe_read_json(path, raw)
+    decoded = time.perf_counter() if counters is not None else 0.0
+    if not doc:
+        return None
+    raw_values: List[Any] = []
+    result = {"settings": extract_json_settings(doc, counters, raw_values), "raw": raw_values}
+    if counters is not None:
+        counters["decode_s"] = decoded - start
+        counters["extract_s"] = time.perf_counter() - decoded
+    return result
+
+def parse_mobileconfig_artifact(path: pathlib.Path, raw: bytes | None = None,
+                                counters: Dict[str, Any] | None = None) -> Dict[str, Any] | None:
+    start = time.perf_counter() if counters is not None else 0.0
+    doc = safe_read_plist(path, raw)
+    decoded = time.perf_counter() if counters is not None else 0.0
+    if not doc:
+        return None
+    raw_values: List[Any] = []
+    result = {
+        "settings": extract_mobileconfig(doc, raw_values),
+        "raw": raw_values,
+        "display_name": doc.get("PayloadDisplayName"),
+        "payload_types": mobileconfig_payload_types(doc),
+    }
+    if counters is not None:
+        counters["decode_s"] = decoded - start
+        counters["extract_s"] = time.perf_counter() - decoded
+    return result
+
+def entry_digest(*parts: str) -> str:
+    """Combine artifact identity and content digests into a fragment cache key."""
+    if not all(parts):
+        return ""
+    return hashlib.blake2b("\0".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+MANIFEST_LOAD_CHUNK = 1024
+
+class ManifestRegistry:
+    """Every manifest XML in a PathIndex, parsed exactly once.
+
+    ``by_path`` holds all parsed XML keyed by absolute path (sibling lookups read
+    Name/Description/Type from legacy roots too). MacIntuneManifest documents are
+    additionally indexed by their SourceFile (posix relpath) and upper-cased
+    ReferenceId; the first manifest in path order wins on duplicates. SourceFile
+    paths are resolved against ``root``.
+    """
+
+    def __init__(self, root: pathlib.Path = REPO_ROOT) -> None:
+        self.root = root
+        self.by_path: Dict[pathlib.Path, Tuple[Dict[str, Any], str]] = {}
+        self.by_source: Dict[str, pathlib.Path] = {}
+        self.by_reference: Dict[str, pathlib.Path] = {}
+
+    @classmethod
+    def load(cls, index: PathIndex, cache: ParseCache, pool: WorkerPool | None = None) -> ManifestRegistry:
+        registry = cls(index.root)
+        paths = index.files(".xml")
+        # Chunked so only one chunk of cached blobs is held at a time
+        for start in range(0, len(paths), MANIFEST_LOAD_CHUNK):
+            chunk = paths[start:start + MANIFEST_LOAD_CHUNK]
+            for path, (manifest, digest) in zip(chunk, cache.fetch_many(chunk, parse_manifest, pool)):
+                if manifest is not None:
+                    registry.add(path, manifest, digest)
+        return registry
+
+    def add(self, path: pathlib.Path, manifest: Dict[str, Any], digest: str) -> None:
+        self.by_path[path] = (manifest, digest)
+        if manifest["root"] != "MacIntuneManifest":
+            return
+        fields = manifest["fields"]
+        source = fields.get("SourceFile")
+        if source and source.strip():
+            self.by_source.setdefault(source.strip(), path)
+        ref_id = fields.get("ReferenceId")
+        if ref_id and ref_id.strip():
+            self.by_reference.setdefault(ref_id.strip().upper(), path)
+
+    def get(self, path: pathlib.Path) -> Tuple[Dict[str, Any] | None, str]:
+        return self.by_path.get(path, (None, ""))
+
+    def for_source(self, source_path: pathlib.Path) -> Tuple[Dict[str, Any] | None, str]:
+        """Return the manifest describing ``source_path``: its same-named sibling, else one whose SourceFile points at it."""
+        found = self.by_path.get(source_path.with_suffix('.xml'))
+        if found is not None:
+            return found
+        owner = self.by_source.get(source_path.relative_to(self.root).as_posix())
+        if owner is not None:
+            return self.by_path[owner]
+        return None, ""
+
+    def for_reference(self, ref_id: str) -> Tuple[Dict[str, Any] | None, str]:
+        owner = self.by_reference.get(ref_id.strip().upper())
+        return self.by_path[owner] if owner is not None else (None, "")
+
+def load_manifest_metadata(source_path: pathlib.Path, registry: ManifestRegistry) -> Tuple[Dict[str, str], str]:
+    """Load name/description/type from the manifest describing a source file.
+
+    Returns the metadata and the manifest's content digest ("-" when there is no manifest).
+    """
+    manifest, digest = registry.for_source(source_path)
+    if manifest is None:
+        return {}, "-"
+    return manifest_metadata(manifest), digest
+
+# Planned entries parsed per batch (per worker when --jobs > 1)
+ENTRY_BATCH_SIZE = 64
+
+# (ref, type, relpath, kind, path) where kind is "json", "mobileconfig" or "manifest"
+# and path is the artifact (or, for standalone manifests, the manifest) to load.
+PlanItem = Tuple[str, str, str, str, pathlib.Path]
+
+def plan_entries(index: PathIndex, registry: ManifestRegistry) -> List[PlanItem]:
+    """Decide which entries will be documented, in final order, without parsing any artifact.
+
+    Candidates are JSON artifacts, then standalone manifests, then mobileconfig profiles,
+    deduplicated by (ref, type, relpath) and stably sorted by ref.
+    """
+    # The MDE folder is already excluded by the walk unless --mde was passed
+    json_files = index.files(".json", under=ARTIFACT_DIRS)
+    mc_files = index.files(".mobileconfig", under=ARTIFACT_DIRS)
+
+    def source_item(f: pathlib.Path, kind: str) -> PlanItem:
+        manifest_meta, _ = load_manifest_metadata(f, registry)
+        derived_type = classify_type(f)
+        if 'type' in manifest_meta:
+            derived_type = manifest_meta['type']
+        return (f.stem, derived_type, str(f.relative_to(index.root)), kind, f)
+
+    planned: List[PlanItem] = [source_item(f, "json") for f in json_files]
+
+    # Add standalone manifests for Package, Script, CustomAttribute not covered above
+    # We discover all XML manifests and include those whose SourceFile points to a .pkg/.sh/.zsh etc.
+    documented = {item[2] for item in planned}
+    for mpath, (manifest, _) in registry.by_path.items():
+        try:
+            if manifest["root"] != 'MacIntuneManifest':
+                continue
+            fields = manifest["fields"]
+            if 'Type' not in fields or 'SourceFile' not in fields:
+                continue
+            artifact_type = fields['Type'].strip()
+            rel_source = fields['SourceFile'].strip()
+            
+            # Skip if already processed:
+            # - Policy/CustomConfig/Compliance that point to .json files (handled by JSON processing)
+            # - CustomConfig that points to .mobileconfig (handled by plist processing)
+            # These should ALWAYS be skipped since JSON/mobileconfig processing happens first
+            if artifact_type in {'Policy', 'CustomConfig', 'Compliance'} and rel_source.endswith('.json'):
+                continue
+            if artifact_type == 'CustomConfig' and rel_source.endswith('.mobileconfig'):
+                continue
+            
+            # Additional check: skip if already in entries by relpath
+            if rel_source in documented:
+                continue
+            rel_path_obj = index.root / rel_source
+            ref_id = rel_path_obj.stem if rel_path_obj.exists() else mpath.stem
+            planned.append((ref_id, artifact_type, rel_source, "manifest", mpath))
+            documented.add(rel_source)
+        except Exception as e:
+            print(f"[WARN] Failed processing manifest {mpath}: {e}")
+
+    planned.extend(source_item(f, "mobileconfig") for f in mc_files)
+    
+    # Deduplicate entries by (ref, type, relpath) tuple
+    seen = set()
+    deduped = []
+    for item in planned:
+        key = item[:3]
+        if key not in seen:
+            seen.add(key)
+            deduped.append(item)
+    
+    deduped.sort(key=lambda x: x[0])
+    return deduped
+
+def make_entry(item: PlanItem, parsed: Tuple[Any, str] | None, registry: ManifestRegistry) -> Artifact | None:
+    """Build the Artifact for a planned item; ``parsed`` is its (value, digest) from the cache.
+
+    Returns None when the artifact failed to parse.
+    """
+    ref_id, derived_type, relpath, kind, path = item
+    if kind == "manifest":
+        manifest, manifest_digest = registry.get(path)
+        fields = manifest["fields"]
+        # Extract subtree settings for Script, Package, CustomAttribute
+        settings: List[Tuple[str, str]] = []
+        if derived_type in MANIFEST_SUBTREES:
+            for tag, text in manifest["subtrees"].get(derived_type, []):
+                if text:
+                    settings.append((tag, text.strip()))
+        name = fields.get('Name')
+        desc = fields.get('Description')
+        return Artifact(ref_id, derived_type, relpath, kind, name.strip() if name else None,
+                        desc.strip() if desc else "", settings,
+                        digest=entry_digest(ref_id, derived_type, relpath, manifest_digest))
+
+    value, source_digest = parsed if parsed is not None else (None, "")
+    if value is None:
+        return None
+    manifest_meta, manifest_digest = load_manifest_metadata(path, registry)
+    payload_types: Tuple[str, ...] = ()
+    if kind == "json":
+        name = manifest_meta.get("name")
+        description = manifest_meta.get("description")
+    else:
+        name = manifest_meta.get("name") or value["display_name"]
+        description = manifest_meta.get("description", "")
+        payload_types = value["payload_types"]
+    return Artifact(ref_id, derived_type, relpath, kind, name, description, value["settings"], value["raw"],
+                    payload_types, entry_digest(ref_id, derived_type, relpath, source_digest, manifest_digest))
+
+ARTIFACT_PARSERS: Dict[str, Callable[..., Any]] = {
+    "json": parse_json_artifact,
+    "mobileconfig": parse_mobileconfig_artifact,
+}
+
+def iter_entries(include_mde: bool = False, cache: ParseCache | None = None, jobs: int = 1,
+                 index: PathIndex | None = None) -> Iterator[Artifact]:
+    """Yield an Artifact per documentation entry, one at a time, in final document order.
+
+    Discovery and manifest loading happen up front (see plan_entries()); artifacts are
+    then parsed in small batches, ``jobs`` > 1 on a process pool, so only one batch of
+    settings is held in memory at a time. ``index`` reuses an existing walk; it must
+    have been built with the same ``include_mde``.
+    """
+    if cache is None:
+        cache = ParseCache(None)
+    if index is None:
+        index = gather_files(include_mde)
+    with WorkerPool(jobs) as pool:
+        registry = ManifestRegistry.load(index, cache, pool)
+        plan = plan_entries(index, registry)
+        batch_size = ENTRY_BATCH_SIZE * pool.jobs
+        for start in range(0, len(plan), batch_size):
+            batch = plan[start:start + batch_size]
+            parsed: Dict[pathlib.Path, Tuple[Any, str]] = {}
+            for kind, parse in ARTIFACT_PARSERS.items():
+                paths = [item[4] for item in batch if item[3] == kind]
+                parsed.update(zip(paths, cache.fetch_many(paths, parse, pool)))
+            for item in batch:
+                entry = make_entry(item, parsed.get(item[4]), registry)
+                if entry is not None:
+                    yield entry
+
+def build_entries(include_mde: bool = False, cache: ParseCache | None = None, jobs: int = 1,
+                  index: PathIndex | None = None) -> List[Artifact]:
+    """Parse every artifact into an Artifact (see iter_entries())."""
+    return list(iter_entries(include_mde=include_mde, cache=cache, jobs=jobs, index=index))
+
+def iter_artifacts(root: str | os.PathLike = REPO_ROOT, include_mde: bool = False,
+                   cache: ParseCache | None = None, jobs: int = 1) -> Iterator[Artifact]:
+    """Library entry point: yield every artifact documented under ``root``, in document order.
+
+    ``root`` is a checkout laid out like this repository (configurations/, mde/, manifest
+    XML next to the artifacts). Nothing is written; pass a ParseCache opened with the
+    same ``root`` to skip re-parsing unchanged files across calls.
+    """
+    root = pathlib.Path(root).resolve()
+    if cache is None:
+        cache = ParseCache(None, root=root)
+    return iter_entries(include_mde=include_mde, cache=cache, jobs=jobs, index=gather_files(include_mde, root))
+
+class SectionMemo:
+    """Rendered sections kept in memory by entry digest, in front of the ParseCache fragments.
+
+    Renderers only call ``fragment()`` on the cache they are given, so a long-running
+    process hands them this instead and renders each section once. ``retain()`` drops
+    the sections of entries that are gone.
+    """
+
+    def __init__(self, cache: ParseCache):
+        self.cache = cache
+        self.sections: Dict[str, str] = {}
+
+    def fragment(self, key: str, render: Callable[[], str]) -> str:
+        if not key:
+            return render()
+        text = self.sections.get(key)
+        if text is None:
+            text = self.sections[key] = self.cache.fragment(key, render)
+        return text
+
+    def retain(self, keys: Iterable[str]) -> None:
+        sections = self.sections
+        self.sections = {k: sections[k] for k in keys if k in sections}
+
+class DocumentModel:
+    """All documentation entries held in memory and brought up to date file by file.
+
+    The first ``refresh()`` walks and parses everything like a normal run. Later calls
+    take the paths that changed. When only known JSON/mobileconfig artifacts were
+    modified, just their entries are rebuilt in place. A changed manifest can move or
+    retype entries, so the plan is redone from the in-memory manifests and parsed
+    values (re-reading only the changed files); new, deleted or unknown paths also
+    trigger a fresh walk. ``sections`` keeps every rendered section, so only changed
+    entries are re-rendered.
+    """
+
+    def __init__(self, include_mde: bool, cache: ParseCache, jobs: int = 1):
+        self.include_mde = include_mde
+        self.cache = cache
+        self.jobs = jobs
+        self.sections = SectionMemo(cache)
+        self.index: PathIndex | None = None
+        self.known: Set[pathlib.Path] = set()
+        self.registry = ManifestRegistry()
+        self.parsed: Dict[pathlib.Path, Tuple[Any, str]] = {}
+        self.plan: List[PlanItem] = []
+        self.slots: List[Artifact | None] = []  # make_entry() result per plan item
+        self.entries: List[Artifact] = []
+        self.generation = 0  # bumped whenever the entries are rebuilt
+
+    def refresh(self, changed: Iterable[pathlib.Path] | None = None) -> int:
+        """Update the entries after ``changed`` paths changed (None: everything may have). Returns files re-read."""
+        stale = None if changed is None else set(changed)
+        if stale is not None and self.index is not None and all(
+                p in self.known and p.suffix != ".xml" and p.is_file() for p in stale):
+            return self.reparse(stale)
+        if self.index is None or stale is None or any(p not in self.known or not p.is_file() for p in stale):
+            self.index = gather_files(self.include_mde)
+            self.known = {p for group in self.index.by_suffix.values() for _, p in group}
+        if stale is None:
+            stale = self.known
+        reread = 0
+        with WorkerPool(self.jobs if stale is self.known else 1) as pool:
+            registry = ManifestRegistry(self.index.root)
+            manifests = self.index.files(".xml")
+            todo = [p for p in manifests if p in stale or p not in self.registry.by_path]
+            fetched = dict(zip(todo, self.cache.fetch_many(todo, parse_manifest, pool)))
+            reread += len(todo)
+            for path in manifests:
+                manifest, digest = fetched[path] if path in fetched else self.registry.by_path[path]
+                if manifest is not None:
+                    registry.add(path, manifest, digest)
+            plan = plan_entries(self.index, registry)
+            parsed: Dict[pathlib.Path, Tuple[Any, str]] = {}
+            for kind, parse in ARTIFACT_PARSERS.items():
+                paths = [item[4] for item in plan if item[3] == kind]
+                todo = [p for p in paths if p in stale or p not in self.parsed]
+                parsed.update((p, self.parsed[p]) for p in paths if p in self.parsed)
+                parsed.update(zip(todo, self.cache.fetch_many(todo, parse, pool)))
+                reread += len(todo)
+        self.registry = registry
+        self.parsed = parsed
+        self.plan = plan
+        self.slots = [make_entry(item, parsed.get(item[4]), registry) for item in plan]
+        self.collect()
+        return reread
+
+    def reparse(self, paths: Set[pathlib.Path]) -> int:
+        """Re-read modified artifacts whose manifests did not change; the plan stays as it is."""
+        reread = 0
+        for kind, parse in ARTIFACT_PARSERS.items():
+            positions = [i for i, item in enumerate(self.plan) if item[3] == kind and item[4] in paths]
+            todo = [self.plan[i][4] for i in positions]
+            for i, path, parsed in zip(positions, todo, self.cache.fetch_many(todo, parse)):
+                self.parsed[path] = parsed
+                self.slots[i] = make_entry(self.plan[i], parsed, self.registry)
+            reread += len(todo)
+        self.collect()
+        return reread
+
+    def collect(self) -> None:
+        self.entries = [e for e in self.slots if e is not None]
+        self.sections.retain(e.digest for e in self.entries)
+        self.generation += 1
+
+def relative_path(path: pathlib.Path) -> str:
+    try:
+        return path.relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return str(path)
+
+def validate_model(model: DocumentModel) -> Dict[str, Any]:
+    """Problems found in the in-memory model: unparsable files, broken manifests, conflicting settings.
+
+    Errors are files the documentation silently leaves out or misattributes; warnings
+    are artifacts without a manifest and settings given different values by different
+    artifacts (the conflicts Find-DuplicatePayloadSettings reports).
+    """
+    problems: List[Dict[str, str]] = []
+
+    def report(level: str, path: pathlib.Path | str, message: str) -> None:
+        problems.append({"level": level, "path": relative_path(path) if isinstance(path, pathlib.Path) else path,
+                         "message": message})
+
+    registry = model.registry
+    for path in model.index.files(".xml"):
+        if path not in registry.by_path:
+            report("error", path, "manifest XML could not be parsed")
+    references: Dict[str, List[pathlib.Path]] = {}
+    for path, (manifest, _) in registry.by_path.items():
+        if manifest["root"] != "MacIntuneManifest":
+            continue
+        fields = manifest["fields"]
+        source = (fields.get("SourceFile") or "").strip()
+        if not source:
+            report("error", path, "manifest has no SourceFile")
+        elif not (REPO_ROOT / source).is_file():
+            report("error", path, f"SourceFile {source} does not exist")
+        ref_id = (fields.get("ReferenceId") or "").strip().upper()
+        if ref_id:
+            references.setdefault(ref_id, []).append(path)
+    for ref_id, paths in sorted(references.items()):
+        if len(paths) > 1:
+            report("error", paths[0], f"ReferenceId {ref_id} is also used by "
+                   + ", ".join(relative_path(p) for p in paths[1:]))
+    values: Dict[str, Dict[str, str]] = {}  # canonical setting -> ref -> the first value that artifact gives it
+    for item, e in zip(model.plan, model.slots):
+        kind, path = item[3], item[4]
+        if kind == "manifest":
+            continue
+        if e is None:
+            report("error", path, "artifact could not be parsed")
+            continue
+        if registry.for_source(path)[0] is None:
+            report("warning", path, "artifact has no manifest XML")
+        for key, value in e.pairs():
+            domain, name = canonical_setting_key(key, e.payload_types)
+            values.setdefault(f"{domain}.{name}" if domain else name, {}).setdefault(e.ref, value)
+    for setting, by_ref in sorted(values.items()):
+        if len(set(by_ref.values())) > 1:
+            by_value: Dict[str, List[str]] = {}
+            for ref, value in by_ref.items():
+                by_value.setdefault(value, []).append(ref)
+            report("warning", setting, "conflicting values: " + "; ".join(
+                f"{value} ({', '.join(refs)})" for value, refs in by_value.items()))
+    errors = sum(1 for p in problems if p["level"] == "error")
+    return {"ok": errors == 0, "errors": errors, "warnings": len(problems) - errors, "problems": problems}
@@ -0,0 +1,61 @@
+"""
+intune_my_macs
+
+Importable API over the parsing behind Generate-ConfigurationDocumentation.py.
+Scripts and notebooks get the same parsing as the generated documentation, as
+typed objects, without loading the generator's rendering code:
+
+    import sys
+    sys.path.insert(0, "tools")
+    from intune_my_macs import iter_artifacts
+
+    for artifact in iter_artifacts(".", include_mde=True):
+        print(artifact.ref, artifact.type, artifact.count)
+        for setting in artifact.settings:
+            print("   ", setting.key, "=", setting.value)
+
+Artifact keeps its settings column-wise (``keys``, ``values``, ``raw``) with the
+keys interned; ``settings`` builds Setting(key, value, raw) tuples on demand and
+``pairs()`` yields (key, value) without them. iter_artifacts() parses one batch at
+a time, so only the artifacts a caller keeps stay in memory. With ``jobs=N`` it
+parses on N worker processes; they import docgen_core by name, whatever the
+start method, so keep this folder on sys.path while iterating.
+
+Graph object types the generator does not know are documented by registering an
+extractor for them before iterating:
+
+    from intune_my_macs import register_json_extractor, simplify_value
+
+    def extract_update_ring(doc, counters=None, raw=None):
+        return [(key, simplify_value(value)) for key, value in doc.items() if key.startswith("update")]
+
+    register_json_extractor(extract_update_ring, "macOSSoftwareUpdateConfiguration")
+"""
+
+import importlib.util
+import pathlib
+import sys
+
+from docgen_core import (Artifact, ParseCache, Setting, canonical_setting_key, iter_artifacts, iter_catalog,
+                         register_json_extractor, simplify_value)
+
+GENERATOR_PATH = pathlib.Path(__file__).resolve().parent / "Generate-ConfigurationDocumentation.py"
+# The name the generator is loaded under, so it is only executed once per process
+GENERATOR_NAME = "generate_configuration_documentation"
+
+def load_generator():
+    """Import the generator script, or return it if it already was.
+
+    For callers that render documents; parsing alone only needs docgen_core.
+    """
+    module = sys.modules.get(GENERATOR_NAME)
+    if module is not None:
+        return module
+    spec = importlib.util.spec_from_file_location(GENERATOR_NAME, GENERATOR_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+__all__ = ["Artifact", "Setting", "ParseCache", "canonical_setting_key", "iter_artifacts", "iter_catalog",
+           "register_json_extractor", "simplify_value"]
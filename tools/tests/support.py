@@ -0,0 +1,195 @@
+"""Shared helpers for the tools tests: fixture repositories and spawn-mode worker pools."""
+
+import contextlib
+import importlib.util
+import json
+import multiprocessing
+import os
+import pathlib
+import plistlib
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+TOOLS_DIR = pathlib.Path(__file__).resolve().parent.parent
+# The tools import intune_my_macs by name, and so do --jobs workers
+if str(TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(TOOLS_DIR))
+
+import docgen_core as core  # noqa: E402,F401
+import intune_my_macs  # noqa: E402
+
+gen = intune_my_macs.load_generator()
+
+def load_script(filename: str, name: str):
+    """Import one of the tool scripts (their file names are not valid module names)."""
+    module = sys.modules.get(name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(name, TOOLS_DIR / filename)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return module
+
+@contextlib.contextmanager
+def start_method(method: str):
+    """Create worker processes with ``method`` (e.g. "spawn", the macOS default) inside the block."""
+    previous = multiprocessing.get_start_method(allow_none=True)
+    multiprocessing.set_start_method(method, force=True)
+    try:
+        yield
+    finally:
+        multiprocessing.set_start_method(previous, force=True)
+
+def catalog_policy(name: str, settings: dict) -> dict:
+    """A Settings Catalog export; ``settings`` maps setting ids to a simple value or, for strings
+    ending in _true/_false, a choice value."""
+    instances = []
+    for setting_id, value in settings.items():
+        if isinstance(value, str) and value.endswith(("_true", "_false")):
+            instance = {"settingDefinitionId": setting_id, "choiceSettingValue": {"value": value, "children": []}}
+        else:
+            instance = {"settingDefinitionId": setting_id, "simpleSettingValue": {"value": value}}
+        instances.append({"settingInstance": instance})
+    return {"name": name, "platforms": "macOS", "settings": instances}
+
+def manifest(ref_id: str, type_: str, name: str, source: str) -> str:
+    return (f"<MacIntuneManifest>\n  <ReferenceId>{ref_id}</ReferenceId>\n  <Type>{type_}</Type>\n"
+            f"  <Name>{name}</Name>\n  <Description>{name} (test fixture)</Description>\n"
+            f"  <SourceFile>{source}</SourceFile>\n</MacIntuneManifest>\n")
+
+def write_file(root: pathlib.Path, relpath: str, content) -> pathlib.Path:
+    path = root / relpath
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(content, dict):
+        content = json.dumps(content, indent=2)
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    path.write_bytes(content)
+    return path
+
+IDLE_TIME = "com.apple.screensaver_idletime"
+GUEST = "com.apple.loginwindow_disableguestaccount"
+
+def write_fixture_tree(root: pathlib.Path) -> None:
+    """Two Settings Catalog policies that agree on one setting and conflict on another, a
+    mobileconfig for the same screensaver preference, and a compliance policy."""
+    intune = "configurations/intune"
+    write_file(root, f"{intune}/pol-sec-001-screensaver.json",
+               catalog_policy("Screensaver", {IDLE_TIME: 600, GUEST: f"{GUEST}_true"}))
+    write_file(root, f"{intune}/pol-sec-001-screensaver.xml",
+               manifest("POL-SEC-001", "Policy", "Screensaver", f"{intune}/pol-sec-001-screensaver.json"))
+    write_file(root, f"{intune}/pol-sec-002-lock.json",
+               catalog_policy("Lock", {IDLE_TIME: 300, GUEST: f"{GUEST}_true"}))
+    write_file(root, f"{intune}/pol-sec-002-lock.xml",
+               manifest("POL-SEC-002", "Policy", "Lock", f"{intune}/pol-sec-002-lock.json"))
+    write_file(root, f"{intune}/cfg-sec-003-screensaver.mobileconfig", plistlib.dumps({
+        "PayloadDisplayName": "Screensaver profile",
+        "PayloadType": "Configuration",
+        "PayloadContent": [{"PayloadType": "com.apple.screensaver", "PayloadIdentifier": "test.screensaver",
+                            "idleTime": 600}],
+    }))
+    write_file(root, f"{intune}/cmp-cmp-004-baseline.json", {
+        "@odata.type": "#microsoft.graph.macOSCompliancePolicy",
+        "displayName": "Baseline",
+        "passwordRequired": True,
+        "storageRequireEncryption": True,
+    })
+
+# sitecustomize for tool runs with spawn=True: every process started by the run,
+# and the workers it starts, use the spawn method
+SPAWN_SITECUSTOMIZE = 'import multiprocessing\nmultiprocessing.set_start_method("spawn", force=True)\n'
+
+class TempRepo:
+    """A fixture repository in a temporary directory, with its own copy of tools/.
+
+    The scripts find the repository from their own location, so the copies treat
+    ``root`` as the repository: outputs and caches land there too.
+    """
+
+    def __init__(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        base = pathlib.Path(self._tmp.name).resolve()
+        self.root = base / "repo"
+        self.spawn_site = base / "spawn-site"
+        shutil.copytree(TOOLS_DIR, self.root / "tools",
+                        ignore=shutil.ignore_patterns("tests", "benchmarks", "__pycache__"))
+
+    def cleanup(self) -> None:
+        self._tmp.cleanup()
+
+    def write(self, relpath: str, content) -> pathlib.Path:
+        return write_file(self.root, relpath, content)
+
+    def command(self, script: str, *args) -> list:
+        return [sys.executable, str(self.root / "tools" / script), *map(str, args)]
+
+    def env(self, spawn: bool = False) -> dict:
+        env = dict(os.environ, PYTHONUNBUFFERED="1")
+        if spawn:
+            self.spawn_site.mkdir(exist_ok=True)
+            (self.spawn_site / "sitecustomize.py").write_text(SPAWN_SITECUSTOMIZE)
+            env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(self.spawn_site), env.get("PYTHONPATH")]))
+        return env
+
+    def run(self, script: str, *args, spawn: bool = False, check: bool = True) -> subprocess.CompletedProcess:
+        """Run a copied tool in ``root``; fails the test on a non-zero exit unless ``check`` is False."""
+        result = subprocess.run(self.command(script, *args), cwd=self.root, env=self.env(spawn),
+                                capture_output=True, text=True, timeout=300)
+        if check and result.returncode:
+            raise AssertionError(f"{script} exited with {result.returncode}:\n{result.stdout}{result.stderr}")
+        return result
+
+    def generate(self, *args, spawn: bool = False) -> str:
+        """Run the documentation generator and return what it printed."""
+        return self.run("Generate-ConfigurationDocumentation.py", *args, spawn=spawn).stdout
+
+    def start(self, script: str, *args) -> "Process":
+        """Start a long-running tool (--watch, --serve) in ``root``."""
+        return Process(subprocess.Popen(self.command(script, *args), cwd=self.root, env=self.env(),
+                                        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True))
+
+class Process:
+    """A running tool whose output lines can be waited for."""
+
+    def __init__(self, popen: subprocess.Popen):
+        self.popen = popen
+        self.lines: "queue.Queue[str]" = queue.Queue()
+        self.output: list = []
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self) -> None:
+        for line in self.popen.stdout:
+            self.lines.put(line)
+
+    def wait_for(self, text: str, timeout: float = 30) -> str:
+        """Return the next output line containing ``text``."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                line = self.lines.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise AssertionError(f"no {text!r} within {timeout}s; output so far:\n{''.join(self.output)}")
+            self.output.append(line)
+            if text in line:
+                return line
+
+    def stop(self) -> None:
+        if self.popen.poll() is None:
+            self.popen.terminate()
+        self.popen.wait(timeout=30)
+        self.popen.stdout.close()
+
+class RepoTestCase(unittest.TestCase):
+    """Every test gets a fresh TempRepo (``self.repo``, rooted at ``self.root``) with write_fixture_tree()."""
+
+    def setUp(self):
+        self.repo = TempRepo()
+        self.addCleanup(self.repo.cleanup)
+        self.root = self.repo.root
+        write_fixture_tree(self.root)
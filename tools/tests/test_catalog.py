@@ -0,0 +1,47 @@
+import json
+import unittest
+
+from support import GUEST, IDLE_TIME, RepoTestCase, core, gen
+
+class CatalogTest(RepoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repo.generate("--catalog")
+        self.json_path = self.root / "INTUNE-MY-MACS-CATALOG.json"
+        self.ndjson_path = self.root / "INTUNE-MY-MACS-CATALOG.ndjson"
+
+    def test_json_catalog(self):
+        catalog = json.loads(self.json_path.read_text(encoding="utf-8"))
+        self.assertEqual((catalog["catalog"], catalog["version"], catalog["count"]), ("intune-my-macs", 1, 4))
+        records = {record["ref"]: record for record in catalog["entries"]}
+        self.assertEqual(list(records), ["cfg-sec-003-screensaver", "cmp-cmp-004-baseline",
+                                         "pol-sec-001-screensaver", "pol-sec-002-lock"])
+        policy = records["pol-sec-001-screensaver"]
+        self.assertEqual((policy["type"], policy["kind"], policy["name"], policy["count"]), ("Policy", "json", "Screensaver", 2))
+        self.assertEqual(policy["relpath"], "configurations/intune/pol-sec-001-screensaver.json")
+        # Raw values are only kept where normalization changed them
+        self.assertEqual(policy["settings"], [[IDLE_TIME, "600", 600], [GUEST, "True", f"{GUEST}_true"]])
+        self.assertEqual(records["cfg-sec-003-screensaver"]["payload_types"], ["com.apple.screensaver"])
+        self.assertEqual(records["cmp-cmp-004-baseline"]["settings"][0], ["passwordRequired", "True", True])
+
+    def test_ndjson_has_a_header_and_one_record_per_line(self):
+        lines = self.ndjson_path.read_text(encoding="utf-8").splitlines()
+        self.assertEqual(len(lines), 5)
+        header = json.loads(lines[0])
+        self.assertEqual((header["catalog"], header["version"]), ("intune-my-macs", 1))
+        catalog = json.loads(self.json_path.read_text(encoding="utf-8"))
+        self.assertEqual([json.loads(line) for line in lines[1:]], catalog["entries"])
+
+    def test_catalog_reproduces_the_markdown(self):
+        entries = list(core.iter_catalog(self.ndjson_path))
+        markdown = (self.root / "INTUNE-MY-MACS-DOCUMENTATION.md").read_text(encoding="utf-8")
+        self.assertEqual(gen.generate_markdown(entries), markdown)
+
+    def test_unchanged_catalog_is_left_untouched(self):
+        paths = (self.json_path, self.ndjson_path)
+        before = [(path.read_bytes(), path.stat().st_mtime_ns) for path in paths]
+        self.assertIn("[INFO] Unchanged: catalog of 4 entries", self.repo.generate("--catalog"))
+        self.assertEqual([(path.read_bytes(), path.stat().st_mtime_ns) for path in paths], before)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import pathlib
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from support import TOOLS_DIR
+
+CORPUS_SCRIPT = TOOLS_DIR / "benchmarks" / "generate_corpus.py"
+
+def tree(root: pathlib.Path) -> dict:
+    return {p.relative_to(root).as_posix(): p.read_bytes() for p in sorted(root.rglob("*")) if p.is_file()}
+
+class CorpusGeneratorTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.base = pathlib.Path(self._tmp.name)
+
+    def corpus(self, name, *args):
+        output = self.base / name
+        subprocess.run([sys.executable, str(CORPUS_SCRIPT), str(output), "--policies", "6", "--mobileconfigs", "3",
+                        "--compliance", "2", *args], check=True, capture_output=True, text=True)
+        return output
+
+    def test_same_seed_gives_identical_files(self):
+        first = tree(self.corpus("a", "--seed", "7"))
+        self.assertEqual(first, tree(self.corpus("b", "--seed", "7")))
+        self.assertNotEqual(first, tree(self.corpus("c", "--seed", "8")))
+        # One manifest per artifact
+        self.assertEqual(sum(name.endswith(".xml") for name in first), 11)
+
+    def test_generator_documents_the_whole_corpus(self):
+        root = self.corpus("docs", "--with-generator")
+        result = subprocess.run([sys.executable, str(root / "tools" / "Generate-ConfigurationDocumentation.py"),
+                                 "--no-cache"], cwd=root, check=True, capture_output=True, text=True)
+        self.assertIn("[INFO] Documented 11 payload artifacts", result.stdout)
+        self.assertNotIn("[WARN]", result.stdout)
+        markdown = (root / "INTUNE-MY-MACS-DOCUMENTATION.md").read_text(encoding="utf-8")
+        self.assertEqual(markdown.count("\n### "), 11)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import datetime
+import os
+import shutil
+import subprocess
+import unittest
+
+from support import IDLE_TIME, RepoTestCase, catalog_policy
+
+def timestamp(*date) -> float:
+    return datetime.datetime(*date, tzinfo=datetime.timezone.utc).timestamp()
+
+class SourceDateTest(RepoTestCase):
+    def set_mtimes(self, when: float) -> None:
+        for path in (self.root / "configurations").rglob("*"):
+            os.utime(path, (when, when))
+
+    def markdown(self) -> str:
+        return (self.root / "INTUNE-MY-MACS-DOCUMENTATION.md").read_text(encoding="utf-8")
+
+    def test_newest_input_file_dates_the_cover(self):
+        self.set_mtimes(timestamp(2024, 3, 5, 12))
+        os.utime(self.root / "configurations/intune/pol-sec-002-lock.json", (timestamp(2024, 3, 7, 23, 30),) * 2)
+        self.repo.generate("--date", "source")
+        self.assertIn("**Generated:** March 07, 2024\n", self.markdown())
+        self.repo.generate("--date", "none")
+        self.assertNotIn("**Generated:**", self.markdown())
+
+    def test_unchanged_sources_leave_every_output_untouched(self):
+        self.set_mtimes(timestamp(2024, 3, 5, 12))
+        outputs = [self.root / f"INTUNE-MY-MACS-{name}" for name in
+                   ("DOCUMENTATION.md", "DOCUMENTATION.docx", "DOCUMENTATION.html", "SETTINGS.csv", "SETTINGS.xlsx")]
+        self.repo.generate("--date", "source", "--docx", "--formats", "html,csv,xlsx")
+        before = [(path.read_bytes(), path.stat().st_mtime_ns) for path in outputs]
+        printed = self.repo.generate("--date", "source", "--docx", "--formats", "html,csv,xlsx", "--no-cache")
+        self.assertIn("[INFO] Markdown unchanged", printed)
+        self.assertIn("[INFO] DOCX unchanged", printed)
+        self.assertEqual([(path.read_bytes(), path.stat().st_mtime_ns) for path in outputs], before)
+
+        self.repo.write("configurations/intune/pol-sec-002-lock.json", catalog_policy("Lock", {IDLE_TIME: 900}))
+        self.set_mtimes(timestamp(2024, 3, 5, 12))
+        printed = self.repo.generate("--date", "source", "--docx", "--formats", "html,csv,xlsx")
+        self.assertIn("[INFO] Wrote markdown", printed)
+        self.assertTrue(all(path.read_bytes() != data for path, (data, _) in zip(outputs, before)))
+        self.assertFalse(list(self.root.glob(".*.tmp")))
+
+    @unittest.skipUnless(shutil.which("git"), "needs git")
+    def test_last_commit_dates_the_cover_in_a_checkout(self):
+        env = dict(os.environ, GIT_AUTHOR_NAME="test", GIT_AUTHOR_EMAIL="test@example.com", GIT_COMMITTER_NAME="test",
+                   GIT_COMMITTER_EMAIL="test@example.com", GIT_COMMITTER_DATE="2023-07-01T10:00:00Z",
+                   GIT_AUTHOR_DATE="2023-07-01T10:00:00Z")
+        for command in (["init", "-q"], ["add", "configurations"], ["commit", "-q", "-m", "fixtures"]):
+            subprocess.run(["git", *command], cwd=self.root, env=env, check=True, capture_output=True)
+        self.set_mtimes(timestamp(2025, 1, 1))
+        self.repo.generate("--date", "source")
+        self.assertIn("**Generated:** July 01, 2023\n", self.markdown())
+        # An uncommitted edit is newer than the last commit
+        path = self.root / "configurations/intune/pol-sec-002-lock.json"
+        path.write_text(path.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+        os.utime(path, (timestamp(2025, 2, 3),) * 2)
+        self.repo.generate("--date", "source")
+        self.assertIn("**Generated:** February 03, 2025\n", self.markdown())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import pathlib
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+import zipfile
+
+from support import IDLE_TIME, RepoTestCase, gen, manifest
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+def read_docx(path: pathlib.Path):
+    """(part names, document.xml root) of a .docx package."""
+    with zipfile.ZipFile(path) as docx:
+        assert docx.testzip() is None
+        return docx.namelist(), ET.fromstring(docx.read("word/document.xml"))
+
+def paragraph_text(p) -> str:
+    return "".join(t.text or "" for t in p.iter(W + "t"))
+
+def paragraph_style(p) -> str:
+    style = p.find(f"{W}pPr/{W}pStyle")
+    return style.get(W + "val") if style is not None else ""
+
+class MarkdownToDocxTest(unittest.TestCase):
+    def convert(self, lines):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "out.docx"
+            gen.markdown_to_docx(lines, path)
+            return read_docx(path)
+
+    def test_blocks_from_a_line_stream(self):
+        lines = iter(["# Title\n", "\n", "Some **bold** text & <markup>\n", "\n", "- first item\n",
+                      "\n", "| Key | Value |\n", "|-----|-------|\n", "| `a` | `1` |\n", "| `b` | `2` |\n"])
+        names, document = self.convert(lines)
+        self.assertIn("word/styles.xml", names)
+        paragraphs = list(document.iter(W + "p"))
+        self.assertEqual(paragraph_text(paragraphs[0]), "Title")
+        self.assertEqual(paragraph_style(paragraphs[0]), "Heading1")
+        self.assertIn("Some bold text & <markup>", [paragraph_text(p) for p in paragraphs])
+        tables = list(document.iter(W + "tbl"))
+        self.assertEqual(len(tables), 1)
+        rows = [[paragraph_text(cell) for cell in row.iter(W + "tc")] for row in tables[0].iter(W + "tr")]
+        self.assertEqual(rows, [["Key", "Value"], ["a", "1"], ["b", "2"]])
+
+    def test_string_and_lines_give_the_same_document(self):
+        markdown = "# Title\n\nText\n\n| Key | Value |\n|-----|-------|\n| `a` | `1` |\n"
+        self.assertEqual(ET.tostring(self.convert(markdown)[1]),
+                         ET.tostring(self.convert(markdown.splitlines(keepends=True))[1]))
+
+class GeneratedDocxTest(RepoTestCase):
+    def test_every_artifact_gets_a_heading_and_settings_table(self):
+        intune = "configurations/intune"
+        self.repo.write(f"{intune}/pol-sec-002-lock.xml",
+                        manifest("POL-SEC-002", "Policy", "Lock &amp; &lt;idle&gt;", f"{intune}/pol-sec-002-lock.json"))
+        self.repo.generate("--docx")
+        _, document = read_docx(self.root / "INTUNE-MY-MACS-DOCUMENTATION.docx")
+        texts = [paragraph_text(p) for p in document.iter(W + "p")]
+        for heading in ("cfg-sec-003-screensaver (CustomConfig)", "cmp-cmp-004-baseline (Compliance)",
+                        "pol-sec-001-screensaver (Policy)", "pol-sec-002-lock (Policy)"):
+            self.assertIn(heading, texts)
+        self.assertIn("Lock & <idle> (test fixture)", texts)
+        # The index table plus one settings table per artifact
+        tables = list(document.iter(W + "tbl"))
+        self.assertGreaterEqual(len(tables), 5)
+        cells = {paragraph_text(cell) for table in tables for cell in table.iter(W + "tc")}
+        self.assertTrue({IDLE_TIME, "600", "300", "passwordRequired"} <= cells)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from support import RepoTestCase, core, gen
+
+class CanonicalSettingKeyTest(unittest.TestCase):
+    def test_formats_map_to_one_identity(self):
+        identity = ("com.apple.screensaver", "idletime")
+        self.assertEqual(core.canonical_setting_key("com.apple.screensaver_idletime"), identity)
+        self.assertEqual(core.canonical_setting_key("com.apple.screensaver.idleTime", ("com.apple.screensaver",)), identity)
+        self.assertEqual(core.canonical_setting_key("com.apple.screensaver.user_idleTime"), identity)
+        self.assertEqual(core.canonical_setting_key("com.apple.screensaver_idletime[2]"), identity)
+
+    def test_payload_type_decides_where_the_domain_ends(self):
+        self.assertEqual(core.canonical_setting_key("com.apple.Safari.Extensions.Allowed", ("com.apple.Safari",)),
+                         ("com.apple.safari", "extensions.allowed"))
+        self.assertEqual(core.canonical_setting_key("com.apple.Safari.Extensions.Allowed", ("com.apple.Safari.Extensions",)),
+                         ("com.apple.safari.extensions", "allowed"))
+
+    def test_ids_without_a_domain(self):
+        self.assertEqual(core.canonical_setting_key("passwordRequired"), ("", "passwordrequired"))
+        self.assertEqual(core.canonical_setting_key("platformRestriction.osMinimumVersion"),
+                         ("", "platformrestriction.osminimumversion"))
+
+    def test_index_reports_identities_configured_in_more_than_one_format(self):
+        index = gen.SettingEquivalenceIndex()
+        index.add(0, "json", [("com.apple.screensaver_idletime", "600"), ("com.apple.dock_autohide", "True")])
+        index.add(1, "mobileconfig", [("com.apple.screensaver.idleTime", "600")], ("com.apple.screensaver",))
+        index.add(2, "json", [("com.apple.screensaver_idleTime", "300"), ("com.apple.screensaver_idleTime", "300")])
+        self.assertEqual(index.lookup("com.apple.screensaver.user_idletime"), {"json": [0, 2], "mobileconfig": [1]})
+        self.assertEqual(index.cross_format(), [(("com.apple.screensaver", "idletime"),
+                                                 {"json": [0, 2], "mobileconfig": [1]})])
+
+class CrossFormatSectionTest(RepoTestCase):
+    def test_markdown_lists_profiles_and_policies_for_the_same_preference(self):
+        self.repo.generate()
+        markdown = (self.root / "INTUNE-MY-MACS-DOCUMENTATION.md").read_text(encoding="utf-8")
+        section = markdown[markdown.index("# Cross-Format Overlaps"):]
+        rows = [line for line in section.splitlines() if line.startswith("| `")]
+        self.assertEqual(rows, [
+            "| `com.apple.screensaver` | `idletime` | [cfg-sec-003-screensaver](#cfg-sec-003-screensaver-customconfig)"
+            " | [pol-sec-001-screensaver](#pol-sec-001-screensaver-policy), [pol-sec-002-lock](#pol-sec-002-lock-policy) |",
+        ])
+
+if __name__ == "__main__":
+    unittest.main()
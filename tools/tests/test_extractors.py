@@ -0,0 +1,70 @@
+import pathlib
+import tempfile
+import unittest
+
+from support import core, write_file, write_fixture_tree
+
+from intune_my_macs import iter_artifacts, register_json_extractor, simplify_value
+
+def extract_update_ring(doc, counters=None, raw=None):
+    return [(key, simplify_value(value)) for key, value in sorted(doc.items()) if key.startswith("update")]
+
+class DispatchTest(unittest.TestCase):
+    def setUp(self):
+        # Registrations are process-wide: put the tables back after each test
+        for table in (core.JSON_EXTRACTORS_BY_TYPE, core.JSON_EXTRACTORS_BY_SHAPE):
+            self.addCleanup(table.update, dict(table))
+            self.addCleanup(table.clear)
+        self.addCleanup(core.json_extractor_for_type.cache_clear)
+
+    def test_builtin_types_and_shapes(self):
+        extractor_for = core.json_extractor_for
+        self.assertIs(extractor_for({"@odata.type": "#microsoft.graph.macOSCompliancePolicy"}),
+                      core.extract_compliance_policy)
+        self.assertIs(extractor_for({"@odata.type": "#microsoft.graph.deviceEnrollmentPlatformRestriction"}),
+                      core.extract_platform_restriction)
+        # Settings Catalog exports carry no @odata.type; an unknown type falls back to the shape too
+        self.assertIs(extractor_for({"settings": []}), core.extract_settings_catalog)
+        self.assertIs(extractor_for({"@odata.type": "#microsoft.graph.somethingElse", "settings": []}),
+                      core.extract_settings_catalog)
+        self.assertIsNone(extractor_for({"@odata.type": "#microsoft.graph.somethingElse"}))
+        self.assertEqual(core.extract_json_settings({"name": "no settings"}), [])
+
+    def test_platform_restriction(self):
+        raw = []
+        doc = {"@odata.type": "#microsoft.graph.deviceEnrollmentPlatformRestriction",
+               "platformRestriction": {"platformBlocked": False, "osMinimumVersion": "14.0"}}
+        self.assertEqual(core.extract_json_settings(doc, None, raw), [
+            ("platformRestriction.platformBlocked", "False"), ("platformRestriction.osMinimumVersion", "14.0")])
+        self.assertEqual(len(raw), 2)
+
+    def test_registered_type_longest_suffix_wins(self):
+        register_json_extractor(extract_update_ring, "SoftwareUpdateConfiguration")
+        doc = {"@odata.type": "#microsoft.graph.macOSSoftwareUpdateConfiguration", "updateScheduleType": "alwaysUpdate",
+               "updateTimeWindowUtcOffsetInMinutes": 60, "settings": []}
+        self.assertEqual(core.extract_json_settings(doc), [
+            ("updateScheduleType", "alwaysUpdate"), ("updateTimeWindowUtcOffsetInMinutes", "60")])
+        # Registering after a lookup still takes effect: the per-type cache is cleared
+        register_json_extractor(core.extract_settings_catalog, "macOSSoftwareUpdateConfiguration")
+        self.assertIs(core.json_extractor_for(doc), core.extract_settings_catalog)
+
+    def test_registered_shape(self):
+        register_json_extractor(extract_update_ring, shape="updateScheduleType")
+        self.assertEqual(core.extract_json_settings({"updateScheduleType": "alwaysUpdate"}),
+                         [("updateScheduleType", "alwaysUpdate")])
+
+    def test_registered_type_is_documented(self):
+        register_json_extractor(extract_update_ring, "macOSSoftwareUpdateConfiguration")
+        with tempfile.TemporaryDirectory() as tmp:
+            root = pathlib.Path(tmp)
+            write_fixture_tree(root)
+            write_file(root, "configurations/intune/pol-upd-005-ring.json", {
+                "@odata.type": "#microsoft.graph.macOSSoftwareUpdateConfiguration", "displayName": "Ring",
+                "updateScheduleType": "updateOutsideOfActiveHours"})
+            artifacts = {a.ref: a for a in iter_artifacts(root)}
+        self.assertEqual(list(artifacts["pol-upd-005-ring"].pairs()),
+                         [("updateScheduleType", "updateOutsideOfActiveHours")])
+        self.assertEqual(artifacts["pol-sec-002-lock"].count, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import json
+import unittest
+
+from support import GUEST, IDLE_TIME, RepoTestCase
+
+SCRIPT = "Find-DuplicatePayloadSettings.py"
+
+class FindDuplicatesTest(RepoTestCase):
+    def report(self, *args, spawn=False):
+        output = self.root / "report.json"
+        self.repo.run(SCRIPT, "--output-format", "JSON", "--output-file", output, *args, spawn=spawn)
+        return {d["SettingId"]: d for d in json.loads(output.read_text(encoding="utf-8"))}
+
+    def test_conflicts_and_redundant_settings(self):
+        report = self.report()
+        self.assertEqual(set(report), {IDLE_TIME, GUEST})
+        conflict = report[IDLE_TIME]
+        self.assertTrue(conflict["HasConflict"])
+        self.assertEqual(conflict["OccurrenceCount"], 2)
+        self.assertEqual(conflict["ReferenceIds"], "POL-SEC-001, POL-SEC-002")
+        self.assertEqual(conflict["Values"], "600 | 300")
+        self.assertEqual(conflict["SourceFiles"], "configurations/intune/pol-sec-001-screensaver.json"
+                                                  " | configurations/intune/pol-sec-002-lock.json")
+        self.assertFalse(report[GUEST]["HasConflict"])
+        self.assertEqual(report[GUEST]["Values"], "True | True")
+
+    def test_summary_counts_every_configuration(self):
+        stdout = self.repo.run(SCRIPT).stdout
+        self.assertIn("Total configurations analyzed: 4", stdout)
+        self.assertIn("Conflicts (different values): 1", stdout)
+        self.assertIn("Redundant (same values): 1", stdout)
+
+    def test_cross_format_groups_mobileconfig_with_settings_catalog(self):
+        idle = self.report("--cross-format")["com.apple.screensaver.idletime"]
+        self.assertEqual(idle["OccurrenceCount"], 3)
+        self.assertIn("cfg-sec-003-screensaver", idle["ReferenceIds"])
+
+    def test_parse_cache_is_shared_with_the_generator(self):
+        self.report()
+        self.repo.generate("--metrics", self.root / "metrics")
+        report = json.loads((self.root / "metrics" / "metrics.json").read_text(encoding="utf-8"))
+        self.assertEqual(report["counters"]["parse_cache_misses"], 0)
+
+    def test_spawned_workers_give_the_same_report(self):
+        self.assertEqual(self.report("-j", "2", "--no-cache", spawn=True), self.report("--no-cache"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import json
+import subprocess
+import sys
+import unittest
+
+from support import RepoTestCase
+
+class ImmTest(RepoTestCase):
+    def imm(self, *args, **kwargs):
+        return self.repo.run("imm", *args, **kwargs)
+
+    def test_version_and_usage(self):
+        self.assertRegex(self.imm("--version").stdout, r"^imm \d+\.\d+\.\d+\n$")
+        usage = self.imm("--help").stdout
+        for command in ("docs", "dupes", "query", "request", "validate"):
+            self.assertIn(f"  {command} ", usage)
+        unknown = self.imm("frobnicate", check=False)
+        self.assertNotEqual(unknown.returncode, 0)
+        self.assertIn("unknown command 'frobnicate'", unknown.stderr)
+
+    def test_subcommands_run_the_tools(self):
+        self.assertIn("[INFO] Wrote markdown", self.imm("docs", "--date", "none").stdout)
+        self.assertTrue((self.root / "INTUNE-MY-MACS-DOCUMENTATION.md").is_file())
+        self.assertIn("imm dupes", self.imm("dupes", "--help").stdout)
+
+    def validate(self, *args, spawn=False):
+        result = self.imm("validate", "--no-daemon", "--json", *args, spawn=spawn, check=False)
+        return result.returncode, json.loads(result.stdout)
+
+    def test_validate_in_process(self):
+        status, report = self.validate()
+        self.assertEqual((status, report["ok"], report["errors"], report["warnings"]), (0, True, 0, 3))
+        self.assertEqual(self.validate("-j", "2", spawn=True), (status, report))
+
+        self.repo.write("configurations/intune/pol-sec-002-lock.xml", "<MacIntuneManifest><Name>")
+        status, report = self.validate("--no-cache")
+        self.assertEqual((status, report["ok"]), (1, False))
+        self.assertIn({"level": "error", "path": "configurations/intune/pol-sec-002-lock.xml",
+                       "message": "manifest XML could not be parsed"}, report["problems"])
+
+    def test_validate_in_process_does_not_load_the_generator(self):
+        probe = ("import runpy, sys\n"
+                 "sys.argv = ['imm', 'validate', '--no-daemon', '--json']\n"
+                 "sys.path.insert(0, 'tools')\n"
+                 "try:\n    runpy.run_path('tools/imm', run_name='__main__')\n"
+                 "except SystemExit:\n    pass\n"
+                 "print(*(getattr(m, '__file__', None) for m in list(sys.modules.values())), sep='\\n', file=sys.stderr)\n")
+        result = subprocess.run([sys.executable, "-c", probe], cwd=self.root, env=self.repo.env(),
+                                capture_output=True, text=True, timeout=300, check=True)
+        self.assertTrue(json.loads(result.stdout)["ok"])
+        loaded = {line.rpartition("/")[2] for line in result.stderr.splitlines()}
+        self.assertIn("docgen_core.py", loaded)
+        self.assertNotIn("Generate-ConfigurationDocumentation.py", loaded)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import pathlib
+import tempfile
+import unittest
+
+from support import GUEST, IDLE_TIME, start_method, write_fixture_tree
+
+from intune_my_macs import Artifact, Setting, iter_artifacts
+
+def snapshot(artifacts):
+    return [(a.ref, a.type, a.relpath, a.kind, a.name, a.description, a.settings, a.payload_types)
+            for a in artifacts]
+
+class IterArtifactsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.root = pathlib.Path(cls._tmp.name).resolve()
+        write_fixture_tree(cls.root)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
+
+    def test_artifacts_in_document_order(self):
+        artifacts = list(iter_artifacts(self.root))
+        self.assertTrue(all(isinstance(a, Artifact) for a in artifacts))
+        self.assertEqual([(a.ref, a.type, a.kind) for a in artifacts], [
+            ("cfg-sec-003-screensaver", "CustomConfig", "mobileconfig"),
+            ("cmp-cmp-004-baseline", "Compliance", "json"),
+            ("pol-sec-001-screensaver", "Policy", "json"),
+            ("pol-sec-002-lock", "Policy", "json"),
+        ])
+        policy = artifacts[2]
+        self.assertEqual(policy.relpath, "configurations/intune/pol-sec-001-screensaver.json")
+        self.assertEqual(policy.name, "Screensaver")
+        self.assertEqual(policy.count, 2)
+        self.assertEqual(policy.settings, [Setting(IDLE_TIME, "600", 600), Setting(GUEST, "True", f"{GUEST}_true")])
+        self.assertEqual(list(policy.pairs()), [(IDLE_TIME, "600"), (GUEST, "True")])
+        self.assertEqual(artifacts[0].payload_types, ("com.apple.screensaver",))
+        self.assertEqual(dict(artifacts[1].pairs()), {"passwordRequired": "True", "storageRequireEncryption": "True"})
+
+    def test_keys_are_shared_between_artifacts(self):
+        artifacts = list(iter_artifacts(self.root))
+        self.assertIs(artifacts[2].keys[0], artifacts[3].keys[0])
+
+    def test_spawned_workers(self):
+        with start_method("spawn"):
+            parallel = snapshot(iter_artifacts(self.root, jobs=2))
+        self.assertEqual(parallel, snapshot(iter_artifacts(self.root, jobs=1)))
+
+if __name__ == "__main__":
+    unittest.main()
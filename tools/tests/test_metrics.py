@@ -0,0 +1,39 @@
+import json
+import unittest
+
+from support import RepoTestCase
+
+class MetricsReportTest(RepoTestCase):
+    def metrics(self, *args):
+        directory = self.root / "metrics"
+        self.repo.generate("--metrics", directory, *args)
+        return json.loads((directory / "metrics.json").read_text(encoding="utf-8")), \
+            (directory / "metrics.prom").read_text(encoding="utf-8")
+
+    def test_first_run_reports_every_parsed_file(self):
+        report, prom = self.metrics()
+        self.assertTrue({"walk", "render", "cache_save", "manifest_parse", "json_parse", "plist_parse", "extraction",
+                         "total"} <= set(report["stages"]))
+        self.assertEqual({kind: totals["files"] for kind, totals in report["files_by_kind"].items()},
+                         {"manifest": 2, "json": 3, "mobileconfig": 1})
+        self.assertEqual(len(report["files"]), 6)
+        self.assertEqual(report["counters"]["artifacts_documented"], 4)
+        self.assertEqual((report["counters"]["parse_cache_hits"], report["counters"]["parse_cache_misses"]), (0, 6))
+        self.assertIn("configurations/intune/pol-sec-001-screensaver.json", {f["path"] for f in report["files"]})
+        self.assertIn('intune_docgen_files_parsed{kind="json"} 3', prom.splitlines())
+        self.assertIn('intune_docgen_stage_seconds{stage="walk"}', prom)
+
+    def test_cached_run_parses_nothing(self):
+        self.metrics()
+        report, _ = self.metrics()
+        self.assertEqual(report["files"], [])
+        self.assertEqual((report["counters"]["parse_cache_hits"], report["counters"]["parse_cache_misses"]), (6, 0))
+
+    def test_top_lists_are_limited(self):
+        report, _ = self.metrics("--no-cache", "--metrics-top", "2")
+        self.assertEqual(len(report["slowest"]), 2)
+        self.assertEqual([f["bytes"] for f in report["largest"]],
+                         sorted((f["bytes"] for f in report["files"]), reverse=True)[:2])
+
+if __name__ == "__main__":
+    unittest.main()
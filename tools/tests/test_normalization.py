@@ -0,0 +1,49 @@
+import unittest
+
+from support import core
+
+class SimplifyDisplayValueTest(unittest.TestCase):
+    def test_repeated_key_prefix_is_stripped(self):
+        self.assertEqual(core.simplify_display_value("com.apple.mcx.filevault2_enable",
+                                                    "com.apple.mcx.filevault2_enable_0"), "0")
+        self.assertEqual(core.simplify_display_value("com.apple.dock_orientation", "com.apple.dock_orientation__left"),
+                         "_left")
+        self.assertEqual(core.simplify_display_value("com.apple.dock_orientation", "com.apple.dock_orientationleft"),
+                         "left")
+        # Nothing left after the key: the value is kept whole
+        self.assertEqual(core.simplify_display_value("com.apple.dock_orientation", "com.apple.dock_orientation"),
+                         "com.apple.dock_orientation")
+
+    def test_boolean_suffixes(self):
+        self.assertEqual(core.simplify_display_value("com.apple.systempolicy.control_EnableAssessment",
+                                                    "com.apple.systempolicy.control_EnableAssessment_true"), "True")
+        self.assertEqual(core.simplify_display_value("com.apple.loginwindow_disableguestaccount",
+                                                    "com.apple.loginwindow_disableguestaccount_FALSE"), "False")
+        # Only when the value repeats the key: an unrelated *_true stays as it is
+        self.assertEqual(core.simplify_display_value("com.apple.dock_autohide", "com.apple.mcx_other_true"),
+                         "com.apple.mcx_other_true")
+
+    def test_placeholders_are_kept(self):
+        self.assertEqual(core.simplify_display_value("com.apple.mail_address", "com.apple.mail_address_{{mail}}"),
+                         "com.apple.mail_address_{{mail}}")
+
+    def test_other_values(self):
+        self.assertEqual(core.simplify_display_value("com.apple.screensaver_idletime", 600), "600")
+        self.assertEqual(core.simplify_display_value("k", None), "")
+        self.assertEqual(core.simplify_display_value("k", "x" * 200), "x" * 117 + "...")
+        # Unhashable values bypass the memo
+        self.assertEqual(core.simplify_display_value("k", ["a", 1]), '["a", 1]')
+        self.assertEqual(core.simplify_display_value("k", {"a": True}), '{"a": true}')
+
+    def test_repeated_pairs_are_memoized(self):
+        before = core.normalization_cache_info()
+        for _ in range(3):
+            self.assertEqual(core.simplify_display_value("com.apple.test_memo", "com.apple.test_memo_1"), "1")
+        after = core.normalization_cache_info()
+        self.assertGreaterEqual(after.hits - before.hits, 2)
+        # typed: 1 and 1.0 (and True) are normalized separately
+        self.assertEqual(core.simplify_display_value("k", 1.0), "1.0")
+        self.assertEqual(core.simplify_display_value("k", 1), "1")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import pathlib
+import sqlite3
+import tempfile
+import unittest
+
+from support import core, write_file
+
+class CountingParser:
+    """A parse function that records which files it was called for."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, path, raw=None):
+        self.calls.append(path.name)
+        if raw is None:  # like the artifact parsers: read the file when not handed its bytes
+            raw = path.read_bytes()
+        return {"text": raw.decode("utf-8")} if raw.strip() != b"broken" else None
+
+class ParseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmp.name).resolve() / "repo"
+        self.cache_file = pathlib.Path(self._tmp.name) / "cache.sqlite3"
+        self.path = write_file(self.root, "configurations/a.json", "one")
+        self.parse = CountingParser()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def open(self):
+        return core.ParseCache(self.cache_file, root=self.root)
+
+    def fetch(self, cache):
+        value, digest = cache.fetch(self.path, self.parse)
+        return value and value["text"], digest
+
+    def test_hit_in_the_next_run(self):
+        cache = self.open()
+        first = self.fetch(cache)
+        self.assertEqual(first[0], "one")
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        cache.save()
+
+        again = self.open()
+        self.assertEqual(self.fetch(again), first)
+        self.assertEqual((again.hits, again.misses, len(self.parse.calls)), (1, 0, 1))
+
+    def test_changed_content_is_parsed_again(self):
+        cache = self.open()
+        _, digest = self.fetch(cache)
+        write_file(self.root, "configurations/a.json", "two")
+        value, new_digest = self.fetch(cache)
+        self.assertEqual(value, "two")
+        self.assertNotEqual(new_digest, digest)
+        self.assertEqual((cache.misses, len(self.parse.calls)), (2, 2))
+
+    def test_touched_file_is_not_parsed_again(self):
+        cache = self.open()
+        self.fetch(cache)
+        cache.save()
+        st = self.path.stat()
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        cache = self.open()
+        self.assertEqual(self.fetch(cache)[0], "one")
+        self.assertEqual((cache.hits, len(self.parse.calls)), (1, 1))
+
+    def test_failures_are_not_cached(self):
+        write_file(self.root, "configurations/a.json", "broken")
+        cache = self.open()
+        self.assertEqual(self.fetch(cache)[0], None)
+        self.assertEqual(self.fetch(cache)[0], None)
+        self.assertEqual(len(self.parse.calls), 2)
+
+    def records(self):
+        with sqlite3.connect(str(self.cache_file)) as db:
+            return sorted(path for (path,) in db.execute("SELECT path FROM records"))
+
+    def test_save_keeps_records_other_runs_use(self):
+        cache = self.open()
+        self.fetch(cache)
+        cache.save()
+        other = write_file(self.root, "configurations/b.json", "other")
+        cache = self.open()
+        cache.fetch(other, self.parse)
+        cache.save()
+        self.assertEqual(self.records(), ["configurations/a.json", "configurations/b.json"])
+        cache = self.open()
+        self.fetch(cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_save_prunes_records_of_deleted_files(self):
+        cache = self.open()
+        self.fetch(cache)
+        cache.save()
+        self.path.unlink()
+        other = write_file(self.root, "configurations/b.json", "other")
+        cache = self.open()
+        cache.fetch(other, self.parse)
+        cache.save()
+        self.assertEqual(self.records(), ["configurations/b.json"])
+
+    def test_cache_from_another_generator_version_is_discarded(self):
+        cache = self.open()
+        self.fetch(cache)
+        cache.save()
+        with sqlite3.connect(str(self.cache_file)) as db:
+            db.execute("UPDATE meta SET value = 'older generator' WHERE key = 'stamp'")
+        cache = self.open()
+        self.fetch(cache)
+        self.assertEqual((cache.hits, cache.misses, len(self.parse.calls)), (0, 1, 2))
+
+    def test_disabled_cache_always_parses(self):
+        cache = core.ParseCache(None, root=self.root)
+        self.assertEqual(self.fetch(cache), ("one", ""))
+        self.fetch(cache)
+        self.assertEqual(len(self.parse.calls), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,21 @@
+import unittest
+
+from support import RepoTestCase
+
+class ProfileTest(RepoTestCase):
+    def test_every_stage_gets_stacks_and_an_allocation_diff(self):
+        directory = self.root / "profile"
+        self.repo.generate("--profile", directory, "--no-cache")
+        stages = ("walk", "build_entries", "cache_save")
+        for stage in stages:
+            self.assertTrue((directory / f"{stage}.pstats").is_file(), stage)
+            stacks = (directory / f"{stage}.collapsed").read_text(encoding="utf-8").split("\n")
+            self.assertTrue(all(line.rpartition(" ")[2].isdigit() for line in stacks if line), stage)
+        combined = (directory / "profile.collapsed").read_text(encoding="utf-8")
+        self.assertTrue(any(line.startswith("build_entries;") for line in combined.splitlines()))
+        allocations = (directory / "allocations.txt").read_text(encoding="utf-8")
+        for stage in stages:
+            self.assertIn(f"== {stage}: net ", allocations)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import csv
+import pathlib
+import unittest
+import xml.etree.ElementTree as ET
+import zipfile
+
+from support import GUEST, IDLE_TIME, RepoTestCase, gen
+
+SML = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+class Recorder(gen.Renderer):
+    name = "recorder"
+
+    def __init__(self, fail_on=None):
+        super().__init__(pathlib.Path("unused"))
+        self.fail_on = fail_on
+        self.added = []
+        self.closed = self.aborted = False
+
+    def add(self, e):
+        if e == self.fail_on:
+            raise RuntimeError(f"cannot render {e}")
+        self.added.append(e)
+
+    def close(self):
+        self.closed = True
+
+    def abort(self):
+        self.aborted = True
+
+class RenderEntriesTest(unittest.TestCase):
+    def test_renderer_must_implement_add_and_close(self):
+        class Incomplete(gen.Renderer):
+            def add(self, e):
+                pass
+
+        with self.assertRaises(TypeError):
+            Incomplete(pathlib.Path("unused"))
+
+    def test_every_renderer_sees_every_entry_once(self):
+        for threads in (True, False):
+            renderers = [Recorder(), Recorder()]
+            self.assertEqual(gen.render_entries(iter(range(500)), renderers, threads=threads), 500)
+            for renderer in renderers:
+                self.assertEqual(renderer.added, list(range(500)))
+                self.assertTrue(renderer.closed)
+                self.assertFalse(renderer.aborted)
+
+    def test_a_failure_aborts_every_renderer(self):
+        for threads in (True, False):
+            renderers = [Recorder(), Recorder(fail_on=3)]
+            with self.assertRaisesRegex(RuntimeError, "cannot render 3"):
+                gen.render_entries(iter(range(500)), renderers, threads=threads)
+            self.assertEqual([(r.closed, r.aborted) for r in renderers], [(False, True), (False, True)])
+
+class OutputFormatsTest(RepoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repo.generate("--formats", "docx,html,csv,json,xlsx")
+
+    def test_one_pass_writes_the_same_markdown_as_a_markdown_only_run(self):
+        markdown = self.root / "INTUNE-MY-MACS-DOCUMENTATION.md"
+        together = markdown.read_bytes()
+        markdown.unlink()
+        self.repo.generate("--no-cache")
+        self.assertEqual(markdown.read_bytes(), together)
+        for name in ("DOCUMENTATION.docx", "DOCUMENTATION.html", "SETTINGS.csv", "SETTINGS.xlsx", "CATALOG.json",
+                     "CATALOG.ndjson"):
+            self.assertTrue((self.root / f"INTUNE-MY-MACS-{name}").is_file(), name)
+
+    def test_csv_has_one_row_per_setting(self):
+        with (self.root / "INTUNE-MY-MACS-SETTINGS.csv").open(encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], list(gen.SETTINGS_COLUMNS))
+        self.assertEqual(len(rows), 1 + 7)
+        head = ["pol-sec-001-screensaver", "Policy", "Screensaver", "configurations/intune/pol-sec-001-screensaver.json"]
+        self.assertIn(head + [IDLE_TIME, "600", "600"], rows)
+        self.assertIn(head + [GUEST, "True", f"{GUEST}_true"], rows)
+
+    def test_xlsx_has_a_settings_and_an_artifacts_sheet(self):
+        with zipfile.ZipFile(self.root / "INTUNE-MY-MACS-SETTINGS.xlsx") as xlsx:
+            self.assertIsNone(xlsx.testzip())
+            sheets = [ET.fromstring(xlsx.read(f"xl/worksheets/sheet{n}.xml")) for n in (1, 2)]
+        settings, artifacts = ([["".join(t.text or "" for t in cell.iter(SML + "t")) for cell in row.iter(SML + "c")]
+                                for row in sheet.iter(SML + "row")] for sheet in sheets)
+        self.assertEqual(len(settings), 1 + 7)
+        self.assertEqual(settings[0], list(gen.SETTINGS_COLUMNS))
+        self.assertEqual([row[0] for row in artifacts[1:]], ["cfg-sec-003-screensaver", "cmp-cmp-004-baseline",
+                                                             "pol-sec-001-screensaver", "pol-sec-002-lock"])
+
+    def test_html_has_a_section_per_artifact(self):
+        html = (self.root / "INTUNE-MY-MACS-DOCUMENTATION.html").read_text(encoding="utf-8")
+        self.assertTrue(html.startswith("<!DOCTYPE html>"))
+        for ref in ("cfg-sec-003-screensaver", "cmp-cmp-004-baseline", "pol-sec-001-screensaver", "pol-sec-002-lock"):
+            self.assertIn(f'id="{ref}-', html)
+        self.assertIn(f"<tr><td>{IDLE_TIME}</td><td>600</td></tr>", html)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import re
+import time
+import unittest
+
+from support import IDLE_TIME, RepoTestCase, catalog_policy
+
+CLIENT = "Send-DocumentationRequest.py"
+
+class ServeTest(RepoTestCase):
+    address = None  # the default Unix socket under .docgen-cache/
+
+    def setUp(self):
+        super().setUp()
+        args = ["--serve"] + ([self.address] if self.address else [])
+        self.process = self.repo.start("Generate-ConfigurationDocumentation.py", *args, "--date", "none")
+        self.addCleanup(self.process.stop)
+        serving = self.process.wait_for("[INFO] Serving")
+        self.assertIn("Serving 4 entries on ", serving)
+        self.client_args = []
+        if self.address:
+            port = re.search(r"http://127\.0\.0\.1:(\d+)", serving).group(1)
+            self.client_args = ["--address", port]
+
+    def request(self, *args, check=True):
+        result = self.repo.run(CLIENT, *self.client_args, "--json", *args, check=check)
+        return json.loads(result.stdout) if result.stdout.startswith("{") else result
+
+    def test_queries_are_answered_from_the_model(self):
+        status = self.request("status")
+        self.assertEqual((status["entries"], status["root"]), (4, str(self.root)))
+        settings = self.request("setting", "com.apple.screensaver.idletime")
+        self.assertEqual(settings["total"], 3)
+        self.assertEqual({(s["ref"], s["value"]) for s in settings["settings"]}, {
+            ("pol-sec-001-screensaver", "600"), ("pol-sec-002-lock", "300"), ("cfg-sec-003-screensaver", "600")})
+        self.assertEqual(self.request("setting", "com.apple.*", "--limit", "1")["total"], 5)
+
+        report = self.request("validate", check=False)
+        self.assertTrue(report["ok"])
+        messages = {(p["level"], p["path"], p["message"]) for p in report["problems"]}
+        self.assertIn(("warning", "configurations/intune/cfg-sec-003-screensaver.mobileconfig",
+                       "artifact has no manifest XML"), messages)
+        self.assertIn(("warning", "com.apple.screensaver.idletime",
+                       "conflicting values: 600 (cfg-sec-003-screensaver, pol-sec-001-screensaver); 300 (pol-sec-002-lock)"),
+                      messages)
+
+    def test_render_writes_the_outputs(self):
+        self.assertFalse((self.root / "INTUNE-MY-MACS-DOCUMENTATION.md").exists())
+        reply = self.request("render")
+        self.assertEqual(reply["documented"], 4)
+        self.assertEqual(reply["outputs"][0]["path"], "INTUNE-MY-MACS-DOCUMENTATION.md")
+        self.assertTrue((self.root / "INTUNE-MY-MACS-DOCUMENTATION.md").is_file())
+        self.assertFalse(self.request("render")["outputs"][0]["changed"])
+
+    def test_model_follows_file_changes(self):
+        generation = self.request("status")["generation"]
+        self.repo.write("configurations/intune/pol-sec-002-lock.json", catalog_policy("Lock", {IDLE_TIME: 900}))
+        deadline = time.monotonic() + 30
+        while self.request("status")["generation"] == generation:
+            self.assertLess(time.monotonic(), deadline, "the daemon never picked up the change")
+            time.sleep(0.1)
+        values = {s["ref"]: s["value"] for s in self.request("setting", IDLE_TIME)["settings"]}
+        self.assertEqual(values["pol-sec-002-lock"], "900")
+
+    def test_broken_manifest_is_an_error(self):
+        self.repo.write("configurations/intune/pol-sec-002-lock.xml", "<MacIntuneManifest><Name>")
+        deadline = time.monotonic() + 30
+        while True:
+            report = self.request("validate", check=False)
+            if not report["ok"]:
+                break
+            self.assertLess(time.monotonic(), deadline, "the daemon never picked up the change")
+            time.sleep(0.1)
+        self.assertIn({"level": "error", "path": "configurations/intune/pol-sec-002-lock.xml",
+                       "message": "manifest XML could not be parsed"}, report["problems"])
+
+    def test_stop(self):
+        self.assertEqual(self.request("stop"), {"stopping": True})
+        self.process.wait_for("[INFO] Daemon stopped")
+        self.assertEqual(self.process.popen.wait(timeout=30), 0)
+        self.assertFalse(list((self.root / ".docgen-cache").glob("*.sock")))
+
+class ServeTcpTest(ServeTest):
+    address = "0"  # any free port on the loopback interface
+
+class ServeRemoteTest(RepoTestCase):
+    def test_remote_host_needs_opt_in(self):
+        for address in ("0.0.0.0:0", "example.com:0"):
+            result = self.repo.run("Generate-ConfigurationDocumentation.py", "--serve", address, check=False)
+            self.assertEqual(result.returncode, 2, address)
+            self.assertIn("add --serve-remote", result.stderr)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import json
+import unittest
+
+from support import IDLE_TIME, RepoTestCase, catalog_policy
+
+SCRIPT = "Query-SettingsIndex.py"
+
+class SettingsIndexTest(RepoTestCase):
+    def update(self, *args, spawn=False):
+        """Run ``update`` and return its counts, e.g. {"added": 4, "updated": 0, ...}."""
+        line = self.repo.run(SCRIPT, "update", *args, spawn=spawn).stdout.strip().splitlines()[-1]
+        return {what: int(n) for n, what in (part.split() for part in line.split(": ", 1)[1].split(", "))}
+
+    def query(self, *args):
+        return json.loads(self.repo.run(SCRIPT, "--json", *args).stdout)
+
+    def values(self, pattern):
+        return {(row["ref"], row["value"]) for row in self.query("setting", pattern)}
+
+    def test_round_trip(self):
+        self.assertEqual(self.update(), {"added": 4, "updated": 0, "unchanged": 0, "removed": 0})
+        self.assertEqual(self.values(IDLE_TIME), {("pol-sec-001-screensaver", "600"), ("pol-sec-002-lock", "300")})
+        self.assertEqual(self.update(), {"added": 0, "updated": 0, "unchanged": 4, "removed": 0})
+
+        self.repo.write("configurations/intune/pol-sec-002-lock.json", catalog_policy("Lock", {IDLE_TIME: 900}))
+        (self.root / "configurations/intune/cmp-cmp-004-baseline.json").unlink()
+        self.repo.write("configurations/intune/pol-sec-005-idle.json", catalog_policy("Idle", {IDLE_TIME: 60}))
+        self.assertEqual(self.update(), {"added": 1, "updated": 1, "unchanged": 2, "removed": 1})
+        self.assertEqual(self.values(IDLE_TIME), {("pol-sec-001-screensaver", "600"), ("pol-sec-002-lock", "900"),
+                                                  ("pol-sec-005-idle", "60")})
+        # Settings no artifact uses any more are dropped with their last artifact
+        self.assertEqual(self.query("setting", "passwordRequired"), [])
+        self.assertEqual(self.query("sql", "SELECT COUNT(*) AS n FROM settings WHERE setting_id = 'passwordRequired'"),
+                         [{"n": 0}])
+
+    def test_canonical_pattern_matches_every_format(self):
+        self.update()
+        self.assertEqual(self.values("com.apple.screensaver.idletime"), {
+            ("pol-sec-001-screensaver", "600"), ("pol-sec-002-lock", "300"), ("cfg-sec-003-screensaver", "600")})
+
+    def test_artifacts_by_setting_count(self):
+        self.update()
+        rows = self.query("artifacts", "--type", "Policy")
+        self.assertEqual([(row["ref"], row["setting_count"]) for row in rows],
+                         [("pol-sec-001-screensaver", 2), ("pol-sec-002-lock", 2)])
+
+    def test_search_takes_punctuation_literally(self):
+        self.update()
+        refs = lambda text: [row["ref"] for row in self.query("search", text)]
+        self.assertEqual(refs("pol-sec-001"), ["pol-sec-001-screensaver"])
+        self.assertEqual(refs("lock*"), ["pol-sec-002-lock"])
+        for text in ("screen-saver", "-", ":", '"', "*", "a:b \"c"):
+            self.assertEqual(refs(text), [])
+
+    def test_spawned_workers_index_the_same_rows(self):
+        self.assertEqual(self.update("-j", "2", spawn=True)["added"], 4)
+        self.assertEqual(self.values(IDLE_TIME), {("pol-sec-001-screensaver", "600"), ("pol-sec-002-lock", "300")})
+
+if __name__ == "__main__":
+    unittest.main()
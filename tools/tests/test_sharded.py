@@ -0,0 +1,47 @@
+import re
+import unittest
+
+from support import IDLE_TIME, RepoTestCase, catalog_policy
+
+class ShardedOutputTest(RepoTestCase):
+    def shard(self):
+        """Generate into the default shard folder and return the summary line's numbers."""
+        output = self.repo.generate("--sharded")
+        line = next(line for line in output.splitlines() if "sharded documentation" in line)
+        return {what: int(n) for n, what in re.findall(r"(\d+) (?:pages )?(written|unchanged|removed)", line)}
+
+    def test_pages_and_indexes(self):
+        self.assertEqual(self.shard(), {"written": 8, "unchanged": 0, "removed": 0})
+        shards = self.root / "INTUNE-MY-MACS-DOCUMENTATION"
+        pages = sorted(p.relative_to(shards).as_posix() for p in shards.rglob("*.md"))
+        self.assertEqual(pages, ["README.md", "compliance/README.md", "compliance/cmp-cmp-004-baseline.md",
+                                 "customconfig/README.md", "customconfig/cfg-sec-003-screensaver.md",
+                                 "policy/README.md", "policy/pol-sec-001-screensaver.md", "policy/pol-sec-002-lock.md"])
+        page = (shards / "policy/pol-sec-002-lock.md").read_text(encoding="utf-8")
+        self.assertTrue(page.startswith("# pol-sec-002-lock (Policy)\n"))
+        self.assertIn(f"| `{IDLE_TIME}` | `300` |", page)
+        self.assertIn("| [pol-sec-002-lock](pol-sec-002-lock.md) | Lock | 2 |",
+                      (shards / "policy/README.md").read_text(encoding="utf-8"))
+        index = (shards / "README.md").read_text(encoding="utf-8")
+        self.assertIn("| [Policy](policy/README.md) | 2 | 4 |", index)
+        self.assertIn("[cfg-sec-003-screensaver](customconfig/cfg-sec-003-screensaver.md)", index)
+        self.assertFalse((self.root / "INTUNE-MY-MACS-DOCUMENTATION.md").exists())
+
+    def test_only_changed_pages_are_rewritten(self):
+        self.shard()
+        shards = self.root / "INTUNE-MY-MACS-DOCUMENTATION"
+        untouched = shards / "policy/pol-sec-001-screensaver.md"
+        mtime = untouched.stat().st_mtime_ns
+        self.assertEqual(self.shard(), {"written": 0, "unchanged": 4, "removed": 0})
+
+        self.repo.write("configurations/intune/pol-sec-002-lock.json", catalog_policy("Lock", {IDLE_TIME: 900}))
+        (self.root / "configurations/intune/cmp-cmp-004-baseline.json").unlink()
+        # The changed page, the policy index (its count changed) and the top-level index are
+        # written; the compliance page and its index are removed
+        self.assertEqual(self.shard(), {"written": 3, "unchanged": 2, "removed": 2})
+        self.assertIn(f"| `{IDLE_TIME}` | `900` |", (shards / "policy/pol-sec-002-lock.md").read_text(encoding="utf-8"))
+        self.assertFalse((shards / "compliance").exists())
+        self.assertEqual(untouched.stat().st_mtime_ns, mtime)
+
+if __name__ == "__main__":
+    unittest.main()
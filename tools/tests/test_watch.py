@@ -0,0 +1,39 @@
+import unittest
+
+from support import IDLE_TIME, RepoTestCase, catalog_policy, manifest
+
+class WatchTest(RepoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.process = self.repo.start("Generate-ConfigurationDocumentation.py", "--watch", "--date", "none")
+        self.addCleanup(self.process.stop)
+        self.process.wait_for("[INFO] Watching")
+        self.markdown = self.root / "INTUNE-MY-MACS-DOCUMENTATION.md"
+
+    def wait_for_markdown(self, text, present=True):
+        """Wait for updates until ``text`` is in the document (or gone from it)."""
+        while (text in self.markdown.read_text(encoding="utf-8")) != present:
+            self.process.wait_for("[INFO] Updated after")
+
+    def test_edit_rewrites_the_document(self):
+        self.assertIn(f"| `{IDLE_TIME}` | `300` |", self.markdown.read_text(encoding="utf-8"))
+        self.repo.write("configurations/intune/pol-sec-002-lock.json", catalog_policy("Lock", {IDLE_TIME: 900}))
+        line = self.process.wait_for("[INFO] Updated after")
+        self.assertIn("1 file(s) re-read, 4 entries", line)
+        text = self.markdown.read_text(encoding="utf-8")
+        self.assertIn(f"| `{IDLE_TIME}` | `900` |", text)
+        self.assertIn("| [pol-sec-002-lock](#pol-sec-002-lock-policy) | Policy | 1 |", text)
+
+    def test_new_and_deleted_artifacts(self):
+        intune = "configurations/intune"
+        self.repo.write(f"{intune}/pol-sec-005-idle.json", catalog_policy("Idle", {IDLE_TIME: 60}))
+        self.repo.write(f"{intune}/pol-sec-005-idle.xml",
+                        manifest("POL-SEC-005", "Policy", "Idle", f"{intune}/pol-sec-005-idle.json"))
+        self.wait_for_markdown("Idle (test fixture)")
+        self.assertIn("**Total Artifacts:** 5", self.markdown.read_text(encoding="utf-8"))
+        (self.root / intune / "cmp-cmp-004-baseline.json").unlink()
+        self.wait_for_markdown("cmp-cmp-004-baseline", present=False)
+        self.assertIn("**Total Artifacts:** 4", self.markdown.read_text(encoding="utf-8"))
+
+if __name__ == "__main__":
+    unittest.main()